@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import glob
+import os
+from typing import Callable, Sequence, Union
+
+# Files processed in parallel by the batch commands: leave one core to the
+# rest of the machine, and stop at four since each worker holds a whole
+# workbook in memory.
+DEFAULT_BATCH_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+
+
+def collect_inputs(
+    sources: Union[str, Sequence[str]],
+    patterns: Sequence[str],
+    skip: Callable[[str], bool],
+) -> list[str]:
+    """Expand directories (their files matching ``patterns``) and glob patterns into workbook paths.
+
+    Files whose name ``skip`` accepts are left out, along with Excel lock
+    files (``~$...``); duplicates are dropped and the result is sorted so
+    batches are processed in a stable order.
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+
+    paths: set[str] = set()
+    for source in sources:
+        if os.path.isdir(source):
+            matches = [match for pattern in patterns for match in glob.glob(os.path.join(source, pattern))]
+        else:
+            matches = glob.glob(source, recursive=True) or ([source] if os.path.exists(source) else [])
+        for match in matches:
+            name = os.path.basename(match)
+            if name.startswith("~$") or skip(name):
+                continue
+            paths.add(os.path.abspath(match))
+    return sorted(paths)
+
+
+__all__ = ["DEFAULT_BATCH_WORKERS", "collect_inputs"]
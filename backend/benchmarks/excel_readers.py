@@ -0,0 +1,120 @@
+"""Read-time benchmark of the Excel reader engines on a workbook.
+
+Parses every sheet of ``--input`` (or of a generated workbook of ``--rows``
+rows) with each installed engine, in a fresh interpreter per engine so peak
+RSS figures are independent. The generated workbook is built in a
+throwaway interpreter too, so no engine inherits the generator's memory::
+
+    python -m backend.benchmarks.excel_readers --input templates/big.xlsx
+    python -m backend.benchmarks.excel_readers --rows 200000 --columns 30
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from backend.instrumentation import peak_rss_mb  # noqa: E402
+from backend.workbook import READER_ENGINES, WorkbookSession, _engine_installed  # noqa: E402
+
+STREAM_CHUNK_SIZE = 50_000
+
+
+def build_workbook(path: Path, rows: int, columns: int) -> None:
+    rng = np.random.default_rng(0)
+    data = {}
+    for index in range(columns):
+        kind = index % 4
+        if kind == 0:
+            data[f"Text{index}"] = rng.choice(["FR", "DE", "GB", "IT", "ES", ""], rows)
+        elif kind == 1:
+            data[f"Int{index}"] = rng.integers(0, 1_000_000, rows)
+        elif kind == 2:
+            data[f"Float{index}"] = rng.random(rows).round(4)
+        else:
+            data[f"Date{index}"] = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 2000, rows), unit="D")
+    pd.DataFrame(data).to_excel(path, sheet_name="Template", index=False)
+
+
+def run_engine(engine: str, input_path: Path) -> dict[str, object]:
+    start = time.perf_counter()
+    rows = 0
+    if engine == "openpyxl-stream":
+        with WorkbookSession(input_path, "openpyxl") as workbook:
+            for sheet_name in workbook.sheet_names:
+                for chunk in workbook.stream(sheet_name, STREAM_CHUNK_SIZE).chunks():
+                    rows += len(chunk)
+    else:
+        with WorkbookSession(input_path, engine) as workbook:
+            for sheet_name in workbook.sheet_names:
+                rows += len(workbook.sheet(sheet_name))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "rows": rows,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def format_metrics(metrics: dict[str, object]) -> str:
+    return " ".join(
+        f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}" for key, value in metrics.items()
+    )
+
+
+def _run_child(*arguments: str) -> str:
+    completed = subprocess.run(
+        [sys.executable, "-m", "backend.benchmarks.excel_readers", *arguments],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return completed.stdout.strip()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", type=Path, help="Workbook to read (default: a generated one)")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--engine", help=argparse.SUPPRESS)
+    parser.add_argument("--build", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.build:
+        build_workbook(args.build, args.rows, args.columns)
+        return 0
+    if args.engine:
+        print(format_metrics(run_engine(args.engine, args.input)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as scratch:
+        input_path = args.input
+        if input_path is None:
+            input_path = Path(scratch) / "readers.xlsx"
+            _run_child("--build", str(input_path), "--rows", str(args.rows), "--columns", str(args.columns))
+        size_mb = input_path.stat().st_size / (1024 * 1024)
+        print(f"input={input_path.name} size_mb={size_mb:.1f}")
+
+        for engine in [*READER_ENGINES, "openpyxl-stream"]:
+            if engine in READER_ENGINES and not _engine_installed(engine):
+                print(f"{engine:<16} not installed")
+                continue
+            print(f"{engine:<16} {_run_child('--input', str(input_path), '--engine', engine)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
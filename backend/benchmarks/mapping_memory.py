@@ -0,0 +1,107 @@
+"""Peak-memory benchmark for building the mapped result DataFrame.
+
+Compares assigning target columns one at a time (the previous strategy) with
+``MappingPlan.execute``, which collects the columns and builds the frame once.
+Each strategy runs in a fresh interpreter so peak RSS figures are independent::
+
+    python -m backend.benchmarks.mapping_memory --rows 100000 --targets 300
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+import warnings
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from backend.instrumentation import peak_rss_mb  # noqa: E402
+from backend.mapping.mapper import PlanContext, compile_mapping_plan  # noqa: E402
+
+STRATEGIES = ("incremental", "batched")
+SOURCE_COLUMNS = 20
+
+
+def build_inputs(rows: int, targets: int) -> tuple[pd.DataFrame, list[dict[str, str]]]:
+    rng = np.random.default_rng(0)
+    template = pd.DataFrame(
+        {
+            f"Source{index}": rng.integers(0, 10_000, rows).astype(str).astype(object)
+            for index in range(SOURCE_COLUMNS)
+        }
+    )
+    rule_kinds = [
+        lambda i: f"COLUMN=source{i % SOURCE_COLUMNS}",
+        lambda i: f"CONCAT=Source{i % SOURCE_COLUMNS}+'-'+Source{(i + 1) % SOURCE_COLUMNS}",
+        lambda i: f"INVARIABLE=CONST{i}",
+        lambda i: "NS=ID######",
+    ]
+    rules = [
+        {"target": f"Target{index}", "rule": rule_kinds[index % len(rule_kinds)](index)}
+        for index in range(targets)
+    ]
+    return template, rules
+
+
+def run_strategy(strategy: str, rows: int, targets: int) -> dict[str, float]:
+    template, rules = build_inputs(rows, targets)
+    plan = compile_mapping_plan(rules)
+    before = peak_rss_mb() or 0.0
+
+    start = time.perf_counter()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", pd.errors.PerformanceWarning)
+        if strategy == "incremental":
+            context = PlanContext(template, {})
+            result_df = pd.DataFrame()
+            for step in plan.steps:
+                result_df[step.target] = step.evaluate(context)
+        else:
+            result_df = plan.execute(template, {})
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb() or 0.0
+
+    return {
+        "seconds": elapsed,
+        "peak_rss_mb": peak,
+        "delta_rss_mb": peak - before,
+        "fragmentation_warnings": float(sum(issubclass(w.category, pd.errors.PerformanceWarning) for w in caught)),
+        "columns": float(result_df.shape[1]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--targets", type=int, default=300)
+    parser.add_argument("--strategy", choices=STRATEGIES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.strategy:
+        metrics = run_strategy(args.strategy, args.rows, args.targets)
+        print(" ".join(f"{key}={value:.3f}" for key, value in metrics.items()))
+        return 0
+
+    print(f"rows={args.rows} targets={args.targets}")
+    for strategy in STRATEGIES:
+        completed = subprocess.run(
+            [sys.executable, "-m", "backend.benchmarks.mapping_memory", "--rows", str(args.rows),
+             "--targets", str(args.targets), "--strategy", strategy],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        print(f"{strategy:<12} {completed.stdout.strip()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
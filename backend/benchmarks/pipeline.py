@@ -0,0 +1,342 @@
+"""End-to-end benchmark of the validation and the mapping on synthetic DMF workbooks.
+
+Generates a workbook with a ``Template`` of ``--rows`` x ``--columns``, a
+``ValidationRules`` sheet mixing ``VALUE=``, ``SHEET=``, ``Pattern``,
+``unique`` and ``equals:`` rules (``--rule-mix``), a ``Parameters`` sheet
+mixing ``NS=``, ``MAPPING=``, ``CONCAT=``, ``+`` and ``COLUMN=`` rules
+(``--mapping-mix``) and the reference and mapping sheets they point to.
+The data only depends on the options and ``--seed``, so runs of different
+commits measure the same workload.
+
+Each run of ``generate_result_from_excel``/``generate_mapped_workbook``
+happens in a fresh interpreter and reports the total time, rows/s, peak
+RSS and the phase timings the engines record (see ``PhaseTimings``). The
+workbook is generated in a throwaway interpreter as well and the parent
+never imports pandas, so the runs' peak RSS is their own. ``--save`` stores the results
+with the commit they were measured on, ``--baseline`` compares with such a
+file::
+
+    python -m backend.benchmarks.pipeline --rows 100000 --columns 30 --save before.json
+    python -m backend.benchmarks.pipeline --rows 100000 --columns 30 --baseline before.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+if TYPE_CHECKING:
+    import numpy as np
+
+RULE_KINDS = ("value", "sheet", "pattern", "unique", "equals")
+MAPPING_KINDS = ("ns", "mapping", "concat", "plus", "column")
+DEFAULT_RULE_MIX = "value=3,sheet=2,pattern=3,unique=1,equals=1"
+DEFAULT_MAPPING_MIX = "ns=1,mapping=2,concat=1,plus=1,column=3"
+PIPELINES = ("validation", "mapping")
+
+# Share of generated cells that break their rule, so every check also builds messages.
+INVALID_SHARE = 0.02
+STATUS_VALUES = ("ACTIVE", "INACTIVE", "PENDING", "BLOCKED", "ARCHIVED")
+REFERENCE_CODES = 200
+
+
+def parse_mix(text: str, kinds: tuple[str, ...]) -> dict[str, int]:
+    """Parse ``kind=weight,...`` into weights for ``kinds`` (missing kinds weigh 0)."""
+    weights = dict.fromkeys(kinds, 0)
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        kind, _, weight = item.partition("=")
+        kind = kind.strip().lower()
+        if kind not in weights:
+            raise ValueError(f"Unknown kind '{kind}' (expected {', '.join(kinds)}).")
+        weights[kind] = int(weight or 1)
+    if not any(weights.values()):
+        raise ValueError(f"Empty mix '{text}'.")
+    return weights
+
+
+def _cycle(weights: dict[str, int], count: int) -> list[str]:
+    pattern = [kind for kind, weight in weights.items() for _ in range(weight)]
+    return [pattern[index % len(pattern)] for index in range(count)]
+
+
+def _with_invalid(rng: np.random.Generator, values: np.ndarray, invalid: object) -> np.ndarray:
+    values = values.astype(object)
+    values[rng.random(len(values)) < INVALID_SHARE] = invalid
+    return values
+
+
+def build_workbook(
+    path: Path,
+    rows: int,
+    columns: int,
+    rule_mix: dict[str, int],
+    mapping_mix: dict[str, int],
+    targets: Optional[int] = None,
+    seed: int = 0,
+) -> None:
+    """Write a synthetic DMF workbook usable by both the validator and the mapper.
+
+    Each template column gets one rule kind of ``rule_mix`` (an ``equals``
+    rule adds the companion column it checks, so the template may have one
+    column more than asked). The ``Parameters`` sheet has ``targets``
+    targets (default: one per template column) drawn from ``mapping_mix``.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from backend.workbook import writer_engine
+
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"C{index:04d}" for index in range(REFERENCE_CODES)], dtype=object)
+    template: dict[str, np.ndarray] = {}
+    rules: list[dict[str, object]] = []
+    sheets: dict[str, pd.DataFrame] = {}
+    coded_columns: list[str] = []
+
+    for index, kind in enumerate(_cycle(rule_mix, columns)):
+        if len(template) >= columns:
+            break
+        rule: dict[str, object] = {"Checked": True, "Required": index % 2 == 0}
+        if kind == "value":
+            field = f"Status{index}"
+            template[field] = _with_invalid(rng, rng.choice(np.array(STATUS_VALUES, dtype=object), rows), "UNKNOWN")
+            rule["AllowedValues"] = "VALUE=" + ";".join(STATUS_VALUES)
+            coded_columns.append(field)
+        elif kind in ("sheet", "equals"):
+            field = f"Code{index}"
+            sheet_name = f"Ref{index}"
+            picks = rng.integers(0, REFERENCE_CODES, rows)
+            template[field] = _with_invalid(rng, codes[picks], "ZZZZ")
+            rule["AllowedValues"] = f"SHEET={sheet_name}"
+            reference = {sheet_name: codes}
+            if kind == "equals":
+                partner = f"Group{index}"
+                # Each group value belongs to a single code, as equals: requires.
+                groups = np.array([f"G{code_index:04d}" for code_index in range(REFERENCE_CODES)], dtype=object)
+                reference["Group"] = groups
+                template[partner] = _with_invalid(rng, groups[picks], "G9999")
+                rule["CustomRule"] = f"equals:{partner};Group"
+            sheets[sheet_name] = pd.DataFrame(reference)
+            coded_columns.append(field)
+        elif kind == "pattern":
+            field = f"Reference{index}"
+            letters = rng.choice(np.array(list("ABCDEFGH"), dtype=object), rows)
+            digits = rng.integers(0, 10_000, rows)
+            values = np.array([f"{letter}X-{number:04d}" for letter, number in zip(letters, digits)], dtype=object)
+            template[field] = _with_invalid(rng, values, "bad ref")
+            rule.update(Pattern=r"^[A-Z]{2}-\d{4}$", MinLength=7, MaxLength=7)
+        else:
+            field = f"Id{index}"
+            values = np.array([f"ID{row:08d}" for row in range(rows)], dtype=object)
+            duplicates = rng.random(rows) < INVALID_SHARE
+            values[duplicates] = values[rng.integers(0, rows, int(duplicates.sum()))]
+            template[field] = values
+            rule["CustomRule"] = "unique"
+        rule["Field"] = field
+        rules.append(rule)
+
+    template_columns = list(template)
+    parameters: list[dict[str, str]] = []
+    for index, kind in enumerate(_cycle(mapping_mix, targets or len(template_columns))):
+        source = template_columns[index % len(template_columns)]
+        other = template_columns[(index + 1) % len(template_columns)]
+        if kind == "ns":
+            rule_text = "NS=ID######"
+        elif kind == "mapping":
+            source = coded_columns[index % len(coded_columns)] if coded_columns else source
+            sheet_name = f"Map{index}"
+            keys = np.unique(template[source].astype(str))
+            sheets[sheet_name] = pd.DataFrame({"Code": keys, f"{sheet_name}Mapping": [f"M-{key}" for key in keys]})
+            rule_text = f"MAPPING={source};{sheet_name}"
+        elif kind == "concat":
+            rule_text = f"CONCAT='X'+{source}+{other}"
+        elif kind == "plus":
+            rule_text = f"{source}+'-'+{other}"
+        else:
+            rule_text = f"COLUMN={source}"
+        parameters.append({"Target": f"Target{index}", "Rule": rule_text})
+
+    rules_columns = ["Field", "Checked", "Required", "MinLength", "MaxLength", "AllowedValues", "Pattern", "CustomRule"]
+    with pd.ExcelWriter(path, engine=writer_engine()) as writer:
+        pd.DataFrame(template).to_excel(writer, sheet_name="Template", index=False)
+        pd.DataFrame(rules, columns=rules_columns).to_excel(writer, sheet_name="ValidationRules", index=False)
+        pd.DataFrame(parameters).to_excel(writer, sheet_name="Parameters", index=False)
+        for sheet_name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+def describe(reader: str, writer: str) -> dict[str, object]:
+    """The engines ``reader``/``writer`` resolve to and the library versions, as a run sees them."""
+    import numpy as np
+    import pandas as pd
+
+    from backend.workbook import reader_engine, writer_engine
+
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "reader": reader_engine(reader),
+        "writer": writer_engine(writer),
+    }
+
+
+def run_pipeline(pipeline: str, input_path: Path, reader: Optional[str], writer: Optional[str]) -> dict[str, object]:
+    from backend.dmf_validation.validator import generate_result_from_excel
+    from backend.instrumentation import PhaseTimings, peak_rss_mb
+    from backend.mapping.mapper import generate_mapped_workbook
+
+    timings = PhaseTimings()
+    with tempfile.TemporaryDirectory() as output_dir:
+        if pipeline == "validation":
+            generate_result_from_excel(str(input_path), output_dir, reader=reader, writer=writer, timings=timings)
+        else:
+            generate_mapped_workbook(input_path, output_dir, reader=reader, writer=writer, timings=timings)
+    return {"seconds": timings.total, "rows": timings.rows, "phases": timings.phases, "peak_rss_mb": peak_rss_mb()}
+
+
+def _child(task: str, *arguments: str) -> dict[str, object]:
+    completed = subprocess.run(
+        [sys.executable, "-m", "backend.benchmarks.pipeline", *arguments],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{task} failed:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(pipeline: str, input_path: Path, reader: str, writer: str, repeat: int) -> dict[str, object]:
+    """Median of ``repeat`` runs, each in a fresh process; peak RSS is the highest seen."""
+    arguments = ("--input", str(input_path), "--reader", reader, "--writer", writer, "--run", pipeline)
+    runs = [_child(f"{pipeline} run", *arguments) for _ in range(repeat)]
+    seconds = statistics.median(run["seconds"] for run in runs)
+    rows = runs[0]["rows"]
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+        "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+        "phases": {name: statistics.median(run["phases"][name] for run in runs) for name in runs[0]["phases"]},
+    }
+
+
+def _git_revision() -> str:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{revision}-dirty" if dirty else revision
+
+
+def format_results(results: dict[str, object], baseline: Optional[dict[str, object]] = None) -> str:
+    def delta(current: float, previous: Optional[float]) -> str:
+        if not previous:
+            return ""
+        return f" ({(current - previous) / previous:+.0%})"
+
+    lines = []
+    for pipeline, metrics in results["pipelines"].items():
+        previous = (baseline or {}).get("pipelines", {}).get(pipeline, {})
+        lines.append(
+            f"{pipeline:<11} rows={metrics['rows']} total={metrics['seconds']:.2f}s{delta(metrics['seconds'], previous.get('seconds'))}"
+            f" rows/s={metrics['rows_per_second']:,.0f}"
+            f" peak_rss_mb={metrics['peak_rss_mb']:.0f}{delta(metrics['peak_rss_mb'], previous.get('peak_rss_mb'))}"
+        )
+        for phase, seconds in metrics["phases"].items():
+            lines.append(f"  {phase:<10} {seconds:8.3f}s{delta(seconds, previous.get('phases', {}).get(phase))}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", type=Path, help="Workbook to run on (default: a generated one)")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--targets", type=int, help="Mapping targets (default: one per template column)")
+    parser.add_argument("--rule-mix", default=DEFAULT_RULE_MIX, help=f"Weights of {', '.join(RULE_KINDS)}")
+    parser.add_argument("--mapping-mix", default=DEFAULT_MAPPING_MIX, help=f"Weights of {', '.join(MAPPING_KINDS)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pipeline", choices=PIPELINES, action="append", help="Pipeline to run (default: both)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per measure; the median is kept")
+    parser.add_argument("--reader", default="auto", help="Excel reader engine (auto, openpyxl or calamine)")
+    parser.add_argument("--writer", default="auto", help="Excel writer engine (auto, openpyxl or xlsxwriter)")
+    parser.add_argument("--save", type=Path, help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="Results saved by an earlier --save to compare with")
+    parser.add_argument("--run", choices=PIPELINES, help=argparse.SUPPRESS)
+    parser.add_argument("--build", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--describe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    try:
+        rule_mix, mapping_mix = parse_mix(args.rule_mix, RULE_KINDS), parse_mix(args.mapping_mix, MAPPING_KINDS)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.build:
+        build_workbook(args.build, args.rows, args.columns, rule_mix, mapping_mix, args.targets, args.seed)
+        print(json.dumps({"input": str(args.build)}))
+        return 0
+    if args.describe:
+        print(json.dumps(describe(args.reader, args.writer)))
+        return 0
+    if args.run:
+        print(json.dumps(run_pipeline(args.run, args.input, args.reader, args.writer)))
+        return 0
+
+    environment = _child("engine lookup", "--reader", args.reader, "--writer", args.writer, "--describe")
+    reader, writer = str(environment["reader"]), str(environment["writer"])
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    with tempfile.TemporaryDirectory() as scratch:
+        input_path = args.input
+        if input_path is None:
+            input_path = Path(scratch) / "pipeline.xlsx"
+            build_arguments = [
+                "--build", str(input_path), "--rows", str(args.rows), "--columns", str(args.columns),
+                "--rule-mix", args.rule_mix, "--mapping-mix", args.mapping_mix, "--seed", str(args.seed),
+            ]
+            if args.targets is not None:
+                build_arguments += ["--targets", str(args.targets)]
+            _child("workbook generation", *build_arguments)
+        results: dict[str, object] = {
+            "revision": _git_revision(),
+            **environment,
+            "workload": {
+                "input": str(args.input) if args.input else None,
+                "rows": args.rows if args.input is None else None,
+                "columns": args.columns,
+                "targets": args.targets,
+                "rule_mix": args.rule_mix,
+                "mapping_mix": args.mapping_mix,
+                "seed": args.seed,
+            },
+            "pipelines": {
+                pipeline: measure(pipeline, input_path, reader, writer, max(1, args.repeat))
+                for pipeline in args.pipeline or PIPELINES
+            },
+        }
+
+    if baseline is not None and baseline.get("workload") != results["workload"]:
+        print(f"warning: baseline {baseline.get('revision')} measured another workload", file=sys.stderr)
+    print(f"revision={results['revision']} input={input_path.name} reader={reader} writer={writer}")
+    print(format_results(results, baseline))
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import pandas as pd
+
+from backend.batch import DEFAULT_BATCH_WORKERS, collect_inputs as collect_batch_inputs
+from backend.dmf_validation.report import ValidationSummary, format_percentage
+from backend.dmf_validation.validator import RuleSetCache, generate_result_from_excel
+from backend.workbook import READER_ENGINES, WRITER_ENGINES
+
+BATCH_SUMMARY_NAME = "batch summary.xlsx"
+
+# One cache per pool process: files validated by the same process reuse the
+# rule sets of earlier files with the same rules and reference sheets.
+_RULE_SETS = RuleSetCache()
+
+
+@dataclass
+class BatchItem:
+    """Outcome of one workbook of a batch."""
+
+    input: str
+    output: Optional[str] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+    total_rows: int = 0
+    valid_rows: int = 0
+    field_errors: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchResult:
+    items: list[BatchItem]
+    summary: str
+    seconds: float
+
+    @property
+    def failed(self) -> list[BatchItem]:
+        return [item for item in self.items if not item.ok]
+
+
+def collect_inputs(sources: Union[str, Sequence[str]]) -> list[str]:
+    """Expand directories (their ``*.xlsx``) and glob patterns into workbook paths.
+
+    Review reports, the batch summary and Excel lock files are skipped (see
+    ``backend.batch.collect_inputs``).
+    """
+    return collect_batch_inputs(
+        sources,
+        ("*.xlsx",),
+        lambda name: name.endswith(" review.xlsx") or name == BATCH_SUMMARY_NAME,
+    )
+
+
+def _validate_one(
+    input_file: str,
+    output_dir: str,
+    rules_override: Optional[list[dict[str, object]]],
+    options: dict[str, object],
+) -> BatchItem:
+    item = BatchItem(input=input_file)
+    summary = ValidationSummary()
+    started = time.perf_counter()
+    try:
+        item.output = generate_result_from_excel(
+            input_file,
+            output_dir,
+            rules_override,
+            rule_sets=_RULE_SETS,
+            summary=summary,
+            **options,
+        )
+        item.total_rows, item.valid_rows = summary.total_rows, summary.valid_rows
+        item.field_errors = summary.field_errors
+    except Exception as exc:  # noqa: BLE001
+        item.error = str(exc)
+    item.seconds = time.perf_counter() - started
+    return item
+
+
+def write_batch_summary(items: Sequence[BatchItem], output_path: Path) -> str:
+    files = pd.DataFrame(
+        [
+            {
+                "File": Path(item.input).name,
+                "Status": "OK" if item.ok else "ERROR",
+                "Total Rows": item.total_rows,
+                "Valid Rows": item.valid_rows,
+                "% Valid": format_percentage(item.valid_rows, item.total_rows),
+                "Seconds": round(item.seconds, 2),
+                "Report": Path(item.output).name if item.output else "",
+                "Error": item.error or "",
+            }
+            for item in items
+        ],
+        columns=["File", "Status", "Total Rows", "Valid Rows", "% Valid", "Seconds", "Report", "Error"],
+    )
+    field_errors = pd.DataFrame(
+        [
+            {
+                "File": Path(item.input).name,
+                "Field": field_name,
+                "Errors Count": errors_count,
+                "Errors %": format_percentage(errors_count, item.total_rows),
+            }
+            for item in items
+            for field_name, errors_count in item.field_errors.items()
+        ],
+        columns=["File", "Field", "Errors Count", "Errors %"],
+    )
+    totals = (
+        field_errors.groupby("Field", sort=False)["Errors Count"].sum().reset_index()
+        if not field_errors.empty
+        else pd.DataFrame(columns=["Field", "Errors Count"])
+    )
+
+    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+        files.to_excel(writer, sheet_name="Files", index=False)
+        totals.to_excel(writer, sheet_name="FieldTotals", index=False)
+        field_errors.to_excel(writer, sheet_name="FieldErrors", index=False)
+    return str(output_path)
+
+
+def validate_batch(
+    sources: Union[str, Sequence[str]],
+    output_dir: str,
+    rules_override: Optional[list[dict[str, object]]] = None,
+    *,
+    workers: int = DEFAULT_BATCH_WORKERS,
+    errors_format: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    reader: Optional[str] = None,
+    writer: Optional[str] = None,
+) -> BatchResult:
+    """Validate every workbook matched by ``sources`` into ``output_dir``.
+
+    Files are processed concurrently by a pool of ``workers`` processes;
+    each process keeps a ``RuleSetCache``, so files sharing their rules and
+    reference sheets build the rule set once per process. A failing file
+    does not stop the batch. ``batch summary.xlsx`` lists every file
+    (status, rows, timing) and the per-field error counts.
+    """
+    started = time.perf_counter()
+    inputs = collect_inputs(sources)
+    if not inputs:
+        raise FileNotFoundError(f"Aucun fichier Excel trouve pour: {sources}")
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    options: dict[str, object] = {"errors_format": errors_format, "chunk_size": chunk_size, "reader": reader, "writer": writer}
+    workers = max(1, min(int(workers), len(inputs)))
+
+    if workers == 1:
+        items = [_validate_one(input_file, output_dir, rules_override, options) for input_file in inputs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_validate_one, input_file, output_dir, rules_override, options)
+                for input_file in inputs
+            ]
+            items = [future.result() for future in futures]
+
+    summary = write_batch_summary(items, Path(output_dir) / BATCH_SUMMARY_NAME)
+    return BatchResult(items=items, summary=summary, seconds=time.perf_counter() - started)
+
+
+def main() -> int:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(
+        description="Valide un lot de templates DMF et genere un rapport par fichier plus un resume global.",
+    )
+    parser.add_argument("inputs", nargs="+", help="Fichiers, dossiers ou motifs glob (ex: 'exports/*.xlsx')")
+    parser.add_argument("--output", required=True, help="Dossier de sortie des rapports")
+    parser.add_argument("--rules", help="Fichier JSON de regles a appliquer a tous les fichiers")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS, help="Fichiers traites en parallele")
+    parser.add_argument("--errors-format", choices=["csv", "parquet", "arrow"])
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--reader", choices=["auto", *READER_ENGINES], help="Moteur de lecture Excel")
+    parser.add_argument("--writer", choices=["auto", *WRITER_ENGINES], help="Moteur d'ecriture Excel")
+    args = parser.parse_args()
+
+    rules_override = None
+    if args.rules:
+        rules_override = json.loads(Path(args.rules).read_text(encoding="utf-8"))
+
+    result = validate_batch(
+        args.inputs,
+        args.output,
+        rules_override,
+        workers=args.workers,
+        errors_format=args.errors_format,
+        chunk_size=args.chunk_size,
+        reader=args.reader,
+        writer=args.writer,
+    )
+    for item in result.items:
+        status = "OK" if item.ok else f"ERREUR: {item.error}"
+        print(f"{Path(item.input).name}: {status} ({item.seconds:.1f}s)")
+    print(f"Resume: {result.summary} ({len(result.items)} fichiers, {result.seconds:.1f}s)")
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
+
+__all__ = ["BatchItem", "BatchResult", "collect_inputs", "validate_batch"]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+ERROR_TABLE_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+
+def _import_pyarrow(table_format: str) -> Any:
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise ValueError(
+            f"Le format '{table_format}' necessite pyarrow (pip install pyarrow); utilisez 'csv' sinon."
+        ) from exc
+    return pyarrow
+
+
+def normalize_error_format(table_format: str) -> str:
+    normalized = str(table_format).strip().lower()
+    if normalized not in ERROR_TABLE_FORMATS:
+        raise ValueError(
+            f"Format d'erreurs inconnu '{table_format}' (attendu: {', '.join(ERROR_TABLE_FORMATS)})."
+        )
+    return normalized
+
+
+def error_table_path(input_file: str | Path, output_dir: str | Path, table_format: str) -> Path:
+    extension = ERROR_TABLE_FORMATS[normalize_error_format(table_format)]
+    return Path(output_dir) / f"{Path(input_file).stem} errors{extension}"
+
+
+class ErrorTableWriter:
+    """Write the long-format error records as CSV, Parquet or Arrow IPC.
+
+    Records are appended frame by frame (once for an in-memory validation,
+    once per chunk when streaming) and written in bulk, without going
+    through openpyxl. Parquet and Arrow need the optional ``pyarrow``
+    package; every batch shares the same schema, with ``Row`` as int64 and
+    the other columns as strings.
+    """
+
+    def __init__(self, output_path: str | Path, table_format: str, columns: list[str]) -> None:
+        table_format = normalize_error_format(table_format)
+        self.output_path = Path(output_path)
+        self.table_format = table_format
+        self.columns = columns
+        self.total_records = 0
+        self._started = False
+        self._writer: Optional[Any] = None
+        self._pyarrow: Optional[Any] = None
+        self._schema: Optional[Any] = None
+        if table_format != "csv":
+            self._pyarrow = _import_pyarrow(table_format)
+            pa = self._pyarrow
+            self._schema = pa.schema(
+                [(column, pa.int64() if column == "Row" else pa.string()) for column in columns]
+            )
+
+    def append(self, records: pd.DataFrame) -> None:
+        if self.table_format == "csv":
+            records.to_csv(
+                self.output_path,
+                mode="a" if self._started else "w",
+                header=not self._started,
+                index=False,
+                encoding="utf-8",
+            )
+        else:
+            self._write_batch(records)
+        self._started = True
+        self.total_records += len(records)
+
+    def _write_batch(self, records: pd.DataFrame) -> None:
+        pa = self._pyarrow
+        assert pa is not None
+        table = pa.Table.from_pandas(records, schema=self._schema, preserve_index=False)
+        if self._writer is None:
+            if self.table_format == "parquet":
+                self._writer = pa.parquet.ParquetWriter(self.output_path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self.output_path, self._schema)
+        self._writer.write_table(table)
+
+    def close(self) -> str:
+        if not self._started:
+            self.append(pd.DataFrame({column: [] for column in self.columns}).astype({"Row": "int64"}))
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return str(self.output_path)
+
+
+__all__ = ["ErrorTableWriter", "ERROR_TABLE_FORMATS", "error_table_path", "normalize_error_format"]
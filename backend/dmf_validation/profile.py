@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from backend.dmf_validation.validator import ErrorBatch, ValidationRule
+
+
+# Entry under which a rule is charged for stringifying and normalising its
+# field's column, which can cost more than the checks themselves.
+PREPARE_STEP = "Prepare"
+
+
+def profile_path(input_file: str | Path, output_dir: str | Path) -> Path:
+    return Path(output_dir) / f"{Path(input_file).stem} profile.json"
+
+
+@dataclass
+class CheckStats:
+    """Cumulative cost of one check of one rule."""
+
+    seconds: float = 0.0
+    evaluations: int = 0
+    failures: int = 0
+
+    def add(self, other: CheckStats) -> None:
+        self.seconds += other.seconds
+        self.evaluations += other.evaluations
+        self.failures += other.failures
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"seconds": round(self.seconds, 6), "evaluations": self.evaluations, "failures": self.failures}
+
+
+class RuleProfile:
+    """Time, evaluations and failures of every check of every rule.
+
+    ``evaluations`` counts the template rows a check looked at (rows already
+    failing ``Required`` are skipped by the other checks) and ``failures``
+    the errors it raised. Preparing the rule's column is recorded as a
+    ``Prepare`` entry; a column shared by several rules is built once and
+    charged to the first one. Profiles of the shards of a parallel evaluation,
+    or of the chunks of a streamed one, are merged with ``merge``, so
+    ``seconds`` is the time summed over every process.
+    """
+
+    def __init__(self) -> None:
+        self.checks: dict[str, dict[str, CheckStats]] = {}
+        self.definitions: dict[str, dict[str, Any]] = {}
+
+    def clock(self, rule: ValidationRule) -> CheckClock:
+        if rule.field not in self.definitions:
+            self.definitions[rule.field] = {
+                "allowed_values": rule.allowed_source,
+                "pattern": rule.pattern.pattern if rule.pattern else None,
+                "custom_rule": rule.custom_rule,
+            }
+        return CheckClock(self.checks.setdefault(rule.field, {}))
+
+    def merge(self, other: RuleProfile) -> None:
+        for field, definition in other.definitions.items():
+            self.definitions.setdefault(field, definition)
+        for field, checks in other.checks.items():
+            merged = self.checks.setdefault(field, {})
+            for kind, stats in checks.items():
+                merged.setdefault(kind, CheckStats()).add(stats)
+
+    def by_rule(self) -> list[dict[str, Any]]:
+        """One entry per rule with its checks, the most expensive first."""
+        rules = []
+        for field, checks in self.checks.items():
+            total = CheckStats()
+            for stats in checks.values():
+                total.add(stats)
+            rules.append(
+                {
+                    "field": field,
+                    **total.as_dict(),
+                    **self.definitions.get(field, {}),
+                    "checks": {kind: stats.as_dict() for kind, stats in checks.items()},
+                }
+            )
+        return sorted(rules, key=lambda entry: entry["seconds"], reverse=True)
+
+    def by_check(self) -> list[dict[str, Any]]:
+        """One entry per check type summed over the rules, the most expensive first."""
+        totals: dict[str, CheckStats] = {}
+        rule_counts: dict[str, int] = {}
+        for checks in self.checks.values():
+            for kind, stats in checks.items():
+                totals.setdefault(kind, CheckStats()).add(stats)
+                rule_counts[kind] = rule_counts.get(kind, 0) + 1
+        entries = [{"check": kind, "rules": rule_counts[kind], **stats.as_dict()} for kind, stats in totals.items()]
+        return sorted(entries, key=lambda entry: entry["seconds"], reverse=True)
+
+    def write(self, output_path: str | Path, rows: int) -> Path:
+        output_path = Path(output_path)
+        payload = {
+            "rows": rows,
+            "seconds": round(sum(entry["seconds"] for entry in self.by_check()), 6),
+            "checks": self.by_check(),
+            "rules": self.by_rule(),
+        }
+        output_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        return output_path
+
+
+class CheckClock:
+    """Times the successive checks of one rule: ``start()`` then ``stop(kind, ...)``."""
+
+    def __init__(self, checks: dict[str, CheckStats]) -> None:
+        self._checks = checks
+        self._started = time.perf_counter()
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+
+    def stop(self, kind: str, evaluated: Union[int, np.ndarray], batch: Optional[ErrorBatch] = None) -> None:
+        stats = self._checks.setdefault(kind, CheckStats())
+        stats.seconds += time.perf_counter() - self._started
+        stats.evaluations += int(np.count_nonzero(evaluated)) if isinstance(evaluated, np.ndarray) else int(evaluated)
+        stats.failures += len(batch.positions) if batch is not None else 0
+
+
+class _NullClock:
+    # Stands in for CheckClock when profiling is off, so the checks need no branches.
+
+    def start(self) -> None:
+        pass
+
+    def stop(self, kind: str, evaluated: Union[int, np.ndarray], batch: Optional[ErrorBatch] = None) -> None:
+        pass
+
+
+NULL_CLOCK = _NullClock()
+
+
+__all__ = ["PREPARE_STEP", "CheckStats", "RuleProfile", "profile_path"]
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import datetime
+import warnings
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+from backend.workbook import writer_engine
+
+RESULT_SHEET = "Result"
+SUMMARY_SHEET = "ErrorSummary"
+VALID_COLUMN = "Valid"
+CHECK_MARK = "OK"
+CROSS_MARK = "KO"
+
+DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+DATE_FORMAT = "YYYY-MM-DD"
+
+RESULT_TABLE = ("ValidationResult", "TableStyleMedium2")
+STATS_TABLE = ("GlobalStats", "TableStyleMedium9")
+FIELDS_TABLE = ("FieldErrors", "TableStyleMedium4")
+
+# Rows appended at a time by write_report, so that progress can be reported.
+WRITE_CHUNK_ROWS = 50_000
+
+# Builds the engine's cell for a value that needs a number format.
+Formatter = Callable[[object, str], object]
+
+
+def format_percentage(count: int, total: int) -> str:
+    return f"{round((count / total) * 100, 2)}%" if total else "0%"
+
+
+def _cell_value(formatted: Formatter, value: object) -> object:
+    """Convert a DataFrame value the way ``DataFrame.to_excel`` does."""
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    if pd.api.types.is_float(value) and np.isinf(value):
+        return "inf" if value > 0 else "-inf"
+    if pd.api.types.is_integer(value):
+        return int(value)
+    if pd.api.types.is_float(value):
+        return float(value)
+    if pd.api.types.is_bool(value):
+        return bool(value)
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            raise ValueError(
+                "Excel does not support datetimes with timezones. Please ensure that "
+                "datetimes are timezone unaware before writing to Excel."
+            )
+        return formatted(value, DATETIME_FORMAT)
+    if isinstance(value, datetime.date):
+        return formatted(value, DATE_FORMAT)
+    if isinstance(value, datetime.timedelta):
+        return formatted(value.total_seconds() / 86400, "0")
+    return str(value)
+
+
+def _column_cells(formatted: Formatter, series: pd.Series) -> list[object]:
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "iub":
+        return series.tolist()
+    return [_cell_value(formatted, value) for value in series.astype(object)]
+
+
+@dataclass
+class ValidationSummary:
+    """Row and per-field error counts of a validation, as its ErrorSummary sheet shows them."""
+
+    total_rows: int = 0
+    valid_rows: int = 0
+    field_errors: dict[str, int] = field(default_factory=dict)
+
+    def record(self, total_rows: int, valid_rows: int, field_errors: dict[str, int]) -> None:
+        self.total_rows = total_rows
+        self.valid_rows = valid_rows
+        self.field_errors = dict(field_errors)
+
+
+def read_review_summary(review_path: Union[str, Path]) -> tuple[int, int, dict[str, int]]:
+    """Total rows, valid rows and per-field error counts from a review's ErrorSummary sheet."""
+    workbook = load_workbook(review_path, read_only=True)
+    try:
+        rows = list(workbook[SUMMARY_SHEET].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+    metrics = {row[0]: row[1] for row in rows[1:4] if row}
+    field_errors = {str(row[0]): int(row[1] or 0) for row in rows[6:] if row and row[0] is not None}
+    return int(metrics.get("Total Rows") or 0), int(metrics.get("Valid Rows") or 0), field_errors
+
+
+def _summary_metrics(total_rows: int, valid_rows: int) -> list[tuple[str, object]]:
+    return [
+        ("Total Rows", total_rows),
+        ("Valid Rows", valid_rows),
+        ("% Valid", format_percentage(valid_rows, total_rows)),
+    ]
+
+
+def _add_table(sheet: object, name: str, ref: str, headers: Sequence[object], style: str) -> None:
+    # Write-only sheets cannot be read back, so the column headings are set
+    # here instead of being discovered from the cells when the file is saved;
+    # openpyxl warns about this requirement on every write-only table.
+    table = Table(displayName=name, ref=ref)
+    table.tableColumns = [
+        TableColumn(id=index, name=str(header)) for index, header in enumerate(headers, start=1)
+    ]
+    table.autoFilter = AutoFilter(ref=ref)
+    table.tableStyleInfo = TableStyleInfo(name=style, showRowStripes=True)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="In write-only mode you must add table columns manually")
+        sheet.add_table(table)
+
+
+class ReviewReportWriter:
+    """Write the review workbook in a single pass.
+
+    The ``Result`` sheet is streamed through an openpyxl write-only workbook,
+    so rows can be appended in several batches; ``close`` adds the
+    ``ErrorSummary`` sheet and the table definitions before saving once.
+    ``expected_rows`` is accepted for symmetry with
+    ``XlsxWriterReviewReportWriter`` and not needed here.
+    """
+
+    def __init__(self, output_path: str | Path, columns: Sequence[object], expected_rows: Optional[int] = None) -> None:
+        self.output_path = Path(output_path)
+        self.columns = [VALID_COLUMN, *columns]
+        self.total_rows = 0
+        self.valid_rows = 0
+        self._workbook = Workbook(write_only=True)
+        self._result_sheet = self._workbook.create_sheet(RESULT_SHEET)
+        self._result_sheet.append(self.columns)
+
+    def _formatted_cell(self, value: object, number_format: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(self._result_sheet, value=value)
+        cell.number_format = number_format
+        return cell
+
+    def append(self, frame: pd.DataFrame, valid_flags: Sequence[bool]) -> None:
+        columns = [[CHECK_MARK if flag else CROSS_MARK for flag in valid_flags]]
+        columns.extend(_column_cells(self._formatted_cell, frame.iloc[:, index]) for index in range(frame.shape[1]))
+        for row in zip(*columns):
+            self._result_sheet.append(row)
+        self.total_rows += len(frame)
+        self.valid_rows += sum(bool(flag) for flag in valid_flags)
+
+    def close(self, summary_df: pd.DataFrame) -> str:
+        result_end_col = get_column_letter(len(self.columns))
+        _add_table(
+            self._result_sheet,
+            RESULT_TABLE[0],
+            f"A1:{result_end_col}{self.total_rows + 1}",
+            self.columns,
+            RESULT_TABLE[1],
+        )
+
+        summary_sheet = self._workbook.create_sheet(SUMMARY_SHEET)
+        metrics = _summary_metrics(self.total_rows, self.valid_rows)
+        summary_sheet.append(["Metric", "Value"])
+        for metric in metrics:
+            summary_sheet.append(metric)
+        _add_table(summary_sheet, STATS_TABLE[0], "A1:B4", ["Metric", "Value"], STATS_TABLE[1])
+
+        start_row = len(metrics) + 3
+        summary_sheet.append([])
+        summary_sheet.append(list(summary_df.columns))
+        summary_columns = [_column_cells(self._formatted_cell, summary_df[column]) for column in summary_df.columns]
+        for row in zip(*summary_columns):
+            summary_sheet.append(row)
+        end_col = get_column_letter(len(summary_df.columns))
+        _add_table(
+            summary_sheet,
+            FIELDS_TABLE[0],
+            f"A{start_row}:{end_col}{start_row + len(summary_df)}",
+            list(summary_df.columns),
+            FIELDS_TABLE[1],
+        )
+
+        self._workbook.save(self.output_path)
+        return str(self.output_path)
+
+
+class _XlsxWriterCell:
+    __slots__ = ("value", "number_format")
+
+    def __init__(self, value: object, number_format: str) -> None:
+        self.value = value
+        self.number_format = number_format
+
+
+class XlsxWriterReviewReportWriter:
+    """``ReviewReportWriter`` on xlsxwriter.
+
+    Produces the same sheets, tables and cell values, faster on large
+    results. xlsxwriter cannot declare tables in its ``constant_memory``
+    mode, so the workbook is kept in memory until ``close``, which adds
+    every table once its rows are written. A table
+    with no data rows spans one empty row, as Excel needs at least one.
+    ``expected_rows``, when given, is checked against the rows appended.
+    """
+
+    def __init__(self, output_path: str | Path, columns: Sequence[object], expected_rows: Optional[int] = None) -> None:
+        import xlsxwriter
+
+        self.output_path = Path(output_path)
+        self.columns = [VALID_COLUMN, *columns]
+        self.expected_rows = expected_rows
+        self.total_rows = 0
+        self.valid_rows = 0
+        # openpyxl does not turn URL-like text into hyperlinks; strings
+        # starting with "=" are formulas with both engines.
+        self._workbook = xlsxwriter.Workbook(str(self.output_path), {"strings_to_urls": False})
+        self._formats: dict[str, Any] = {}
+        self._result_sheet = self._workbook.add_worksheet(RESULT_SHEET)
+
+    def _formatted_cell(self, value: object, number_format: str) -> _XlsxWriterCell:
+        return _XlsxWriterCell(value, number_format)
+
+    def _write_row(self, sheet: Any, row_index: int, row: Sequence[object]) -> None:
+        for column_index, value in enumerate(row):
+            if value is None:
+                continue
+            if isinstance(value, _XlsxWriterCell):
+                cell_format = self._formats.get(value.number_format)
+                if cell_format is None:
+                    cell_format = self._workbook.add_format({"num_format": value.number_format})
+                    self._formats[value.number_format] = cell_format
+                sheet.write(row_index, column_index, value.value, cell_format)
+            else:
+                sheet.write(row_index, column_index, value)
+
+    def _add_table(
+        self,
+        sheet: Any,
+        header_row: int,
+        headers: Sequence[object],
+        data_rows: int,
+        table: tuple[str, str],
+    ) -> None:
+        # add_table writes the header cells itself.
+        sheet.add_table(
+            header_row,
+            0,
+            header_row + max(data_rows, 1),
+            len(headers) - 1,
+            {
+                "name": table[0],
+                "style": table[1],
+                "columns": [{"header": str(header)} for header in headers],
+            },
+        )
+
+    def append(self, frame: pd.DataFrame, valid_flags: Sequence[bool]) -> None:
+        columns = [[CHECK_MARK if flag else CROSS_MARK for flag in valid_flags]]
+        columns.extend(_column_cells(self._formatted_cell, frame.iloc[:, index]) for index in range(frame.shape[1]))
+        for offset, row in enumerate(zip(*columns), start=self.total_rows + 1):
+            self._write_row(self._result_sheet, offset, row)
+        self.total_rows += len(frame)
+        self.valid_rows += sum(bool(flag) for flag in valid_flags)
+
+    def close(self, summary_df: pd.DataFrame) -> str:
+        if self.expected_rows is not None and self.total_rows != self.expected_rows:
+            self._workbook.close()
+            raise ValueError(f"Expected {self.expected_rows} result rows, got {self.total_rows}.")
+        self._add_table(self._result_sheet, 0, self.columns, self.total_rows, RESULT_TABLE)
+
+        summary_sheet = self._workbook.add_worksheet(SUMMARY_SHEET)
+        metrics = _summary_metrics(self.total_rows, self.valid_rows)
+        for offset, metric in enumerate(metrics, start=1):
+            self._write_row(summary_sheet, offset, metric)
+        self._add_table(summary_sheet, 0, ["Metric", "Value"], len(metrics), STATS_TABLE)
+
+        start_row = len(metrics) + 2
+        summary_columns = [_column_cells(self._formatted_cell, summary_df[column]) for column in summary_df.columns]
+        for offset, row in enumerate(zip(*summary_columns), start=start_row + 1):
+            self._write_row(summary_sheet, offset, row)
+        self._add_table(summary_sheet, start_row, list(summary_df.columns), len(summary_df), FIELDS_TABLE)
+
+        self._workbook.close()
+        return str(self.output_path)
+
+
+ReportWriter = Union[ReviewReportWriter, XlsxWriterReviewReportWriter]
+
+
+def open_report_writer(
+    output_path: str | Path,
+    columns: Sequence[object],
+    expected_rows: Optional[int] = None,
+    engine: Optional[str] = None,
+    streaming: bool = False,
+) -> ReportWriter:
+    """The review writer for ``engine`` (see ``writer_engine``).
+
+    With ``streaming``, appended rows must go to disk rather than stay in
+    memory, which only the openpyxl writer does, so it is used whatever
+    ``engine`` is.
+    """
+    if writer_engine(engine) == "xlsxwriter" and not streaming:
+        return XlsxWriterReviewReportWriter(output_path, columns, expected_rows)
+    return ReviewReportWriter(output_path, columns)
+
+
+def write_report(
+    output_path: str | Path,
+    result_df: pd.DataFrame,
+    summary_df: pd.DataFrame,
+    valid_flags: Sequence[bool],
+    engine: Optional[str] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> str:
+    """Write a whole review; ``progress`` is called with the rows written so far."""
+    writer = open_report_writer(output_path, list(result_df.columns), len(result_df), engine)
+    for start in range(0, max(len(result_df), 1), WRITE_CHUNK_ROWS):
+        end = start + WRITE_CHUNK_ROWS
+        writer.append(result_df.iloc[start:end], valid_flags[start:end])
+        if progress is not None:
+            progress(writer.total_rows)
+    return writer.close(summary_df)
+
+
+__all__ = [
+    "ReviewReportWriter",
+    "ValidationSummary",
+    "XlsxWriterReviewReportWriter",
+    "format_percentage",
+    "open_report_writer",
+    "read_review_summary",
+    "write_report",
+]
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import stat
+import tempfile
+import warnings
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+# Bump when the validation engine changes what it writes, so stale reports
+# are not served after an upgrade.
+CACHE_VERSION = "1"
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_READ_BLOCK = 1024 * 1024
+
+
+def hash_file(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(_READ_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(item.stat().st_size for item in entry.rglob("*") if item.is_file())
+
+
+def evict_least_recent(directory: Path, max_entries: int, max_bytes: int) -> None:
+    """Remove the oldest entry directories (by mtime) beyond either limit."""
+    entries: list[tuple[float, int, Path]] = []
+    for entry in directory.iterdir():
+        if not entry.is_dir() or entry.name.startswith(".tmp-"):
+            continue
+        try:
+            entries.append((entry.stat().st_mtime, _entry_size(entry), entry))
+        except OSError:
+            continue
+
+    entries.sort(key=lambda item: item[0], reverse=True)
+    kept_bytes = 0
+    for index, (_, size, entry) in enumerate(entries):
+        kept_bytes += size
+        if index >= max_entries or kept_bytes > max_bytes:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def private_directory(directory: Path) -> bool:
+    """Create ``directory`` with mode 0700, or check that the existing one is.
+
+    Stores that load pickles live under the service's shared temporary
+    directory, where another local user could create the directory first
+    and plant entries. They are only used when the directory is a real
+    directory (not a symlink) owned by the current user with no group or
+    other permissions; otherwise this warns and returns False.
+    """
+    try:
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        info = os.lstat(directory)
+    except OSError:
+        return False
+    private = stat.S_ISDIR(info.st_mode) and not stat.S_IMODE(info.st_mode) & 0o077
+    if hasattr(os, "getuid"):
+        private = private and info.st_uid == os.getuid()
+    if not private:
+        warnings.warn(
+            f"Cache directory '{directory}' is not private to this user (owner and mode 0700); cache disabled.",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    return private
+
+
+def load_pickle(path: Path) -> Optional[Any]:
+    """Load a pickled cache entry; None on any failure, so a missing, truncated
+    or stale entry (written by an older class layout) is just a miss."""
+    try:
+        with open(path, "rb") as stream:
+            return pickle.load(stream)
+    except Exception:  # noqa: BLE001
+        return None
+
+
+class ResultCache:
+    """On-disk cache of validation outputs, keyed by input content and options.
+
+    Each entry is a directory holding the files a validation produced
+    (the review workbook, and the error table when one was requested),
+    stored under a role name such as ``review``. Entries are written to a
+    temporary directory and renamed into place, so several worker processes
+    can share the cache. Hits refresh the entry's mtime; after each store
+    the least recently used entries are evicted until both ``max_entries``
+    and ``max_bytes`` hold. Like the other stores under the temporary
+    directory, the cache is only read or written when its directory is
+    private (see ``private_directory``).
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def key(self, input_digest: str, options: Mapping[str, object]) -> str:
+        """Hash of the input digest (see ``hash_file``) plus the JSON-serialised ``options``."""
+        digest = hashlib.sha256()
+        digest.update(CACHE_VERSION.encode("utf-8"))
+        digest.update(input_digest.encode("ascii"))
+        digest.update(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / key
+
+    def restore(self, key: str, targets: Mapping[str, Path]) -> bool:
+        """Copy a cached entry to ``targets`` (role -> path); False on a miss."""
+        if not private_directory(self.directory):
+            return False
+        entry = self._entry(key)
+        try:
+            for role, target in targets.items():
+                source = entry / role
+                shutil.copyfile(source, target)
+            os.utime(entry)
+        except OSError:
+            # Missing, partially evicted or concurrently replaced entry.
+            return False
+        return True
+
+    def discard(self, key: str) -> None:
+        """Remove an entry that turned out to be unreadable, so the next store replaces it."""
+        shutil.rmtree(self._entry(key), ignore_errors=True)
+
+    def store(self, key: str, sources: Mapping[str, Path]) -> None:
+        if not private_directory(self.directory):
+            return
+        staging = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.directory))
+        try:
+            for role, source in sources.items():
+                shutil.copyfile(source, staging / role)
+            try:
+                os.replace(staging, self._entry(key))
+            except OSError:
+                # Another worker stored the same entry first.
+                return
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def evict(self) -> None:
+        evict_least_recent(self.directory, self.max_entries, self.max_bytes)
+
+
+def cache_from_env(directory: str | Path) -> Optional[ResultCache]:
+    """The cache configured by ``PYTHON_CACHE_MAX_ENTRIES``/``PYTHON_CACHE_MAX_MB``; None when disabled."""
+    max_entries = int(os.environ.get("PYTHON_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+    max_bytes = int(float(os.environ.get("PYTHON_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024))) * 1024 * 1024)
+    if max_entries <= 0 or max_bytes <= 0:
+        return None
+    return ResultCache(directory, max_entries, max_bytes)
+
+
+__all__ = ["ResultCache", "cache_from_env", "evict_least_recent", "hash_file", "load_pickle", "private_directory"]
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+from backend.dmf_validation.result_cache import evict_least_recent, load_pickle, private_directory
+
+# Bump when the parsed template or the per-rule results change shape.
+STATE_VERSION = "1"
+
+DEFAULT_MAX_TEMPLATES = 8
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+TEMPLATE_FILE = "template.pkl"
+RULES_DIR = "rules"
+
+
+def _write_atomic(path: Path, payload: Any) -> None:
+    # Best effort: the state may have been evicted by another worker meanwhile.
+    try:
+        handle, staging = tempfile.mkstemp(prefix=".tmp-", dir=path.parent)
+    except OSError:
+        return
+    try:
+        with os.fdopen(handle, "wb") as stream:
+            pickle.dump(payload, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(staging, path)
+    except OSError:
+        Path(staging).unlink(missing_ok=True)
+    except BaseException:
+        Path(staging).unlink(missing_ok=True)
+        raise
+
+
+class TemplateState:
+    """What was computed for one workbook: its parsed template and per-rule results.
+
+    Rule results are stored under a signature of the rule definition, so a
+    rule that did not change between two validations of the same workbook
+    is not evaluated again.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._rules_dir = directory / RULES_DIR
+        self._rules_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        os.utime(directory)
+
+    def load_template(self) -> Optional[pd.DataFrame]:
+        return load_pickle(self.directory / TEMPLATE_FILE)
+
+    def save_template(self, template_df: pd.DataFrame) -> None:
+        _write_atomic(self.directory / TEMPLATE_FILE, template_df)
+
+    def _rule_path(self, signature: str) -> Path:
+        return self._rules_dir / f"{hashlib.sha256(signature.encode('utf-8')).hexdigest()}.pkl"
+
+    def load_rule(self, signature: str) -> Optional[Any]:
+        return load_pickle(self._rule_path(signature))
+
+    def save_rule(self, signature: str, results: Any) -> None:
+        _write_atomic(self._rule_path(signature), results)
+
+
+class RevalidationCache:
+    """Per-workbook ``TemplateState`` directories, keyed by the input digest.
+
+    The store holds pickles, so it is only used when its directory is
+    private to the service (see ``private_directory``): ``state`` returns
+    None otherwise and the validation runs without it. The least recently
+    used workbooks are evicted beyond ``max_templates`` or ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_templates: int = DEFAULT_MAX_TEMPLATES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_templates = max_templates
+        self.max_bytes = max_bytes
+
+    def state(self, input_digest: str) -> Optional[TemplateState]:
+        if not private_directory(self.directory):
+            return None
+        state = TemplateState(self.directory / f"{STATE_VERSION}-{input_digest}")
+        evict_least_recent(self.directory, self.max_templates, self.max_bytes)
+        return state
+
+
+def revalidation_from_env(directory: str | Path) -> Optional[RevalidationCache]:
+    """The store configured by ``PYTHON_REVALIDATION_MAX_TEMPLATES``; None when set to 0."""
+    max_templates = int(os.environ.get("PYTHON_REVALIDATION_MAX_TEMPLATES", DEFAULT_MAX_TEMPLATES))
+    if max_templates <= 0:
+        return None
+    return RevalidationCache(directory, max_templates)
+
+
+__all__ = ["RevalidationCache", "TemplateState", "revalidation_from_env"]
@@ -2,25 +2,53 @@ from __future__ import annotations
 
 
 
+import dataclasses
+
+import hashlib
+
+import json
+
 import os
 
+import pickle
+
 import re
 
+from collections import Counter
+
+from concurrent.futures import ProcessPoolExecutor
+
 from dataclasses import dataclass
 
 from pathlib import Path
 
-from typing import Dict, Iterable, Optional, Pattern
+from typing import Callable, Iterable, Mapping, Optional, Pattern, Sequence, Union
 
 
 
+import numpy as np
+
 import pandas as pd
 
-from openpyxl import load_workbook
+from backend.dmf_validation.error_table import ErrorTableWriter, error_table_path, normalize_error_format
+from backend.dmf_validation.profile import NULL_CLOCK, PREPARE_STEP, RuleProfile, profile_path
+
+from backend.dmf_validation.report import (
+    ValidationSummary,
+    format_percentage,
+    open_report_writer,
+    read_review_summary,
+    write_report,
+)
+
+from backend.dmf_validation.result_cache import ResultCache, hash_file
 
-from openpyxl.utils import get_column_letter
+from backend.dmf_validation.revalidation import RevalidationCache, TemplateState
+from backend.instrumentation import PhaseTimings
 
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from backend.sheet_cache import SheetCache
+
+from backend.workbook import READER_ENGINES, WRITER_ENGINES, SheetStream, WorkbookSession, reader_engine, writer_engine
 
 
 
@@ -28,9 +56,25 @@ TEMPLATE_SHEET = "Template"
 
 RULES_SHEET = "ValidationRules"
 
-CHECK_MARK = "OK"
+DEFAULT_CHUNK_SIZE = 50_000
 
-CROSS_MARK = "KO"
+# Below this many rows per shard, process start-up and pickling outweigh the gain.
+MIN_ROWS_PER_SHARD = 5_000
+
+
+
+
+
+@dataclass
+class EqualsIndex:
+    """Reference lookups for an ``equals:<template field>;<reference column>`` rule."""
+
+    template_field: str
+    ref_column: str
+    sheet_name: str
+    join_column: Optional[str]
+    allowed_by_key: dict[str, set[str]] = dataclasses.field(default_factory=dict)
+    owners_by_value: dict[str, set[str]] = dataclasses.field(default_factory=dict)
 
 
 
@@ -57,6 +101,7 @@ class ValidationRule:
     pattern: Optional[Pattern[str]]
 
     custom_rule: Optional[str]
+    equals_index: Optional[EqualsIndex] = None
 
 
 
@@ -106,16 +151,16 @@ def parse_int(value: object) -> Optional[int]:
 
 
 
-def load_template(input_file: str) -> pd.DataFrame:
+def load_template(workbook: WorkbookSession) -> pd.DataFrame:
 
-    return pd.read_excel(input_file, sheet_name=TEMPLATE_SHEET)
+    return workbook.sheet(TEMPLATE_SHEET)
 
 
 
 
 
-def load_validation_rules(input_file: str, override: Optional[pd.DataFrame] = None) -> tuple[dict[str, ValidationRule], dict[str, pd.DataFrame]]:
-    rules_df = override if override is not None else pd.read_excel(input_file, sheet_name=RULES_SHEET)
+def load_validation_rules(workbook: WorkbookSession, override: Optional[pd.DataFrame] = None) -> tuple[dict[str, ValidationRule], dict[str, pd.DataFrame]]:
+    rules_df = override if override is not None else workbook.sheet(RULES_SHEET)
 
 
     reference_cache: dict[str, pd.DataFrame] = {}
@@ -162,13 +207,7 @@ def load_validation_rules(input_file: str, override: Optional[pd.DataFrame] = No
 
                 sheet_name = allowed_source[len("SHEET=") :].strip()
 
-                ref_df = reference_cache.get(sheet_name)
-
-                if ref_df is None:
-
-                    ref_df = pd.read_excel(input_file, sheet_name=sheet_name)
-
-                    reference_cache[sheet_name] = ref_df
+                ref_df = fetch_reference_sheet(workbook, reference_cache, sheet_name)
 
 
 
@@ -210,6 +249,14 @@ def load_validation_rules(input_file: str, override: Optional[pd.DataFrame] = No
 
 
 
+        custom_rule = str(row.get("CustomRule", "")).strip() or None
+        equals_index: Optional[EqualsIndex] = None
+        if custom_rule and custom_rule.lower().startswith("equals:") and allowed_source and allowed_source.upper().startswith("SHEET="):
+            sheet_name = allowed_source[len("SHEET=") :].strip()
+            equals_index = build_equals_index(custom_rule, sheet_name, reference_cache[sheet_name])
+
+
+
         pattern_value = row.get("Pattern")
 
         compiled_pattern = re.compile(str(pattern_value)) if isinstance(pattern_value, str) and pattern_value else None
@@ -234,7 +281,8 @@ def load_validation_rules(input_file: str, override: Optional[pd.DataFrame] = No
 
             pattern=compiled_pattern,
 
-            custom_rule=str(row.get("CustomRule", "")).strip() or None,
+            custom_rule=custom_rule,
+            equals_index=equals_index,
 
         )
 
@@ -248,7 +296,7 @@ def load_validation_rules(input_file: str, override: Optional[pd.DataFrame] = No
 
 def fetch_reference_sheet(
 
-    input_file: str,
+    workbook: WorkbookSession,
 
     cache: dict[str, pd.DataFrame],
 
@@ -260,7 +308,7 @@ def fetch_reference_sheet(
 
     if sheet is None:
 
-        sheet = pd.read_excel(input_file, sheet_name=sheet_name)
+        sheet = workbook.sheet(sheet_name)
 
         cache[sheet_name] = sheet
 
@@ -270,277 +318,584 @@ def fetch_reference_sheet(
 
 
 
-def evaluate_equals_rule(
-
-    rule: ValidationRule,
-
-    row: pd.Series,
-
-    input_file: str,
-
-    reference_cache: Dict[str, pd.DataFrame],
-
-) -> Iterable[str]:
-
-    errors: list[str] = []
-
-    custom_rule = rule.custom_rule or ""
-
-    if not custom_rule.lower().startswith("equals:"):
-
-        return errors
-
-
-
+def build_equals_index(custom_rule: str, sheet_name: str, ref_df: pd.DataFrame) -> Optional[EqualsIndex]:
     _, _, payload = custom_rule.partition(":")
-
     if ";" not in payload:
-
-        return errors
-
-
+        return None
 
     template_field, ref_column = [part.strip() for part in payload.split(";", 1)]
-
-    join_key_value = str(row.get(rule.field, "")).strip()
-
-    actual_value = str(row.get(template_field, "")).strip().upper()
-
-
-
-    allowed_source = rule.allowed_source or ""
-
-    if not allowed_source.upper().startswith("SHEET="):
-
-        return errors
-
-
-
-    sheet_name = allowed_source[len("SHEET=") :].strip()
-
-    ref_df = fetch_reference_sheet(input_file, reference_cache, sheet_name)
-
-
-
     join_columns = [
-
         column for column in ref_df.columns if normalize(column) == normalize(sheet_name)
-
     ]
-
-    if not join_columns:
-
-        return [
-
-            f"Aucune colonne correspondant a '{sheet_name}' dans la feuille '{sheet_name}'."
-
-        ]
-
-
-
-    join_column = join_columns[0]
-
-    matching_rows = ref_df[ref_df[join_column].astype(str).str.strip() == join_key_value]
-
-
-
-    if matching_rows.empty or ref_column not in ref_df.columns:
-
-        return [
-
-            f"Valeur '{join_key_value}' introuvable ou colonne '{ref_column}' absente dans '{sheet_name}'."
-
-        ]
-
-
-
-    allowed_values: set[str] = set()
-
-    for _, ref_row in matching_rows.iterrows():
-
-        cell_value = ref_row.get(ref_column)
-
+    index = EqualsIndex(
+        template_field=template_field,
+        ref_column=ref_column,
+        sheet_name=sheet_name,
+        join_column=join_columns[0] if join_columns else None,
+    )
+    if index.join_column is None or ref_column not in ref_df.columns:
+        return index
+
+    # Keys are matched on the column as text, while cell values keep the
+    # row-wise representation of the reference sheet.
+    row_dtype = _row_dtype(ref_df)
+    ref_rows = ref_df.astype(row_dtype) if row_dtype is not None else ref_df
+    lookup_keys = ref_df[index.join_column].astype(str).str.strip()
+    owner_keys = [str(value).strip() for value in ref_rows[index.join_column]]
+
+    for lookup_key, owner_key, cell_value in zip(lookup_keys, owner_keys, ref_rows[ref_column]):
+        allowed_values = index.allowed_by_key.setdefault(lookup_key, set())
         if pd.isna(cell_value):
-
             continue
-
         for candidate in str(cell_value).split(";"):
-
             candidate = candidate.strip().upper()
-
             if candidate:
-
                 allowed_values.add(candidate)
+                index.owners_by_value.setdefault(candidate, set()).add(owner_key)
+
+    return index
+
+
+def referenced_sheets(rules_df: pd.DataFrame) -> list[str]:
+    """Names of the reference sheets a rules frame points to with ``SHEET=``."""
+    names: list[str] = []
+    if "AllowedValues" not in rules_df.columns:
+        return names
+    for value in rules_df["AllowedValues"]:
+        if isinstance(value, str) and value.strip().upper().startswith("SHEET="):
+            name = value.strip()[len("SHEET=") :].strip()
+            if name not in names:
+                names.append(name)
+    return names
+
+def _frame_fingerprint(frame: pd.DataFrame) -> bytes:
+    # Pickled values rather than hash_pandas_object, which hashes object
+    # columns by their text and would not tell 1 from "1".
+    payload = (
+        [(str(column), str(dtype)) for column, dtype in frame.dtypes.items()],
+        [frame[column].to_numpy(dtype=object) for column in frame.columns],
+    )
+    return hashlib.sha256(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)).digest()
+
+class RuleSetCache:
+    """Rule sets shared by workbooks with identical rules and reference sheets.
+
+    The rules frame and its ``SHEET=`` reference sheets are still parsed for
+    every workbook (they are small), but a rule set built from the same
+    content, with its allowed-value sets and ``equals`` indexes, is reused
+    instead of being rebuilt. The rule objects are never mutated by the
+    evaluation, so they can be shared.
+    """
+
+    def __init__(self, max_entries: int = 16) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self._rule_sets: dict[str, dict[str, ValidationRule]] = {}
+
+    def load(self, workbook: WorkbookSession, override: Optional[pd.DataFrame] = None) -> dict[str, ValidationRule]:
+        rules_df = override if override is not None else workbook.sheet(RULES_SHEET)
+        digest = hashlib.sha256(_frame_fingerprint(rules_df))
+        for sheet_name in referenced_sheets(rules_df):
+            digest.update(sheet_name.encode("utf-8"))
+            if workbook.has_sheet(sheet_name):
+                digest.update(_frame_fingerprint(workbook.sheet(sheet_name)))
+        key = digest.hexdigest()
+
+        rules = self._rule_sets.pop(key, None)
+        if rules is not None:
+            self.hits += 1
+        else:
+            rules, _ = load_validation_rules(workbook, override)
+        self._rule_sets[key] = rules
+        while len(self._rule_sets) > self.max_entries:
+            self._rule_sets.pop(next(iter(self._rule_sets)))
+        return rules
+
+    def clear(self) -> None:
+        self._rule_sets.clear()
+
+def evaluate_equals_rule(rule: ValidationRule, row: Mapping[str, object]) -> Iterable[str]:
+    index = rule.equals_index
+    if index is None:
+        return []
 
+    join_key_value = str(row.get(rule.field, "")).strip()
+    actual_value = str(row.get(index.template_field, "")).strip().upper()
 
+    if index.join_column is None:
+        return [
+            f"Aucune colonne correspondant a '{index.sheet_name}' dans la feuille '{index.sheet_name}'."
+        ]
 
-    if actual_value and actual_value not in allowed_values:
+    allowed_values = index.allowed_by_key.get(join_key_value)
+    if allowed_values is None:
+        return [
+            f"Valeur '{join_key_value}' introuvable ou colonne '{index.ref_column}' absente dans '{index.sheet_name}'."
+        ]
 
+    if actual_value and actual_value not in allowed_values:
         formatted_allowed = ", ".join(sorted(allowed_values)) or "(aucune valeur declaree)"
-
-        errors.append(
-
-            f"'{template_field}' doit etre egal a une valeur de '{ref_column}' pour '{rule.field}'='{join_key_value}'."
-
+        return [
+            f"'{index.template_field}' doit etre egal a une valeur de '{index.ref_column}' pour '{rule.field}'='{join_key_value}'."
             f" Valeurs attendues: {formatted_allowed}."
+        ]
 
-        )
-
-        return errors
-
-
-
-    other_values: set[str] = set()
-
-    for _, ref_row in ref_df.iterrows():
-
-        if str(ref_row.get(join_column)).strip() == join_key_value:
-
-            continue
-
-        cell_value = ref_row.get(ref_column)
-
-        if pd.isna(cell_value):
-
-            continue
+    owners = index.owners_by_value.get(actual_value, ())
+    if actual_value and any(owner != join_key_value for owner in owners):
+        return [
+            f"'{index.template_field}'='{actual_value}' est deja utilise dans un autre groupe de '{index.ref_column}'."
+        ]
 
-        for candidate in str(cell_value).split(";"):
+    return []
 
-            candidate = candidate.strip().upper()
 
-            if candidate:
 
-                other_values.add(candidate)
 
 
+# Rule kinds attached to error records, named after the ValidationRules columns.
+REQUIRED_CHECK = "Required"
+MIN_LENGTH_CHECK = "MinLength"
+MAX_LENGTH_CHECK = "MaxLength"
+ALLOWED_VALUES_CHECK = "AllowedValues"
+PATTERN_CHECK = "Pattern"
+UNIQUE_CHECK = "Unique"
+EQUALS_CHECK = "Equals"
 
-    if actual_value and actual_value in other_values:
+ERROR_RECORD_COLUMNS = ["Row", "Field", "Rule", "Message", "Value"]
 
-        errors.append(
+@dataclass
+class ErrorBatch:
+    """Error messages raised by one check of a field, keyed by template row position."""
 
-            f"'{template_field}'='{actual_value}' est deja utilise dans un autre groupe de '{ref_column}'."
+    field: str
+    kind: str
+    positions: np.ndarray
+    messages: np.ndarray
+    values: np.ndarray
 
+@dataclass
+class TemplateErrors:
+    """Validation outcome of a template: one record per error, plus the joined messages per row."""
+
+    messages: list[str]
+    rows: np.ndarray
+    fields: np.ndarray
+    kinds: np.ndarray
+    details: np.ndarray
+    values: np.ndarray
+
+    @property
+    def valid_flags(self) -> list[bool]:
+        return [not message for message in self.messages]
+
+    def records(self, row_offset: int = 0) -> pd.DataFrame:
+        """The error records in long format, one row per error.
+
+        ``Row`` is the 0-based position of the template row (shifted by
+        ``row_offset`` for a chunk) and ``Value`` the offending cell as text.
+        """
+        return pd.DataFrame(
+            {
+                "Row": self.rows + row_offset,
+                "Field": self.fields,
+                "Rule": self.kinds,
+                "Message": self.details,
+                "Value": self.values,
+            },
+            columns=ERROR_RECORD_COLUMNS,
         )
 
+    def field_counts(self, fields: Iterable[str]) -> dict[str, int]:
+        """Number of rows with at least one error on each of ``fields``."""
+        counts = dict.fromkeys(fields, 0)
+        if len(self.rows):
+            failing = pd.DataFrame({"field": self.fields, "row": self.rows}).drop_duplicates()
+            for field, errors_count in failing["field"].value_counts().items():
+                if field in counts:
+                    counts[field] = int(errors_count)
+        return counts
 
 
-    return errors
-
-
-
-
-
-def evaluate_unique_rule(field: str, row_value: str, counts: dict[str, int]) -> Optional[str]:
-
-    if counts.get(field, 0) > 1:
-
-        return f"'{field}'='{row_value}' n'est pas unique dans la colonne"
+@dataclass
+class FieldColumn:
+    raw: pd.Series
+    text: pd.Series
+    present: bool
+
+
+class TemplateColumns:
+    """Stringified template columns, built once per field and shared by every rule."""
+
+    def __init__(self, template_df: pd.DataFrame) -> None:
+        self._df = template_df
+        self._row_dtype = _row_dtype(template_df)
+        self._blank_rows = _blank_dated_rows(template_df)
+        self._cache: dict[str, FieldColumn] = {}
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    def get(self, field: str) -> FieldColumn:
+        column = self._cache.get(field)
+        if column is None:
+            column = self._build(field)
+            self._cache[field] = column
+        return column
+
+    def _build(self, field: str) -> FieldColumn:
+        total_rows = len(self._df)
+        if field not in self._df.columns:
+            return FieldColumn(
+                raw=pd.Series(["None"] * total_rows, dtype=object),
+                text=pd.Series([""] * total_rows, dtype=object),
+                present=False,
+            )
 
+        series = self._df[field]
+        if self._row_dtype is not None:
+            series = series.astype(self._row_dtype)
+        values = series.astype(object).to_numpy()
+        raw = pd.Series([str(value) for value in values], dtype=object)
+        if self._blank_rows is not None:
+            raw[self._blank_rows] = "NaT"
+        text = raw.where(~pd.isna(values), "").str.strip()
+        return FieldColumn(raw=raw, text=text, present=True)
+
+
+def _row_dtype(df: pd.DataFrame) -> Optional[np.dtype]:
+    # Purely numeric templates are upcast to a common dtype when read row by row
+    # (e.g. ints become floats next to a float column); keep messages identical.
+    dtypes = list(df.dtypes)
+    if dtypes and all(isinstance(dtype, np.dtype) and dtype.kind in "iuf" for dtype in dtypes):
+        return np.result_type(*dtypes)
     return None
 
 
+def _blank_dated_rows(df: pd.DataFrame) -> Optional[np.ndarray]:
+    # Read row by row, an entirely blank row of a template with a date column
+    # is inferred as a datetime row, so every blank cell shows as NaT.
+    if not any(isinstance(dtype, np.dtype) and dtype.kind == "M" for dtype in df.dtypes):
+        return None
+    blank = df.isna().all(axis=1).to_numpy()
+    return blank if blank.any() else None
+
+
+def _filled(length: int, value: object) -> np.ndarray:
+    # np.full would store a separate copy of a str value in every cell.
+    values = np.empty(length, dtype=object)
+    values.fill(value)
+    return values
+
+def _error_batch(
+    field: str,
+    kind: str,
+    mask: np.ndarray,
+    messages: Union[str, Sequence[str]],
+    values: pd.Series,
+) -> ErrorBatch:
+    positions = np.flatnonzero(mask)
+    if isinstance(messages, str):
+        message_array = _filled(len(positions), messages)
+    else:
+        message_array = np.asarray(messages, dtype=object).reshape(len(positions))
+    return ErrorBatch(
+        field=field,
+        kind=kind,
+        positions=positions,
+        messages=message_array,
+        values=values.to_numpy(dtype=object)[positions],
+    )
 
 
-
-def evaluate_row(
-
-    row: pd.Series,
-
-    rules: dict[str, ValidationRule],
-
+def evaluate_equals_column(
+    rule: ValidationRule,
+    columns: TemplateColumns,
+    active: np.ndarray,
+) -> Optional[ErrorBatch]:
+    if rule.equals_index is None:
+        return None
+    template_field = rule.equals_index.template_field
+
+    key_column = columns.get(rule.field)
+    value_column = columns.get(template_field)
+    keys = key_column.raw if key_column.present else pd.Series([""] * len(columns), dtype=object)
+    values = value_column.raw if value_column.present else pd.Series([""] * len(columns), dtype=object)
+
+    messages = np.full(len(columns), None, dtype=object)
+    pairs = pd.DataFrame({"key": keys, "value": values})[active]
+    for (key, value), positions in pairs.groupby(["key", "value"], sort=False).indices.items():
+        row: dict[str, object] = {}
+        if key_column.present:
+            row[rule.field] = key
+        if value_column.present:
+            row[template_field] = value
+        errors = list(evaluate_equals_rule(rule, row))
+        if errors:
+            messages[pairs.index[positions]] = "; ".join(errors)
+
+    failed = pd.notna(messages)
+    offending = value_column.text if value_column.present else pd.Series([""] * len(columns), dtype=object)
+    return _error_batch(rule.field, EQUALS_CHECK, failed, messages[failed], offending)
+
+
+def evaluate_rule_column(
+    rule: ValidationRule,
+    columns: TemplateColumns,
     unique_counts: dict[str, dict[str, int]],
-
-    input_file: str,
-
-    reference_cache: dict[str, pd.DataFrame],
-
-) -> list[str]:
-
-    errors: list[str] = []
-
-
-
-    for field, rule in rules.items():
-
-        value = row.get(field)
-
-        value_str = "" if pd.isna(value) else str(value).strip()
-
-
-
-        if not rule.checked:
-
-            continue
-
-
-
-        if rule.required and not value_str:
-
-            errors.append(f"{field} est requis")
-
-            continue
-
-
-
-        if rule.min_length is not None and len(value_str) < rule.min_length:
-
-            errors.append(f"{field} trop court ({len(value_str)} < {rule.min_length})")
-
-
-
-        if rule.max_length is not None and len(value_str) > rule.max_length:
-
-            errors.append(f"{field} trop long ({len(value_str)} > {rule.max_length})")
-
-
-
-        if rule.allowed_values is not None and value_str.upper() not in rule.allowed_values:
-
-            errors.append(f"Valeur invalide '{value}' pour {field}")
-
-
-
-        if rule.pattern and value_str and not rule.pattern.fullmatch(value_str):
-
-            errors.append(f"{field} ne respecte pas le motif {rule.pattern.pattern}")
-
-
-
-        if rule.custom_rule:
-
-            custom = rule.custom_rule.strip().lower()
-
-            if custom == "unique":
-
-                unique_error = evaluate_unique_rule(
-
+    profile: Optional[RuleProfile] = None,
+) -> list[ErrorBatch]:
+    batches: list[ErrorBatch] = []
+    if not rule.checked:
+        return batches
+
+    field = rule.field
+    # Started first, so building the column is charged to the rule too.
+    clock = profile.clock(rule) if profile is not None else NULL_CLOCK
+    column = columns.get(field)
+    text = column.text
+    active = np.ones(len(columns), dtype=bool)
+    clock.stop(PREPARE_STEP, len(columns))
+
+    if rule.required:
+        clock.start()
+        missing = (text == "").to_numpy()
+        batches.append(_error_batch(field, REQUIRED_CHECK, missing, f"{field} est requis", text))
+        active &= ~missing
+        clock.stop(REQUIRED_CHECK, len(columns), batches[-1])
+
+    if rule.min_length is not None or rule.max_length is not None:
+        clock.start()
+        lengths = text.str.len().to_numpy()
+        if rule.min_length is not None:
+            failed = active & (lengths < rule.min_length)
+            batches.append(
+                _error_batch(
                     field,
-
-                    value_str,
-
-                    unique_counts.get(field, {}),
-
+                    MIN_LENGTH_CHECK,
+                    failed,
+                    [f"{field} trop court ({length} < {rule.min_length})" for length in lengths[failed]],
+                    text,
                 )
-
-                if unique_error:
-
-                    errors.append(unique_error)
-
-            elif custom.startswith("equals:"):
-
-                errors.extend(
-
-                    evaluate_equals_rule(rule, row, input_file, reference_cache)
-
+            )
+            clock.stop(MIN_LENGTH_CHECK, active, batches[-1])
+            clock.start()
+        if rule.max_length is not None:
+            failed = active & (lengths > rule.max_length)
+            batches.append(
+                _error_batch(
+                    field,
+                    MAX_LENGTH_CHECK,
+                    failed,
+                    [f"{field} trop long ({length} > {rule.max_length})" for length in lengths[failed]],
+                    text,
                 )
+            )
+            clock.stop(MAX_LENGTH_CHECK, active, batches[-1])
+
+    if rule.allowed_values is not None:
+        clock.start()
+        failed = active & ~text.str.upper().isin(rule.allowed_values).to_numpy()
+        batches.append(
+            _error_batch(
+                field,
+                ALLOWED_VALUES_CHECK,
+                failed,
+                [f"Valeur invalide '{value}' pour {field}" for value in column.raw[failed]],
+                text,
+            )
+        )
+        clock.stop(ALLOWED_VALUES_CHECK, active, batches[-1])
+
+    if rule.pattern:
+        clock.start()
+        candidates = active & (text != "").to_numpy()
+        matches = text[candidates].str.fullmatch(rule.pattern).to_numpy(dtype=bool)
+        failed = candidates.copy()
+        failed[candidates] = ~matches
+        batches.append(
+            _error_batch(field, PATTERN_CHECK, failed, f"{field} ne respecte pas le motif {rule.pattern.pattern}", text)
+        )
+        clock.stop(PATTERN_CHECK, candidates, batches[-1])
+
+    if rule.custom_rule:
+        custom = rule.custom_rule.strip().lower()
+        clock.start()
+        if custom == "unique":
+            unique_batch = None
+            if unique_counts.get(field, {}).get(field, 0) > 1:
+                unique_batch = _error_batch(
+                    field,
+                    UNIQUE_CHECK,
+                    active,
+                    [f"'{field}'='{value}' n'est pas unique dans la colonne" for value in text[active]],
+                    text,
+                )
+                batches.append(unique_batch)
+            clock.stop(UNIQUE_CHECK, active, unique_batch)
+        elif custom.startswith("equals:"):
+            equals_batch = evaluate_equals_column(rule, columns, active)
+            if equals_batch is not None:
+                batches.append(equals_batch)
+            clock.stop(EQUALS_CHECK, active, equals_batch)
+
+    return batches
+
+
+def assemble_errors(batches: Iterable[ErrorBatch], total_rows: int) -> TemplateErrors:
+    """Collect the batches into error records and one joined message per row.
+
+    Records are ordered by row, then in rule and check order, which is also
+    the order of the messages joined for a row.
+    """
+    errors = _filled(total_rows, "")
+    batches = [batch for batch in batches if len(batch.positions)]
+    if not batches:
+        empty = np.empty(0, dtype=object)
+        return TemplateErrors(errors.tolist(), np.empty(0, dtype=np.int64), empty, empty, empty, empty)
+
+    positions = np.concatenate([batch.positions for batch in batches])
+    messages = np.concatenate([batch.messages for batch in batches])
+    values = np.concatenate([batch.values for batch in batches])
+    batch_ids = np.repeat(np.arange(len(batches)), [len(batch.positions) for batch in batches])
+    order = np.argsort(positions, kind="stable")
+    positions = positions[order]
+    messages = messages[order]
+    values = values[order]
+    batch_ids = batch_ids[order]
+
+    boundaries = np.flatnonzero(np.diff(positions)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(positions)]))
+    for start, end in zip(starts, ends):
+        errors[positions[start]] = "; ".join(messages[start:end])
+
+    return TemplateErrors(
+        messages=errors.tolist(),
+        rows=positions,
+        fields=np.array([batch.field for batch in batches], dtype=object)[batch_ids],
+        kinds=np.array([batch.kind for batch in batches], dtype=object)[batch_ids],
+        details=messages,
+        values=values,
+    )
 
+def rule_signature(rule: ValidationRule) -> str:
+    """The rule definition as text; equal signatures give equal results on the same workbook."""
+    return json.dumps(
+        [
+            rule.field,
+            rule.checked,
+            rule.required,
+            rule.min_length,
+            rule.max_length,
+            rule.allowed_source,
+            rule.pattern.pattern if rule.pattern else None,
+            rule.custom_rule,
+        ]
+    )
 
+def _evaluate_shard(
+    template_df: pd.DataFrame,
+    rules: list[ValidationRule],
+    unique_counts: dict[str, dict[str, int]],
+    profiled: bool = False,
+) -> tuple[list[list[ErrorBatch]], Optional[RuleProfile]]:
+    columns = TemplateColumns(template_df)
+    profile = RuleProfile() if profiled else None
+    return [evaluate_rule_column(rule, columns, unique_counts, profile) for rule in rules], profile
+
+class RuleEvaluator:
+    """Evaluate rules in this process or across a pool of ``workers`` processes.
+
+    Every rule only looks at its own row once ``unique`` counts and
+    ``equals`` lookups are built, so the template is split into contiguous
+    row ranges evaluated in parallel. Each shard's batches are shifted back
+    to template positions and kept in shard order, which makes the merged
+    errors identical to a sequential run.
+    """
+
+    def __init__(self, workers: int = 1) -> None:
+        self.workers = max(1, int(workers or 1))
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def evaluate(
+        self,
+        template_df: pd.DataFrame,
+        rules: Sequence[ValidationRule],
+        unique_counts: dict[str, dict[str, int]],
+        profile: Optional[RuleProfile] = None,
+    ) -> list[list[ErrorBatch]]:
+        """One list of error batches per rule, in ``rules`` order.
+
+        With ``profile``, the cost of each check is added to it.
+        """
+        shard_count = min(self.workers, len(template_df) // MIN_ROWS_PER_SHARD)
+        if shard_count < 2 or not rules:
+            results, shard_profile = _evaluate_shard(template_df, list(rules), unique_counts, profile is not None)
+            if profile is not None and shard_profile is not None:
+                profile.merge(shard_profile)
+            return results
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        bounds = np.linspace(0, len(template_df), shard_count + 1, dtype=int)
+        futures = [
+            self._pool.submit(
+                _evaluate_shard, template_df.iloc[start:end], list(rules), unique_counts, profile is not None
+            )
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
 
-    return errors
-
-
+        results: list[list[ErrorBatch]] = [[] for _ in rules]
+        for start, future in zip(bounds[:-1], futures):
+            shard_results, shard_profile = future.result()
+            if profile is not None and shard_profile is not None:
+                profile.merge(shard_profile)
+            for rule_batches, shard_batches in zip(results, shard_results):
+                for batch in shard_batches:
+                    batch.positions = batch.positions + start
+                    rule_batches.append(batch)
+        return results
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> RuleEvaluator:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+def evaluate_template(
+    template_df: pd.DataFrame,
+    rules: dict[str, ValidationRule],
+    unique_counts: dict[str, dict[str, int]],
+    state: Optional[TemplateState] = None,
+    evaluator: Optional[RuleEvaluator] = None,
+    profile: Optional[RuleProfile] = None,
+) -> TemplateErrors:
+    """Evaluate every rule, reusing the results ``state`` holds for unchanged rules.
+
+    With ``profile`` every rule is evaluated, so that all of them are measured.
+    """
+    results: dict[str, list[ErrorBatch]] = {}
+    pending: list[ValidationRule] = []
+    for field, rule in rules.items():
+        cached = state.load_rule(rule_signature(rule)) if state is not None and profile is None else None
+        if cached is None:
+            pending.append(rule)
+        else:
+            results[field] = cached
 
+    evaluator = evaluator or RuleEvaluator()
+    for rule, rule_batches in zip(pending, evaluator.evaluate(template_df, pending, unique_counts, profile)):
+        results[rule.field] = rule_batches
+        if state is not None:
+            state.save_rule(rule_signature(rule), rule_batches)
 
+    batches = [batch for field in rules for batch in results[field]]
+    return assemble_errors(batches, len(template_df))
 
 def build_unique_counts(df: pd.DataFrame, rules: dict[str, ValidationRule]) -> dict[str, dict[str, int]]:
 
@@ -556,120 +911,67 @@ def build_unique_counts(df: pd.DataFrame, rules: dict[str, ValidationRule]) -> d
 
     return counts
 
+def unique_fields(rules: dict[str, ValidationRule]) -> list[str]:
+    return [
+        field
+        for field, rule in rules.items()
+        if rule.custom_rule and rule.custom_rule.strip().lower() == "unique"
+    ]
 
+def stream_unique_counts(
+    stream: SheetStream,
+    rules: dict[str, ValidationRule],
+    progress: Optional[Callable[[int], None]] = None,
+) -> dict[str, dict[str, int]]:
+    """Scan the template once and count values like ``build_unique_counts``.
+
+    Raw cell values are tallied per chunk and only converted to the column's
+    whole-sheet dtype at the end, so a value is counted under the same text
+    as when the template is loaded at once. ``progress`` is called with the
+    number of rows scanned after each chunk.
+    """
+    fields = unique_fields(rules)
+    raw_counts: dict[str, Counter] = {field: Counter() for field in fields}
+    scanned = 0
+
+    def visit(chunk: pd.DataFrame) -> None:
+        nonlocal scanned
+        for field in fields:
+            raw_counts[field].update(chunk[field].tolist())
+        scanned += len(chunk)
+        if progress is not None:
+            progress(scanned)
+
+    stream.scan(visit)
 
+    counts: dict[str, dict[str, int]] = {}
+    for field, raw in raw_counts.items():
+        values = stream.parse_values(field, list(raw))
+        text = values.astype(str).str.strip()
+        tallies = pd.Series(list(raw.values()), index=text.to_numpy(), dtype="int64")
+        counts[field] = tallies.groupby(level=0).sum().to_dict()
+    return counts
 
 
-def summarise_errors(df: pd.DataFrame, rules: dict[str, ValidationRule]) -> pd.DataFrame:
-
-    total_rows = len(df)
-
-    summary_records = []
-
-    for field in rules:
-
-        errors_count = df["Errors"].str.contains(field, case=False, na=False).sum()
-
-        error_percentage = f"{round((errors_count / total_rows) * 100, 2)}%" if total_rows else "0%"
-
-        summary_records.append(
-
+def build_error_summary(field_counts: Mapping[str, int], total_rows: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
             {
-
                 "Field": field,
-
                 "Errors Count": errors_count,
-
-                "Errors %": error_percentage,
-
+                "Errors %": format_percentage(errors_count, total_rows),
             }
-
-        )
-
-    return pd.DataFrame(summary_records)
-
-
-
-
-
-def add_tables_to_workbook(output_file: str, summary_df: pd.DataFrame, result_df: pd.DataFrame) -> None:
-
-    workbook = load_workbook(output_file)
-
-    summary_sheet = workbook["ErrorSummary"]
-
-    result_sheet = workbook["Result"]
-
-
-
-    summary_table = Table(displayName="GlobalStats", ref="A1:B4")
-
-    summary_table.tableStyleInfo = TableStyleInfo(
-
-        name="TableStyleMedium9",
-
-        showRowStripes=True,
-
-    )
-
-    summary_sheet.add_table(summary_table)
-
-
-
-    start_row = 6
-
-    end_row = start_row + len(summary_df)
-
-    end_col = get_column_letter(len(summary_df.columns))
-
-    detailed_table = Table(
-
-        displayName="FieldErrors",
-
-        ref=f"A{start_row}:{end_col}{end_row}",
-
-    )
-
-    detailed_table.tableStyleInfo = TableStyleInfo(
-
-        name="TableStyleMedium4",
-
-        showRowStripes=True,
-
-    )
-
-    summary_sheet.add_table(detailed_table)
-
-
-
-    result_end_row = len(result_df) + 1
-
-    result_end_col = get_column_letter(len(result_df.columns))
-
-    result_table = Table(
-
-        displayName="ValidationResult",
-
-        ref=f"A1:{result_end_col}{result_end_row}",
-
-    )
-
-    result_table.tableStyleInfo = TableStyleInfo(
-
-        name="TableStyleMedium2",
-
-        showRowStripes=True,
-
+            for field, errors_count in field_counts.items()
+        ]
     )
 
-    result_sheet.add_table(result_table)
-
-
-
-    workbook.save(output_file)
-
-
-
+def summarise_errors(
+    errors: TemplateErrors, rules: dict[str, ValidationRule], summary: Optional[ValidationSummary] = None
+) -> pd.DataFrame:
+    field_counts = errors.field_counts(rules)
+    if summary is not None:
+        summary.record(len(errors.messages), sum(errors.valid_flags), field_counts)
+    return build_error_summary(field_counts, len(errors.messages))
 
 
 def write_output(
@@ -684,189 +986,445 @@ def write_output(
 
     valid_flags: list[bool],
 
-) -> str:
-
-    output_filename = Path(input_file).name.replace(".xlsx", " review.xlsx")
-
-    output_path = Path(output_dir) / output_filename
-
-
-
-    enriched_df = result_df.copy()
-
-    enriched_df.insert(0, "Valid", [CHECK_MARK if flag else CROSS_MARK for flag in valid_flags])
+    writer: Optional[str] = None,
 
+    progress: Optional[Callable[[int], None]] = None,
 
+) -> str:
 
-    total_rows = len(enriched_df)
+    return write_report(review_output_path(input_file, output_dir), result_df, summary_df, valid_flags, writer, progress)
 
-    valid_rows = sum(valid_flags)
+def review_output_path(input_file: str, output_dir: str) -> Path:
+    output_filename = Path(input_file).name.replace(".xlsx", " review.xlsx")
+    return Path(output_dir) / output_filename
 
-    valid_percentage = f"{round((valid_rows / total_rows) * 100, 2)}%" if total_rows else "0%"
+def open_error_table(input_file: str, output_dir: str, errors_format: Optional[str]) -> Optional[ErrorTableWriter]:
+    if not errors_format:
+        return None
+    table_format = normalize_error_format(errors_format)
+    return ErrorTableWriter(error_table_path(input_file, output_dir, table_format), table_format, ERROR_RECORD_COLUMNS)
 
 
 
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
 
-        enriched_df.to_excel(writer, sheet_name="Result", index=False)
 
+def load_rules(
+    workbook: WorkbookSession,
+    override_df: Optional[pd.DataFrame],
+    rule_sets: Optional[RuleSetCache] = None,
+) -> dict[str, ValidationRule]:
+    if rule_sets is not None:
+        return rule_sets.load(workbook, override_df)
+    rules, _ = load_validation_rules(workbook, override_df)
+    return rules
 
+def rules_override_to_frame(rules_override: Optional[list[dict[str, object]]]) -> Optional[pd.DataFrame]:
+    if rules_override is None:
+        return None
 
-        metrics = pd.DataFrame(
+    rows: list[dict[str, object]] = []
+    for rule in rules_override:
+        field = str(rule.get("field", "")).strip()
+        if not field:
+            continue
 
+        allowed_type = str(rule.get("allowedType", "instruction")).lower()
+        raw_allowed_values = rule.get("allowedValues") or []
+        if isinstance(raw_allowed_values, (str, bytes)):
+            allowed_values_iter = [str(raw_allowed_values)]
+        else:
+            allowed_values_iter = [str(value).strip() for value in raw_allowed_values if str(value).strip()]
+
+        joined_values = ";".join(allowed_values_iter)
+        if allowed_type == "list" and joined_values:
+            allowed_cell = f"VALUE={joined_values}"
+        elif allowed_type == "list":
+            allowed_cell = ""
+        else:
+            allowed_cell = str(rule.get("allowedInstruction", "") or "").strip()
+
+        min_length = rule.get("minLength")
+        max_length = rule.get("maxLength")
+
+        rows.append(
             {
-
-                "Metric": ["Total Rows", "Valid Rows", "% Valid"],
-
-                "Value": [total_rows, valid_rows, valid_percentage],
-
+                "Field": field,
+                "Checked": 1 if bool(rule.get("checked")) else 0,
+                "Required": 1 if bool(rule.get("required")) else 0,
+                "MinLength": min_length if min_length is not None else "",
+                "MaxLength": max_length if max_length is not None else "",
+                "AllowedValues": allowed_cell,
+                "Pattern": str(rule.get("pattern", "") or "").strip(),
+                "CustomRule": str(rule.get("customRule", "") or "").strip(),
             }
+        )
 
+    if rows:
+        return pd.DataFrame(
+            rows,
+            columns=["Field", "Checked", "Required", "MinLength", "MaxLength", "AllowedValues", "Pattern", "CustomRule"],
         )
+    return None
 
 
 
-        metrics.to_excel(writer, sheet_name="ErrorSummary", startrow=0, index=False)
 
-        summary_df.to_excel(writer, sheet_name="ErrorSummary", startrow=5, index=False)
 
+def generate_result_from_excel(
+    input_file: str,
+    output_dir: str,
+    rules_override: Optional[list[dict[str, object]]] = None,
+    *,
+    chunk_size: Optional[int] = None,
+    errors_format: Optional[str] = None,
+    cache: Optional[ResultCache] = None,
+    revalidation: Optional[RevalidationCache] = None,
+    workers: int = 1,
+    rule_sets: Optional[RuleSetCache] = None,
+    reader: Optional[str] = None,
+    writer: Optional[str] = None,
+    sheet_cache: Optional[SheetCache] = None,
+    timings: Optional[PhaseTimings] = None,
+    profile: bool = False,
+    summary: Optional[ValidationSummary] = None,
+) -> str:
+    """Validate the ``Template`` sheet and write the review workbook.
+
+    With ``chunk_size`` the template is streamed in chunks of that many rows
+    instead of being loaded at once; see ``stream_result_from_excel``. With
+    ``errors_format`` (``csv``, ``parquet`` or ``arrow``) the error records
+    are also written next to the review as ``<input> errors.<ext>``, one row
+    per error with the columns of ``ERROR_RECORD_COLUMNS``. With ``cache``,
+    a workbook already validated with the same rules override is not
+    validated again: the stored outputs are copied to ``output_dir``. With
+    ``revalidation``, the parsed template and the results of each rule are
+    kept per workbook, so resubmitting it with a modified rules override
+    only evaluates the rules whose definition changed (in-memory mode only).
+    With ``workers`` > 1, rules are evaluated across that many processes
+    (see ``RuleEvaluator``); the output does not depend on it. A shared
+    ``rule_sets`` cache reuses the rule set of a previous workbook with the
+    same rules and reference sheets (see ``validate_batch``). ``reader``
+    and ``writer`` select the Excel engines (see ``reader_engine`` and
+    ``writer_engine``). With ``sheet_cache``, sheets parsed from the same
+    workbook content by an earlier run are loaded from disk instead of
+    being parsed again (see ``SheetCache``). The time spent in each phase
+    (hash, read, rules, unique, evaluate, summarise, write) and the number
+    of rows are recorded in ``timings`` when given. With ``profile``, the
+    time, evaluations and failures of each check of each rule are written
+    to ``<input> profile.json`` (see ``RuleProfile``); the result cache is
+    then bypassed and every rule is evaluated. The total rows, valid rows
+    and per-field error counts of the review are recorded in ``summary``
+    when given, without reading the review back (except on a cache hit).
+    """
+    if not os.path.exists(input_file):
 
+        raise FileNotFoundError(f"Fichier introuvable: {input_file}")
 
-    add_tables_to_workbook(str(output_path), summary_df, enriched_df)
+    timings = timings if timings is not None else PhaseTimings()
+    override_df = rules_override_to_frame(rules_override)
+    reader = reader_engine(reader)
+    writer = writer_engine(writer)
+
+    outputs = {"review": review_output_path(input_file, output_dir)}
+    if errors_format:
+        errors_format = normalize_error_format(errors_format)
+        outputs["errors"] = error_table_path(input_file, output_dir, errors_format)
+
+    rule_profile = RuleProfile() if profile else None
+    if rule_profile is not None:
+        cache = None
+
+    needs_digest = cache is not None or revalidation is not None or sheet_cache is not None
+    input_digest = ""
+    if needs_digest:
+        with timings.phase("hash"):
+            input_digest = hash_file(input_file)
+
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.key(
+            input_digest,
+            {
+                "rules": override_df.to_dict(orient="records") if override_df is not None else None,
+                "errors_format": errors_format,
+                "reader": reader,
+                "writer": writer,
+            },
+        )
+        with timings.phase("cache"):
+            restored = cache.restore(cache_key, outputs)
+        if restored:
+            try:
+                total_rows, valid_rows, field_errors = read_review_summary(outputs["review"])
+            except Exception:  # noqa: BLE001
+                # An unreadable cached review is a miss; it is recomputed and stored again below.
+                cache.discard(cache_key)
+                restored = False
+        if restored:
+            timings.rows = total_rows
+            timings.cache_hit = True
+            if summary is not None:
+                summary.record(total_rows, valid_rows, field_errors)
+            return str(outputs["review"])
+
+    with RuleEvaluator(workers) as evaluator:
+        if chunk_size:
+            output_path = stream_result_from_excel(
+                input_file,
+                output_dir,
+                override_df,
+                chunk_size,
+                errors_format=errors_format,
+                evaluator=evaluator,
+                rule_sets=rule_sets,
+                reader=reader,
+                writer=writer,
+                sheet_cache=sheet_cache,
+                digest=input_digest or None,
+                timings=timings,
+                profile=rule_profile,
+                summary=summary,
+            )
+        else:
+            output_path = validate_in_memory(
+                input_file,
+                output_dir,
+                override_df,
+                errors_format=errors_format,
+                # Engines may decode a cell differently, so each keeps its own parsed template.
+                state=revalidation.state(f"{input_digest}-{reader}") if revalidation is not None else None,
+                evaluator=evaluator,
+                rule_sets=rule_sets,
+                reader=reader,
+                writer=writer,
+                sheet_cache=sheet_cache,
+                digest=input_digest or None,
+                timings=timings,
+                profile=rule_profile,
+                summary=summary,
+            )
 
-    return str(output_path)
+    if cache is not None and cache_key is not None:
+        with timings.phase("cache"):
+            cache.store(cache_key, outputs)
 
+    if rule_profile is not None:
+        rule_profile.write(profile_path(input_file, output_dir), timings.rows)
 
+    return output_path
 
+def validate_in_memory(
+    input_file: str,
+    output_dir: str,
+    override_df: Optional[pd.DataFrame] = None,
+    *,
+    errors_format: Optional[str] = None,
+    state: Optional[TemplateState] = None,
+    evaluator: Optional[RuleEvaluator] = None,
+    rule_sets: Optional[RuleSetCache] = None,
+    reader: Optional[str] = None,
+    writer: Optional[str] = None,
+    sheet_cache: Optional[SheetCache] = None,
+    digest: Optional[str] = None,
+    timings: Optional[PhaseTimings] = None,
+    profile: Optional[RuleProfile] = None,
+    summary: Optional[ValidationSummary] = None,
+) -> str:
+    timings = timings if timings is not None else PhaseTimings()
+    error_table = open_error_table(input_file, output_dir, errors_format)
+
+    with WorkbookSession(input_file, reader, sheet_cache=sheet_cache, digest=digest) as workbook:
+        with timings.phase("read"):
+            template_df = state.load_template() if state is not None else None
+            if template_df is None:
+                template_df = load_template(workbook)
+                if state is not None:
+                    state.save_template(template_df)
+        timings.rows = len(template_df)
+        with timings.phase("rules"):
+            rules = load_rules(workbook, override_df, rule_sets)
+
+    with timings.phase("unique"):
+        unique_counts = build_unique_counts(template_df, rules)
+
+    with timings.phase("evaluate"):
+        errors = evaluate_template(template_df, rules, unique_counts, state, evaluator, profile)
+
+    with timings.phase("summarise"):
+        template_df.insert(0, "Errors", errors.messages)
+        summary_df = summarise_errors(errors, rules, summary)
+
+    with timings.phase("write"):
+        output_path = write_output(
+            input_file, output_dir, template_df, summary_df, errors.valid_flags, writer, timings.advance
+        )
 
+        if error_table is not None:
+            error_table.append(errors.records())
+            error_table.close()
 
-def generate_result_from_excel(input_file: str, output_dir: str, rules_override: Optional[list[dict[str, object]]] = None) -> str:
+    return output_path
 
-    if not os.path.exists(input_file):
+def stream_result_from_excel(
+    input_file: str,
+    output_dir: str,
+    override_df: Optional[pd.DataFrame] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    *,
+    errors_format: Optional[str] = None,
+    evaluator: Optional[RuleEvaluator] = None,
+    rule_sets: Optional[RuleSetCache] = None,
+    reader: Optional[str] = None,
+    writer: Optional[str] = None,
+    sheet_cache: Optional[SheetCache] = None,
+    digest: Optional[str] = None,
+    timings: Optional[PhaseTimings] = None,
+    profile: Optional[RuleProfile] = None,
+    summary: Optional[ValidationSummary] = None,
+) -> str:
+    """Validate the template chunk by chunk, for sheets too large to load at once.
+
+    The template is read twice: a first pass learns the sheet layout and the
+    ``unique`` counts, the second validates each chunk and appends it to the
+    ``Result`` sheet. Only the current chunk, the counters and the per-field
+    tallies are kept in memory, so the review is written with the openpyxl
+    streaming writer whatever ``writer`` is (see ``open_report_writer``); the
+    report is identical to the in-memory one.
+    The first pass is timed as ``unique``; reading, evaluating and writing
+    the chunks accumulate under their own phases.
+    """
+    timings = timings if timings is not None else PhaseTimings()
+    error_table = open_error_table(input_file, output_dir, errors_format)
+
+    with WorkbookSession(input_file, reader, sheet_cache=sheet_cache, digest=digest) as workbook:
+        with timings.phase("rules"):
+            rules = load_rules(workbook, override_df, rule_sets)
+        with timings.phase("unique"):
+            stream = workbook.stream(TEMPLATE_SHEET, chunk_size)
+            unique_counts = stream_unique_counts(stream, rules, timings.advance)
+        timings.rows = stream.total_rows
+
+        report = open_report_writer(
+            review_output_path(input_file, output_dir),
+            ["Errors", *stream.columns],
+            stream.total_rows,
+            writer,
+            streaming=True,
+        )
+        field_counts = dict.fromkeys(rules, 0)
+        for chunk in timings.timed("read", stream.chunks()):
+            with timings.phase("evaluate"):
+                errors = evaluate_template(chunk, rules, unique_counts, evaluator=evaluator, profile=profile)
+            with timings.phase("write"):
+                if error_table is not None:
+                    error_table.append(errors.records(row_offset=report.total_rows))
+                chunk.insert(0, "Errors", errors.messages)
+                report.append(chunk, errors.valid_flags)
+            with timings.phase("summarise"):
+                for field, errors_count in errors.field_counts(rules).items():
+                    field_counts[field] += errors_count
+            timings.advance(report.total_rows, "evaluate")
+
+    with timings.phase("write"):
+        if error_table is not None:
+            error_table.close()
+        if summary is not None:
+            summary.record(report.total_rows, report.valid_rows, field_counts)
+        return report.close(build_error_summary(field_counts, report.total_rows))
 
-        raise FileNotFoundError(f"Fichier introuvable: {input_file}")
 
+__all__ = ["generate_result_from_excel", "ValidationRule"]
 
 
-    template_df = load_template(input_file)
-
-    override_df: Optional[pd.DataFrame] = None
-    if rules_override is not None:
-        rows: list[dict[str, object]] = []
-        for rule in rules_override:
-            field = str(rule.get("field", "")).strip()
-            if not field:
-                continue
-
-            allowed_type = str(rule.get("allowedType", "instruction")).lower()
-            raw_allowed_values = rule.get("allowedValues") or []
-            if isinstance(raw_allowed_values, (str, bytes)):
-                allowed_values_iter = [str(raw_allowed_values)]
-            else:
-                allowed_values_iter = [str(value).strip() for value in raw_allowed_values if str(value).strip()]
-
-            joined_values = ";".join(allowed_values_iter)
-            if allowed_type == "list" and joined_values:
-                allowed_cell = f"VALUE={joined_values}"
-            elif allowed_type == "list":
-                allowed_cell = ""
-            else:
-                allowed_cell = str(rule.get("allowedInstruction", "") or "").strip()
-
-            min_length = rule.get("minLength")
-            max_length = rule.get("maxLength")
-
-            rows.append(
-                {
-                    "Field": field,
-                    "Checked": 1 if bool(rule.get("checked")) else 0,
-                    "Required": 1 if bool(rule.get("required")) else 0,
-                    "MinLength": min_length if min_length is not None else "",
-                    "MaxLength": max_length if max_length is not None else "",
-                    "AllowedValues": allowed_cell,
-                    "Pattern": str(rule.get("pattern", "") or "").strip(),
-                    "CustomRule": str(rule.get("customRule", "") or "").strip(),
-                }
-            )
 
-        if rows:
-            override_df = pd.DataFrame(
-                rows,
-                columns=["Field", "Checked", "Required", "MinLength", "MaxLength", "AllowedValues", "Pattern", "CustomRule"],
-            )
 
-    rules, reference_cache = load_validation_rules(input_file, override_df)
+def main() -> None:
 
+    import argparse
 
 
-    unique_counts = build_unique_counts(template_df, rules)
 
+    parser = argparse.ArgumentParser(
 
+        description="Valide un template DMF et genere un rapport Excel.",
 
-    valid_flags: list[bool] = []
+    )
 
-    error_messages: list[str] = []
+    parser.add_argument("input", help="Chemin vers le fichier Excel a valider")
 
+    parser.add_argument(
 
+        "--output",
 
-    for _, row in template_df.iterrows():
+        help="Dossier de sortie (defaut: dossier du fichier d'entree)",
 
-        row_errors = evaluate_row(row, rules, unique_counts, input_file, reference_cache)
+    )
 
-        valid_flags.append(len(row_errors) == 0)
 
-        error_messages.append("; ".join(row_errors) if row_errors else "")
 
+    parser.add_argument(
 
+        "--chunk-size",
 
-    template_df.insert(0, "Errors", error_messages)
+        type=int,
 
+        default=None,
 
+        help=f"Valide le template par blocs de N lignes sans le charger en entier (ex: {DEFAULT_CHUNK_SIZE})",
 
-    summary_df = summarise_errors(template_df, rules)
+    )
 
-    output_path = write_output(input_file, output_dir, template_df, summary_df, valid_flags)
+    parser.add_argument(
 
-    return output_path
+        "--workers",
 
+        type=int,
 
+        default=1,
 
+        help="Nombre de processus pour evaluer les regles en parallele (defaut: 1)",
 
+    )
 
-__all__ = ["generate_result_from_excel", "ValidationRule"]
+    parser.add_argument(
 
+        "--reader",
 
+        choices=["auto", *READER_ENGINES],
 
+        default=None,
 
-def main() -> None:
+        help="Moteur de lecture Excel (defaut: PYTHON_EXCEL_READER, sinon auto)",
 
-    import argparse
+    )
 
+    parser.add_argument(
 
+        "--writer",
 
-    parser = argparse.ArgumentParser(
+        choices=["auto", *WRITER_ENGINES],
 
-        description="Valide un template DMF et genere un rapport Excel.",
+        default=None,
 
-    )
+        help="Moteur d'ecriture Excel (defaut: PYTHON_EXCEL_WRITER, sinon auto)",
 
-    parser.add_argument("input", help="Chemin vers le fichier Excel a valider")
+    )
 
     parser.add_argument(
 
-        "--output",
+        "--profile",
 
-        help="Dossier de sortie (defaut: dossier du fichier d'entree)",
-
-    )
+        action="store_true",
 
+        help="Mesure le cout de chaque regle et l'ecrit dans <input> profile.json",
 
+    )
 
     args = parser.parse_args()
 
     output_dir = args.output or str(Path(args.input).resolve().parent)
 
-    result = generate_result_from_excel(args.input, output_dir)
+    result = generate_result_from_excel(args.input, output_dir, chunk_size=args.chunk_size, workers=args.workers, reader=args.reader, writer=args.writer, profile=args.profile)
 
     print(f"Validation terminee: {result}")
 
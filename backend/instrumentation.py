@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+# Progress events are sent at most this often (seconds), plus one on
+# entering each phase.
+PROGRESS_INTERVAL = 0.5
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of the current process, or None where it cannot be read.
+
+    On Linux this is ``VmHWM`` from ``/proc/self/status``, which starts over
+    when a process execs; ``ru_maxrss`` keeps the parent's high-water mark
+    across fork and exec, so a benchmark child would report the memory of
+    whatever its parent had loaded.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class PhaseTimings:
+    """Wall-clock time spent in each phase of a validation or mapping job.
+
+    Phases are timed with ``with timings.phase("read"):`` and accumulate
+    when entered several times (as in streaming mode, where reading,
+    evaluating and writing alternate chunk by chunk). ``rows`` is set by the
+    engine once known. Peak memory is the process high-water mark, so in a
+    long-lived worker it covers the earlier jobs too.
+
+    With a ``progress`` callback, an event (phase, rows processed, total
+    rows, elapsed time and ETA) is sent on entering each phase and, at most
+    every ``interval`` seconds, when the engine reports rows with
+    ``advance``. The ETA comes from the row rate since the first ``advance``
+    of the phase, once the total number of rows is known.
+
+    ``cache_hit`` is set when the job was answered from the result cache;
+    ``rows`` is then the row count of the cached review and the metrics
+    carry ``cache_hit=1``.
+    """
+
+    def __init__(self, progress: Optional[ProgressCallback] = None, interval: float = PROGRESS_INTERVAL) -> None:
+        self.phases: dict[str, float] = {}
+        self.rows = 0
+        self.processed = 0
+        self.cache_hit = False
+        self._started = time.perf_counter()
+        self._progress = progress
+        self._interval = interval
+        self._current: Optional[str] = None
+        self._last_report = 0.0
+        self._rate_origin: Optional[tuple[str, float, int]] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        first_entry = name not in self.phases
+        self._current = name
+        if first_entry and self._progress is not None:
+            self.processed = 0
+            self._report()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def timed(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield from ``items``, counting the time spent producing each one under ``name``."""
+        iterator = iter(items)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def advance(self, rows: int, phase: Optional[str] = None) -> None:
+        """Record that ``rows`` rows are processed so far, reported as ``phase`` (default: the current one)."""
+        self.processed = rows
+        if self._progress is None:
+            return
+        now = time.perf_counter()
+        phase = phase or self._current or ""
+        if self._rate_origin is None or self._rate_origin[0] != phase:
+            # The rate, hence the ETA, is measured afresh for each phase reporting rows.
+            self._rate_origin = (phase, now, rows)
+            self._report(phase)
+        elif now - self._last_report >= self._interval or (self.rows and rows >= self.rows):
+            self._report(phase)
+
+    def _eta(self, phase: Optional[str], now: float) -> Optional[float]:
+        if self._rate_origin is None or not self.rows:
+            return None
+        origin_phase, origin_time, origin_rows = self._rate_origin
+        if origin_phase != phase or self.processed <= origin_rows or now <= origin_time:
+            return None
+        rate = (self.processed - origin_rows) / (now - origin_time)
+        return round(max(self.rows - self.processed, 0) / rate, 1)
+
+    def _report(self, phase: Optional[str] = None) -> None:
+        assert self._progress is not None
+        now = time.perf_counter()
+        self._last_report = now
+        phase = phase or self._current
+        self._progress(
+            {
+                "phase": phase,
+                "rows": self.processed,
+                "total_rows": self.rows or None,
+                "elapsed_seconds": round(now - self._started, 1),
+                "eta_seconds": self._eta(phase, now),
+            }
+        )
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self._started
+
+    def metrics(self) -> dict[str, float]:
+        total = self.total
+        metrics = {
+            "rows": self.rows,
+            "rows_per_second": self.rows / total if total else 0.0,
+        }
+        if self.cache_hit:
+            metrics["cache_hit"] = 1
+        peak = peak_rss_mb()
+        if peak is not None:
+            metrics["peak_rss_mb"] = peak
+        return metrics
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        """The figures as plain dicts, for JSON replies."""
+        timings = {name: round(seconds, 4) for name, seconds in self.phases.items()}
+        timings["total"] = round(self.total, 4)
+        return {
+            "timings": timings,
+            "metrics": {name: round(value, 2) for name, value in self.metrics().items()},
+        }
+
+    def lines(self) -> list[str]:
+        """``TIMING:<phase>=<seconds>`` and ``METRIC:<name>=<value>`` lines for the runners' output."""
+        figures = self.as_dict()
+        return [
+            *(f"TIMING:{name}={seconds:.4f}" for name, seconds in figures["timings"].items()),
+            *(f"METRIC:{name}={value:g}" for name, value in figures["metrics"].items()),
+        ]
+
+
+def format_progress(event: dict[str, Any]) -> str:
+    """A progress event as the ``PROGRESS:<json>`` line the runners print."""
+    return f"PROGRESS:{json.dumps(event)}"
+
+
+__all__ = ["PhaseTimings", "ProgressCallback", "format_progress", "peak_rss_mb"]
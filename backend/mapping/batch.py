@@ -0,0 +1,187 @@
+"""Map many workbooks in one go, without the Tkinter front end::
+
+    python -m backend.mapping.batch exports/*.xlsx --output mapped --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Mapping, Optional, Sequence, Union
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.batch import DEFAULT_BATCH_WORKERS, collect_inputs as collect_batch_inputs  # noqa: E402
+from backend.mapping.mapper import MappingPlan, compile_mapping_plan, map_workbook, sanitize_rules  # noqa: E402
+from backend.workbook import READER_ENGINES, WRITER_ENGINES  # noqa: E402
+
+EXCEL_PATTERNS = ("*.xlsx", "*.xlsm")
+
+
+@dataclass
+class MappingItem:
+    """Outcome of one workbook of a batch, with the warnings raised while mapping it."""
+
+    input: str
+    output: Optional[str] = None
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    warnings: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def collect_inputs(sources: Union[str, Sequence[str]]) -> list[str]:
+    """Expand directories and glob patterns into workbook paths.
+
+    Mapping results (``*_result.xlsx``) and Excel lock files are skipped so
+    a batch can be rerun over a folder it already wrote to (see
+    ``backend.batch.collect_inputs``).
+    """
+    return collect_batch_inputs(sources, EXCEL_PATTERNS, lambda name: Path(name).stem.endswith("_result"))
+
+
+def _map_one(
+    input_file: str,
+    output_dir: str,
+    plan: Optional[MappingPlan],
+    reader: Optional[str],
+    writer: Optional[str],
+    lenient: bool = False,
+) -> MappingItem:
+    item = MappingItem(input=input_file)
+    started = time.perf_counter()
+    # Recorded for every file: the default filter would show a warning only
+    # the first time a process meets it, whatever file it comes from.
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", RuntimeWarning)
+        try:
+            mapped = map_workbook(input_file, output_dir, plan=plan, reader=reader, writer=writer, lenient=lenient)
+            item.output, item.rows = str(mapped.path), mapped.rows
+        except Exception as exc:  # noqa: BLE001
+            item.error = str(exc)
+    item.warnings = [str(warning.message) for warning in caught if issubclass(warning.category, RuntimeWarning)]
+    item.seconds = time.perf_counter() - started
+    return item
+
+
+def map_batch(
+    sources: Union[str, Sequence[str]],
+    output_dir: str | Path,
+    rules_override: Sequence[Mapping[str, str]] | None = None,
+    *,
+    workers: int = DEFAULT_BATCH_WORKERS,
+    reader: Optional[str] = None,
+    writer: Optional[str] = None,
+    lenient: bool = False,
+) -> list[MappingItem]:
+    """Map every workbook matched by ``sources`` into ``output_dir``.
+
+    With ``rules_override`` the plan is compiled once here and shipped to
+    the workers; otherwise each file's Parameters sheet is used, and the
+    compiled plans are shared by the files of a process that have the same
+    Parameters. A failing file is reported in its item and does not stop
+    the batch. With ``lenient``, a ``MAPPING=`` rule that cannot be applied
+    leaves its column empty instead of failing the file (see ``MappingPlan``).
+    """
+    inputs = collect_inputs(sources)
+    if not inputs:
+        raise FileNotFoundError(f"Aucun fichier Excel trouve pour: {sources}")
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    plan = compile_mapping_plan(rules_override, lenient) if rules_override is not None else None
+    workers = max(1, min(int(workers), len(inputs)))
+
+    if workers == 1:
+        return [_map_one(input_file, str(output_dir), plan, reader, writer, lenient) for input_file in inputs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_map_one, input_file, str(output_dir), plan, reader, writer, lenient) for input_file in inputs
+        ]
+        return [future.result() for future in futures]
+
+
+def format_report(items: Sequence[MappingItem], seconds: float) -> str:
+    lines = []
+    for item in items:
+        name = Path(item.input).name
+        if item.ok:
+            rate = item.rows / item.seconds if item.seconds else 0.0
+            lines.append(
+                f"{name}: {Path(item.output or '').name}"
+                f" ({item.rows} lignes, {item.seconds:.2f}s, {rate:,.0f} lignes/s)"
+            )
+        else:
+            lines.append(f"{name}: ERREUR: {item.error} ({item.seconds:.2f}s)")
+        lines.extend(f"  AVERTISSEMENT: {message}" for message in item.warnings)
+    failed = sum(not item.ok for item in items)
+    rows = sum(item.rows for item in items)
+    lines.append(f"{len(items) - failed}/{len(items)} fichiers mappes, {rows} lignes en {seconds:.2f}s")
+    return "\n".join(lines)
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Mappe un lot de templates DMF et genere un fichier <nom>_result.xlsx par template.",
+    )
+    parser.add_argument("inputs", nargs="+", help="Fichiers, dossiers ou motifs glob (ex: 'exports/*.xlsx')")
+    parser.add_argument("--output", required=True, help="Dossier de sortie des fichiers <nom>_result.xlsx")
+    parser.add_argument("--rules", help="Fichier JSON de regles a appliquer a tous les fichiers")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS, help="Fichiers traites en parallele")
+    parser.add_argument("--reader", choices=["auto", *READER_ENGINES], help="Moteur de lecture Excel")
+    parser.add_argument("--writer", choices=["auto", *WRITER_ENGINES], help="Moteur d'ecriture Excel")
+    parser.add_argument("--json", action="store_true", help="Affiche le resultat de chaque fichier en JSON")
+    parser.add_argument(
+        "--lenient",
+        action="store_true",
+        help="Laisse vide la colonne d'une regle MAPPING= inapplicable au lieu de mettre le fichier en erreur",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None, prog: Optional[str] = None) -> int:
+    args = build_parser(prog).parse_args(argv)
+
+    rules_override = None
+    if args.rules:
+        rules_override = sanitize_rules(json.loads(Path(args.rules).read_text(encoding="utf-8")))
+
+    started = time.perf_counter()
+    try:
+        items = map_batch(
+            args.inputs,
+            args.output,
+            rules_override,
+            workers=args.workers,
+            reader=args.reader,
+            writer=args.writer,
+            lenient=args.lenient,
+        )
+    except FileNotFoundError as exc:
+        print(f"ERREUR: {exc}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps([item.__dict__ for item in items], indent=2))
+    else:
+        print(format_report(items, elapsed))
+    return 0 if all(item.ok for item in items) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
+
+__all__ = ["MappingItem", "build_parser", "collect_inputs", "format_report", "map_batch"]
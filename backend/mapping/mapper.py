@@ -1,165 +1,484 @@
 from __future__ import annotations
 
+import hashlib
+import pickle
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, Mapping, Sequence
+from typing import Callable, Iterable, Mapping, Optional, Sequence, Union
 
+import numpy as np
 import pandas as pd
 
+from backend.instrumentation import PhaseTimings
+from backend.sheet_cache import SheetCache
+from backend.workbook import WorkbookSession, writer_engine
+
+
+# Rows written at a time, so that progress can be reported while saving.
+WRITE_CHUNK_ROWS = 50_000
+
 
 class MappingError(Exception):
     """Raised when the mapping engine fails to produce a result."""
 
 
-def _find_column(source_name: str, template_cols: Iterable[str]) -> str | None:
-    lowered = str(source_name).strip().lower()
-    for col in template_cols:
-        if str(col).strip().lower() == lowered:
-            return str(col)
+class ColumnIndex:
+    """Case-insensitive lookup of template columns, built once per template."""
+
+    def __init__(self, template_cols: Iterable[object]) -> None:
+        self._columns: dict[str, str] = {}
+        for col in template_cols:
+            self._columns.setdefault(_column_key(col), str(col))
+
+    def resolve(self, key: str) -> str | None:
+        return self._columns.get(key)
+
+
+def _column_key(source_name: object) -> str:
+    return str(source_name).strip().lower()
+
+
+def _row_dtype(template: pd.DataFrame) -> np.dtype | None:
+    # Rows of a purely numeric template are upcast to a common dtype (ints
+    # become floats next to a float column); concatenations keep that text.
+    dtypes = list(template.dtypes)
+    if dtypes and all(isinstance(dtype, np.dtype) and dtype.kind in "iuf" for dtype in dtypes):
+        return np.result_type(*dtypes)
     return None
 
 
-def _parse_concat_expression(
-    expression: str, template_row: pd.Series, template_cols: Iterable[str]
-) -> str:
-    cleaned = expression.replace("'CONCAT=", "", 1).replace("CONCAT=", "", 1).strip()
-    parts = [part.strip() for part in cleaned.split("+")]
-    result = ""
-    for part in parts:
-        if part.startswith("'") and part.endswith("'"):
-            result += part.strip("'")
-            continue
+class _TemplateText:
+    """Template columns converted to text once and shared by every rule."""
 
-        matched_col = _find_column(part, template_cols)
-        if matched_col is None:
-            continue
+    def __init__(self, template: pd.DataFrame) -> None:
+        self._template = template
+        self._row_dtype = _row_dtype(template)
+        self._columns: dict[str, np.ndarray] = {}
 
-        value = template_row.get(matched_col, "")
-        result += "" if pd.isna(value) else str(value)
-    return result
+    def column(self, name: str) -> np.ndarray:
+        values = self._columns.get(name)
+        if values is None:
+            series = self._template[name]
+            if self._row_dtype is not None:
+                series = series.astype(self._row_dtype)
+            values = np.array(
+                ["" if pd.isna(value) else str(value) for value in series.astype(object)],
+                dtype=object,
+            )
+            self._columns[name] = values
+        return values
 
 
-def _build_result_dataframe(
-    xls: dict[str, pd.DataFrame],
-    rules_override: Sequence[Mapping[str, str]] | None = None,
-) -> pd.DataFrame:
-    try:
-        template = xls["Template"]
-    except KeyError as exc:  # pragma: no cover - defensive programming
-        raise MappingError("Missing required sheet 'Template'.") from exc
-
-    if rules_override is not None:
-        if rules_override:
-            parameters = pd.DataFrame(
-                [(entry["target"], entry.get("rule", "")) for entry in rules_override],
-                columns=["Target", "Rule"],
+def _filled(row_count: int, value: object) -> np.ndarray:
+    # np.full would turn a str fill value into a separate object per cell;
+    # fill() stores the same object in every cell, like ``[value] * n``.
+    values = np.empty(row_count, dtype=object)
+    values.fill(value)
+    return values
+
+
+def _usable_mapping(value: object) -> bool:
+    return pd.notna(value) and str(value).strip().lower() not in {"", "nan"}
+
+
+class LookupTable:
+    """A mapping sheet compiled once into the key -> value pairs that replace template values.
+
+    Keys whose (last) value is blank or ``nan`` are dropped up front, since
+    the template value is kept for them anyway; the remaining pairs are
+    applied with a single ``Series.map``.
+    """
+
+    def __init__(self, keys: Sequence[object], values: Sequence[object]) -> None:
+        mapping = dict(zip(keys, values))
+        # Built the way ``Series.map`` converts a dict, so the mapped values
+        # keep the dtype inferred from the whole mapping column.
+        if mapping:
+            series = pd.Series(list(mapping.values()), index=pd.Index(list(mapping.keys()), tupleize_cols=False))
+        else:
+            series = pd.Series(mapping, dtype=np.float64)
+        usable = np.fromiter((_usable_mapping(value) for value in series), dtype=bool, count=len(series))
+        self.mapping = series[usable]
+
+    @classmethod
+    def from_sheet(cls, sheet_name: str, mapping_df: pd.DataFrame) -> LookupTable:
+        if f"{sheet_name}Mapping" in mapping_df.columns:
+            mapping_key_col = str(mapping_df.columns[0])
+            mapping_val_col = f"{sheet_name}Mapping"
+        else:
+            if len(mapping_df.columns) < 2:
+                raise MappingError("Mapping sheet needs at least 2 columns.")
+            mapping_key_col = str(mapping_df.columns[0])
+            mapping_val_col = str(mapping_df.columns[1])
+
+        digest = hashlib.sha256(
+            pickle.dumps(
+                (
+                    mapping_key_col,
+                    mapping_val_col,
+                    mapping_df[mapping_key_col].to_numpy(dtype=object),
+                    mapping_df[mapping_val_col].to_numpy(dtype=object),
+                ),
+                protocol=pickle.HIGHEST_PROTOCOL,
             )
+        ).hexdigest()
+        table = _LOOKUP_TABLES.get(digest)
+        if table is None:
+            table = cls(mapping_df[mapping_key_col], mapping_df[mapping_val_col])
+            _LOOKUP_TABLES[digest] = table
+            while len(_LOOKUP_TABLES) > _MAX_LOOKUP_TABLES:
+                _LOOKUP_TABLES.popitem(last=False)
         else:
-            parameters = pd.DataFrame(columns=["Target", "Rule"])
-    else:
-        try:
-            parameters = xls["Parameters"]
-        except KeyError as exc:  # pragma: no cover - defensive programming
-            raise MappingError("Missing required sheet 'Parameters'.") from exc
+            _LOOKUP_TABLES.move_to_end(digest)
+        return table
+
+    def apply(self, original_values: pd.Series) -> np.ndarray:
+        mapped_values = original_values.map(self.mapping)
+        hits = mapped_values.notna().to_numpy()
+        # Copied explicitly: to_numpy(copy=True) can hand back the column's
+        # own buffer for unpickled string arrays, and the template is shared.
+        result = original_values.to_numpy(dtype=object).copy()
+        result[hits] = mapped_values.to_numpy(dtype=object)[hits]
+        return result
+
+
+# Tables are reused across files and runs of a process when a mapping sheet
+# has the same content (typically the shared country/currency code sheets).
+_MAX_LOOKUP_TABLES = 32
+_LOOKUP_TABLES: OrderedDict[str, LookupTable] = OrderedDict()
+
+
+class PlanContext:
+    """Per-template state shared by the steps of a plan while it executes."""
+
+    def __init__(self, template: pd.DataFrame, sheets: Mapping[str, pd.DataFrame]) -> None:
+        self.template = template
+        self.sheets = sheets
+        self.row_count = len(template)
+        self.columns = ColumnIndex(template.columns)
+        self.text = _TemplateText(template)
+        self._lookups: dict[str, LookupTable] = {}
+
+    def lookup(self, sheet_name: str) -> LookupTable | None:
+        """The compiled mapping sheet ``sheet_name``, shared by every rule using it; None if absent."""
+        table = self._lookups.get(sheet_name)
+        if table is None:
+            mapping_df = self.sheets.get(sheet_name)
+            if mapping_df is None:
+                return None
+            table = LookupTable.from_sheet(sheet_name, mapping_df)
+            self._lookups[sheet_name] = table
+        return table
 
-    result_df = pd.DataFrame()
+    def empty(self) -> np.ndarray:
+        return _filled(self.row_count, "")
 
-    for _, row in parameters.iterrows():
-        target_col = str(row.iloc[0]).strip() if pd.notna(row.iloc[0]) else ""
-        rule = str(row.iloc[1]).strip() if pd.notna(row.iloc[1]) else ""
 
-        if not target_col:
-            continue
+@dataclass(frozen=True)
+class EmptyStep:
+    target: str
 
-        if not rule or rule.lower() == "nan":
-            result_df[target_col] = [""] * len(template)
-            continue
+    def evaluate(self, context: PlanContext) -> np.ndarray:
+        return context.empty()
 
-        if rule.startswith("NS="):
-            sequence_template = rule.split("NS=")[-1]
-            num_hashes = sequence_template.count("#")
-            prefix = sequence_template.split("#")[0]
-            result_df[target_col] = [
-                prefix + str(idx + 1).zfill(num_hashes) for idx in range(len(template))
-            ]
-            continue
 
-        if rule.startswith("INVARIABLE="):
-            default_val = rule.split("INVARIABLE=")[-1]
-            result_df[target_col] = [default_val] * len(template)
-            continue
+@dataclass(frozen=True)
+class InvalidStep:
+    """A rule a lenient plan could not compile; reported each time the plan runs."""
 
-        if rule.startswith("MAPPING="):
-            tail = rule.split("MAPPING=")[-1]
-            if ";" not in tail:
-                raise MappingError("Expected format MAPPING=<column>;<sheet>.")
+    target: str
+    error: str
 
-            value1, mapping_sheet = [segment.strip() for segment in tail.split(";", 1)]
-            mapping_df = xls.get(mapping_sheet)
-            if mapping_df is None:
-                result_df[target_col] = [""] * len(template)
+    def evaluate(self, context: PlanContext) -> np.ndarray:
+        raise MappingError(self.error)
+
+
+@dataclass(frozen=True)
+class SequenceStep:
+    """``NS=<prefix>###``: a numbered sequence, zero-padded to the number of ``#``."""
+
+    target: str
+    prefix: str
+    width: int
+
+    def evaluate(self, context: PlanContext) -> np.ndarray:
+        return np.array(
+            [self.prefix + str(idx + 1).zfill(self.width) for idx in range(context.row_count)],
+            dtype=object,
+        )
+
+
+@dataclass(frozen=True)
+class ConstantStep:
+    """``INVARIABLE=<value>``."""
+
+    target: str
+    value: str
+
+    def evaluate(self, context: PlanContext) -> np.ndarray:
+        return _filled(context.row_count, self.value)
+
+
+@dataclass(frozen=True)
+class LookupStep:
+    """``MAPPING=<column>;<sheet>``: translate a template column through a mapping sheet."""
+
+    target: str
+    source_key: str
+    sheet: str
+
+    def evaluate(self, context: PlanContext) -> np.ndarray:
+        table = context.lookup(self.sheet)
+        if table is None:
+            return context.empty()
+
+        matched_col = context.columns.resolve(self.source_key)
+        if matched_col is None:
+            return context.empty()
+        return table.apply(context.template[matched_col])
+
+
+@dataclass(frozen=True)
+class ConcatPart:
+    key: str
+    literal: str | None
+
+
+@dataclass(frozen=True)
+class ConcatStep:
+    """``CONCAT=a+'-'+b`` or ``a + b``: join template columns and quoted literals.
+
+    ``CONCAT=`` treats a quoted operand as a literal first, whereas a bare
+    ``+`` rule prefers a template column of the same name.
+    """
+
+    target: str
+    parts: tuple[ConcatPart, ...]
+    literals_first: bool
+
+    def evaluate(self, context: PlanContext) -> np.ndarray:
+        result = context.empty()
+        for part in self.parts:
+            if self.literals_first and part.literal is not None:
+                result = result + part.literal
                 continue
 
-            if f"{mapping_sheet}Mapping" in mapping_df.columns:
-                mapping_key_col = str(mapping_df.columns[0])
-                mapping_val_col = f"{mapping_sheet}Mapping"
+            matched_col = context.columns.resolve(part.key)
+            if matched_col is not None:
+                result = result + context.text.column(matched_col)
+            elif part.literal is not None:
+                result = result + part.literal
+        return result
+
+
+@dataclass(frozen=True)
+class ColumnStep:
+    """``COLUMN=<column>``: copy a template column as is."""
+
+    target: str
+    source_key: str
+
+    def evaluate(self, context: PlanContext) -> Union[pd.Series, np.ndarray]:
+        matched_col = context.columns.resolve(self.source_key)
+        if matched_col is None:
+            return context.empty()
+        return context.template[matched_col]
+
+
+MappingStep = Union[EmptyStep, InvalidStep, SequenceStep, ConstantStep, LookupStep, ConcatStep, ColumnStep]
+
+
+@dataclass(frozen=True)
+class MappingPlan:
+    """The compiled Parameters sheet: one step per target column, in sheet order.
+
+    A ``lenient`` plan leaves the column of a ``MAPPING=`` rule empty, with
+    a warning, when the rule is malformed or its sheet cannot be used,
+    instead of failing the whole workbook (the desktop tool's behaviour).
+    Compiled plans are shared between files, so a malformed rule is kept as
+    an ``InvalidStep`` and warned about on every ``execute``.
+    """
+
+    steps: tuple[MappingStep, ...]
+    lenient: bool = False
+
+    @property
+    def lookup_sheets(self) -> frozenset[str]:
+        return frozenset(step.sheet for step in self.steps if isinstance(step, LookupStep))
+
+    def execute(
+        self,
+        template: pd.DataFrame,
+        sheets: Mapping[str, pd.DataFrame],
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> pd.DataFrame:
+        """Build the result frame; ``progress`` is called after each step with
+        the share of the plan done so far, expressed in template rows."""
+        context = PlanContext(template, sheets)
+        # A repeated target overwrites the earlier values but keeps the
+        # position of its first occurrence, like successive column assignments.
+        columns: dict[str, Union[pd.Series, np.ndarray]] = {}
+        for done, step in enumerate(self.steps, start=1):
+            if self.lenient and isinstance(step, (LookupStep, InvalidStep)):
+                try:
+                    columns[step.target] = step.evaluate(context)
+                except Exception as exc:  # noqa: BLE001
+                    warnings.warn(f"Mapping error for '{step.target}': {exc}", RuntimeWarning, stacklevel=2)
+                    columns[step.target] = context.empty()
             else:
-                if len(mapping_df.columns) < 2:
-                    raise MappingError("Mapping sheet needs at least 2 columns.")
-                mapping_key_col = str(mapping_df.columns[0])
-                mapping_val_col = str(mapping_df.columns[1])
+                columns[step.target] = step.evaluate(context)
+            if progress is not None:
+                progress(context.row_count * done // len(self.steps))
+        if not columns:
+            return pd.DataFrame()
+        return pd.DataFrame(columns, index=template.index, copy=False)
+
+
+def _concat_parts(parts: Iterable[str]) -> tuple[ConcatPart, ...]:
+    return tuple(
+        ConcatPart(
+            key=_column_key(part),
+            literal=part.strip("'") if part.startswith("'") and part.endswith("'") else None,
+        )
+        for part in parts
+    )
 
-            mapping_dict = dict(zip(mapping_df[mapping_key_col], mapping_df[mapping_val_col]))
 
-            matched_col = _find_column(value1, template.columns)
-            if matched_col is None:
-                result_df[target_col] = [""] * len(template)
-                continue
+def _compile_step(target_col: str, rule: str) -> MappingStep:
+    if not rule or rule.lower() == "nan":
+        return EmptyStep(target_col)
 
-            original_values = template[matched_col]
-            mapped_values = original_values.map(mapping_dict)
-            final_values = [
-                mapped if pd.notna(mapped) and str(mapped).strip().lower() not in {"", "nan"} else original
-                for mapped, original in zip(mapped_values, original_values)
-            ]
-            result_df[target_col] = final_values
-            continue
+    if rule.startswith("NS="):
+        sequence_template = rule.split("NS=")[-1]
+        return SequenceStep(
+            target_col,
+            prefix=sequence_template.split("#")[0],
+            width=sequence_template.count("#"),
+        )
+
+    if rule.startswith("INVARIABLE="):
+        return ConstantStep(target_col, rule.split("INVARIABLE=")[-1])
+
+    if rule.startswith("MAPPING="):
+        tail = rule.split("MAPPING=")[-1]
+        if ";" not in tail:
+            raise MappingError("Expected format MAPPING=<column>;<sheet>.")
+        value1, mapping_sheet = [segment.strip() for segment in tail.split(";", 1)]
+        return LookupStep(target_col, _column_key(value1), mapping_sheet)
+
+    if "CONCAT=" in rule:
+        cleaned = rule.replace("'CONCAT=", "", 1).replace("CONCAT=", "", 1).strip()
+        parts = [part.strip() for part in cleaned.split("+")]
+        return ConcatStep(target_col, _concat_parts(parts), literals_first=True)
+
+    if "+" in rule:
+        parts = [part.strip() for part in rule.split("+")]
+        return ConcatStep(target_col, _concat_parts(parts), literals_first=False)
+
+    if rule.startswith("COLUMN="):
+        return ColumnStep(target_col, _column_key(rule.split("COLUMN=")[-1]))
+
+    # Unknown rule -> empty column but keep the header so nothing breaks
+    return EmptyStep(target_col)
+
+
+def _compile_lenient_step(target_col: str, rule: str) -> MappingStep:
+    try:
+        return _compile_step(target_col, rule)
+    except MappingError as exc:
+        return InvalidStep(target_col, str(exc))
+
+
+@lru_cache(maxsize=64)
+def _compile_entries(entries: tuple[tuple[str, str], ...], lenient: bool = False) -> MappingPlan:
+    compile_step = _compile_lenient_step if lenient else _compile_step
+    return MappingPlan(
+        steps=tuple(compile_step(target_col, rule) for target_col, rule in entries if target_col),
+        lenient=lenient,
+    )
 
-        if "CONCAT=" in rule:
-            result_df[target_col] = [
-                _parse_concat_expression(rule, template.iloc[i], template.columns) or ""
-                for i in range(len(template))
-            ]
-            continue
 
-        if "+" in rule:
-            parts = [part.strip() for part in rule.split("+")]
-            concat_values: list[str] = []
-            for i in range(len(template)):
-                concat = ""
-                for part in parts:
-                    matched = _find_column(part, template.columns)
-                    if matched:
-                        val = template.iloc[i][matched]
-                        concat += "" if pd.isna(val) else str(val)
-                    elif part.startswith("'") and part.endswith("'"):
-                        concat += part.strip("'")
-                concat_values.append(concat)
-            result_df[target_col] = concat_values
+def _cell_text(value: object) -> str:
+    return str(value).strip() if pd.notna(value) else ""
+
+
+def sanitize_rules(payload: object) -> list[dict[str, str]]:
+    """Keep the ``{"target", "rule"}`` entries of a JSON rules override that have a target, as strings."""
+    if not isinstance(payload, list):
+        return []
+
+    sanitized: list[dict[str, str]] = []
+    for entry in payload:
+        if not isinstance(entry, dict):
             continue
 
-        if rule.startswith("COLUMN="):
-            source_col = rule.split("COLUMN=")[-1].strip()
-            matched_col = _find_column(source_col, template.columns)
-            if matched_col is not None:
-                result_df[target_col] = template[matched_col]
-            else:
-                result_df[target_col] = [""] * len(template)
+        target_raw = entry.get("target", "")
+        rule_raw = entry.get("rule", "")
+
+        target = str(target_raw).strip()
+        if not target:
             continue
 
-        # Unknown rule -> empty column but keep the header so nothing breaks
-        result_df[target_col] = [""] * len(template)
+        rule = "" if rule_raw is None else str(rule_raw).strip()
+
+        sanitized.append({"target": target, "rule": rule})
+
+    return sanitized
+
+
+def compile_mapping_plan(source: pd.DataFrame | Sequence[Mapping[str, str]], lenient: bool = False) -> MappingPlan:
+    """Compile a Parameters sheet (target, rule columns) or a rules override.
+
+    Plans are immutable and cached by their (target, rule) pairs, so files
+    sharing the same Parameters reuse the same compiled plan. See
+    ``MappingPlan`` for ``lenient``.
+    """
+    if isinstance(source, pd.DataFrame):
+        rows: Iterable[tuple[object, object]] = ((row.iloc[0], row.iloc[1]) for _, row in source.iterrows())
+    else:
+        rows = ((entry["target"], entry.get("rule", "")) for entry in source)
+    return _compile_entries(tuple((_cell_text(target), _cell_text(rule)) for target, rule in rows), lenient)
+
+
+def _required_sheet(workbook: WorkbookSession, sheet_name: str) -> pd.DataFrame:
+    if not workbook.has_sheet(sheet_name):
+        raise MappingError(f"Missing required sheet '{sheet_name}'.")
+    return workbook.sheet(sheet_name)
+
 
-    return result_df
+def read_plan_inputs(
+    workbook: WorkbookSession,
+    rules_override: Sequence[Mapping[str, str]] | None = None,
+    plan: MappingPlan | None = None,
+    lenient: bool = False,
+) -> tuple[pd.DataFrame, MappingPlan, dict[str, pd.DataFrame]]:
+    """Parse only what the plan uses: Template, Parameters and the ``MAPPING=`` sheets.
+
+    The plan is known before any lookup sheet is read (from ``plan``,
+    ``rules_override`` or the Parameters sheet), so unrelated tabs of the
+    workbook are never parsed.
+    """
+    template = _required_sheet(workbook, "Template")
+    if plan is None and rules_override is not None:
+        plan = compile_mapping_plan(rules_override, lenient)
+    elif plan is None:
+        plan = compile_mapping_plan(_required_sheet(workbook, "Parameters"), lenient)
+
+    sheets = {
+        sheet_name: workbook.sheet(sheet_name)
+        for sheet_name in sorted(plan.lookup_sheets)
+        if workbook.has_sheet(sheet_name)
+    }
+    return template, plan, sheets
+
+
+@dataclass(frozen=True)
+class MappedWorkbook:
+    path: Path
+    rows: int
 
 
 def generate_mapped_workbook(
@@ -168,23 +487,65 @@ def generate_mapped_workbook(
     output_name: str | None = None,
     *,
     rules_override: Sequence[Mapping[str, str]] | None = None,
+    reader: str | None = None,
+    writer: str | None = None,
+    sheet_cache: SheetCache | None = None,
+    timings: PhaseTimings | None = None,
 ) -> Path:
+    return map_workbook(
+        input_excel,
+        output_dir,
+        output_name,
+        rules_override=rules_override,
+        reader=reader,
+        writer=writer,
+        sheet_cache=sheet_cache,
+        timings=timings,
+    ).path
+
+
+def map_workbook(
+    input_excel: str | Path,
+    output_dir: str | Path,
+    output_name: str | None = None,
+    *,
+    rules_override: Sequence[Mapping[str, str]] | None = None,
+    plan: MappingPlan | None = None,
+    reader: str | None = None,
+    writer: str | None = None,
+    sheet_cache: SheetCache | None = None,
+    timings: PhaseTimings | None = None,
+    lenient: bool = False,
+) -> MappedWorkbook:
+    """Like ``generate_mapped_workbook``, also reporting the number of mapped rows.
+
+    A precompiled ``plan`` takes precedence over ``rules_override`` and the
+    workbook's Parameters sheet. ``reader`` and ``writer`` select the Excel
+    engines (see ``reader_engine`` and ``writer_engine``); ``sheet_cache``
+    reuses sheets parsed from the same workbook content by an earlier run.
+    The read, execute and write phases are recorded in ``timings`` when given,
+    with progress through the plan's steps and through the rows written.
+    ``lenient`` compiles the rules into a lenient plan (see ``MappingPlan``).
+    """
+    timings = timings if timings is not None else PhaseTimings()
     input_path = Path(input_excel).resolve()
     output_path = Path(output_dir).resolve()
     output_path.mkdir(parents=True, exist_ok=True)
 
     try:
-        xls = pd.read_excel(
-            input_path,
-            sheet_name=None,
-            engine="openpyxl",
-            keep_default_na=False,
-        )
+        with timings.phase("read"), WorkbookSession(
+            input_path, reader, sheet_cache=sheet_cache, keep_default_na=False
+        ) as workbook:
+            template, plan, sheets = read_plan_inputs(workbook, rules_override, plan, lenient)
+    except MappingError:
+        raise
     except Exception as exc:  # noqa: BLE001
         raise MappingError(f"Cannot read '{input_path.name}': {exc}") from exc
 
+    timings.rows = len(template)
     try:
-        result_df = _build_result_dataframe(xls, rules_override)
+        with timings.phase("execute"):
+            result_df = plan.execute(template, sheets, timings.advance)
     except MappingError:
         raise
     except Exception as exc:  # noqa: BLE001
@@ -200,8 +561,17 @@ def generate_mapped_workbook(
     destination = output_path / final_name
 
     try:
-        result_df.to_excel(destination, index=False)
+        with timings.phase("write"):
+            engine = writer_engine(writer)
+            # xlsxwriter turns URL-like text into hyperlinks by default (and drops
+            # them past its per-sheet limit); keep them plain text, as openpyxl does.
+            engine_kwargs = {"options": {"strings_to_urls": False}} if engine == "xlsxwriter" else None
+            with pd.ExcelWriter(destination, engine=engine, engine_kwargs=engine_kwargs) as excel:
+                for start in range(0, max(len(result_df), 1), WRITE_CHUNK_ROWS):
+                    chunk = result_df.iloc[start : start + WRITE_CHUNK_ROWS]
+                    chunk.to_excel(excel, index=False, header=start == 0, startrow=start + 1 if start else 0)
+                    timings.advance(start + len(chunk))
     except Exception as exc:  # noqa: BLE001
         raise MappingError(f"Failed to save '{final_name}': {exc}") from exc
 
-    return destination
+    return MappedWorkbook(destination, len(result_df))
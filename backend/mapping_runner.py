@@ -3,36 +3,13 @@ from __future__ import annotations
 import json
 import sys
 from pathlib import Path
-from typing import Any
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from backend.mapping.mapper import MappingError, generate_mapped_workbook  # noqa: E402
-
-
-def _sanitize_rules(payload: Any) -> list[dict[str, str]]:
-    if not isinstance(payload, list):
-        return []
-
-    sanitized: list[dict[str, str]] = []
-    for entry in payload:
-        if not isinstance(entry, dict):
-            continue
-
-        target_raw = entry.get("target", "")
-        rule_raw = entry.get("rule", "")
-
-        target = str(target_raw).strip()
-        if not target:
-            continue
-
-        rule = "" if rule_raw is None else str(rule_raw).strip()
-
-        sanitized.append({"target": target, "rule": rule})
-
-    return sanitized
+from backend.instrumentation import PhaseTimings, format_progress  # noqa: E402
+from backend.mapping.mapper import MappingError, generate_mapped_workbook, sanitize_rules  # noqa: E402
 
 
 def main() -> int:
@@ -56,24 +33,29 @@ def main() -> int:
             print(f"ERROR:Failed to read rules override: {exc}", file=sys.stderr)
             return 1
 
-        rules_override = _sanitize_rules(payload)
+        rules_override = sanitize_rules(payload)
 
+    timings = PhaseTimings(progress=lambda event: print(format_progress(event), flush=True))
     try:
         destination = generate_mapped_workbook(
             input_path,
             output_dir,
             output_name,
             rules_override=rules_override,
+            timings=timings,
         )
     except MappingError as exc:
         print(f"ERROR:{exc}", file=sys.stderr)
+        print("\n".join(timings.lines()), file=sys.stderr)
         return 1
     except Exception as exc:  # noqa: BLE001
         print(f"ERROR:{exc}", file=sys.stderr)
+        print("\n".join(timings.lines()), file=sys.stderr)
         return 1
 
     print(f"RESULT:{destination.name}")
     print(f"INFO:Generated {destination.name}")
+    print("\n".join(timings.lines()))
     return 0
 
 
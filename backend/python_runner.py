@@ -5,7 +5,11 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend.dmf_validation.error_table import ERROR_TABLE_FORMATS  # type: ignore  # noqa: E402
+from backend.dmf_validation.profile import profile_path  # type: ignore  # noqa: E402
 from backend.dmf_validation.validator import generate_result_from_excel  # type: ignore  # noqa: E402
+from backend.instrumentation import PhaseTimings, format_progress  # type: ignore  # noqa: E402
+from backend.workbook import READER_ENGINES, WRITER_ENGINES  # type: ignore  # noqa: E402
 from tkinter import messagebox  # type: ignore  # noqa: E402
 
 messages: list[str] = []
@@ -30,13 +34,45 @@ messagebox.showerror = _error  # type: ignore[assignment]
 
 
 def main() -> int:
-    if len(sys.argv) < 3:
-        print("Usage: python python_runner.py <input_excel> <output_dir> [rules_json]", file=sys.stderr)
-        return 1
-
-    input_path = Path(sys.argv[1]).resolve()
-    output_dir = Path(sys.argv[2]).resolve()
-    rules_path = Path(sys.argv[3]).resolve() if len(sys.argv) > 3 else None
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        usage="python python_runner.py <input_excel> <output_dir> [rules_json] [--errors-format {csv,parquet,arrow}] [--workers N] [--reader ENGINE] [--writer ENGINE] [--profile]",
+    )
+    parser.add_argument("input_excel")
+    parser.add_argument("output_dir")
+    parser.add_argument("rules_json", nargs="?")
+    parser.add_argument(
+        "--errors-format",
+        choices=sorted(ERROR_TABLE_FORMATS),
+        help="Ecrit aussi les erreurs au format long (<input> errors.<ext>) a cote du rapport",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus pour evaluer les regles en parallele (defaut: 1)",
+    )
+    parser.add_argument(
+        "--reader",
+        choices=["auto", *READER_ENGINES],
+        help="Moteur de lecture Excel (defaut: PYTHON_EXCEL_READER, sinon auto)",
+    )
+    parser.add_argument(
+        "--writer",
+        choices=["auto", *WRITER_ENGINES],
+        help="Moteur d'ecriture Excel (defaut: PYTHON_EXCEL_WRITER, sinon auto)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Mesure le cout de chaque regle et l'ecrit dans <input> profile.json",
+    )
+    args = parser.parse_args()
+
+    input_path = Path(args.input_excel).resolve()
+    output_dir = Path(args.output_dir).resolve()
+    rules_path = Path(args.rules_json).resolve() if args.rules_json else None
 
     rules_override = None
     if rules_path is not None:
@@ -44,16 +80,29 @@ def main() -> int:
 
         rules_override = json.loads(rules_path.read_text(encoding="utf-8"))
 
+    timings = PhaseTimings(progress=lambda event: print(format_progress(event), flush=True))
     try:
-        generate_result_from_excel(str(input_path), str(output_dir), rules_override=rules_override)
+        generate_result_from_excel(
+            str(input_path),
+            str(output_dir),
+            rules_override=rules_override,
+            errors_format=args.errors_format,
+            workers=args.workers,
+            reader=args.reader,
+            writer=args.writer,
+            timings=timings,
+            profile=args.profile,
+        )
     except Exception as exc:  # noqa: BLE001
         if all(not msg.startswith("ERROR:") for msg in messages):
             messages.append(f"ERROR:{exc}")
-        for msg in messages:
+        for msg in [*messages, *timings.lines()]:
             print(msg, file=sys.stderr)
         return 1
 
-    for msg in messages:
+    if args.profile:
+        messages.append(f"INFO:Profil des regles: {profile_path(input_path, output_dir)}")
+    for msg in [*messages, *timings.lines()]:
         print(msg)
     return 0
 
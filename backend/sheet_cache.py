@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+from backend.dmf_validation.result_cache import evict_least_recent, hash_file, load_pickle, private_directory
+
+# Bump when the stored layout changes or when parsing changes what a sheet
+# decodes to, so stale frames are not served after an upgrade.
+SHEET_CACHE_VERSION = "1"
+
+DEFAULT_MAX_WORKBOOKS = 32
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+SHEET_NAMES_FILE = "sheets.pkl"
+
+
+def _feather_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _feather_compatible(frame: pd.DataFrame) -> bool:
+    # Arrow cannot hold object columns losslessly (mixed int/str cells, None
+    # vs NaN), so those frames are pickled instead.
+    return (
+        isinstance(frame.index, pd.RangeIndex)
+        and frame.index.start == 0
+        and frame.index.step == 1
+        and all(isinstance(column, str) for column in frame.columns)
+        and frame.columns.is_unique
+        and not any(dtype == object for dtype in frame.dtypes)
+    )
+
+
+def _write_atomic(path: Path, write: Any) -> None:
+    # Best effort, like the revalidation store: the entry may have been
+    # evicted by another worker meanwhile.
+    try:
+        handle, staging = tempfile.mkstemp(prefix=".tmp-", dir=path.parent)
+    except OSError:
+        return
+    os.close(handle)
+    try:
+        write(staging)
+        os.replace(staging, path)
+    except OSError:
+        Path(staging).unlink(missing_ok=True)
+    except BaseException:
+        Path(staging).unlink(missing_ok=True)
+        raise
+
+
+def _dump_pickle(path: str, payload: Any) -> None:
+    with open(path, "wb") as stream:
+        pickle.dump(payload, stream, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class CachedWorkbook:
+    """The parsed sheets stored for one workbook content."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        os.utime(directory)
+
+    def _sheet_path(self, sheet_name: str, options: str, suffix: str) -> Path:
+        digest = hashlib.sha256(f"{sheet_name}\0{options}".encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{suffix}"
+
+    def load_sheet_names(self) -> Optional[list[str]]:
+        return load_pickle(self.directory / SHEET_NAMES_FILE)
+
+    def save_sheet_names(self, sheet_names: list[str]) -> None:
+        _write_atomic(self.directory / SHEET_NAMES_FILE, lambda staging: _dump_pickle(staging, sheet_names))
+
+    def load(self, sheet_name: str, options: str) -> Optional[pd.DataFrame]:
+        feather_path = self._sheet_path(sheet_name, options, ".feather")
+        if feather_path.exists() and _feather_available():
+            try:
+                return pd.read_feather(feather_path)
+            except Exception:  # noqa: BLE001
+                # Truncated or written by an incompatible pyarrow: a miss.
+                return None
+        return load_pickle(self._sheet_path(sheet_name, options, ".pkl"))
+
+    def save(self, sheet_name: str, options: str, frame: pd.DataFrame) -> None:
+        if _feather_available() and _feather_compatible(frame):
+            _write_atomic(self._sheet_path(sheet_name, options, ".feather"), frame.to_feather)
+        else:
+            _write_atomic(self._sheet_path(sheet_name, options, ".pkl"), lambda staging: _dump_pickle(staging, frame))
+
+
+class SheetCache:
+    """On-disk cache of parsed sheets, keyed by workbook content hash.
+
+    Parsing the xlsx XML is the most expensive step of both the validation
+    and the mapping, and the same workbook is often validated, mapped and
+    validated again. Each sheet a ``WorkbookSession`` parses is stored under
+    the workbook's digest, the sheet name, the reader engine and the read
+    options, as Feather when pyarrow is installed and the frame has no
+    ``object`` columns, as a pickle otherwise; both restore the frame
+    exactly. Since it holds pickles, the store is only used when its
+    directory is private to the service (see ``private_directory``):
+    ``workbook`` returns None otherwise and sheets are parsed as usual.
+    The least recently used workbooks are evicted beyond ``max_workbooks``
+    or ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_workbooks: int = DEFAULT_MAX_WORKBOOKS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_workbooks = max_workbooks
+        self.max_bytes = max_bytes
+
+    def workbook(self, path: str | Path, digest: Optional[str] = None) -> Optional[CachedWorkbook]:
+        if not private_directory(self.directory):
+            return None
+        entry = CachedWorkbook(self.directory / f"{SHEET_CACHE_VERSION}-{digest or hash_file(path)}")
+        evict_least_recent(self.directory, self.max_workbooks, self.max_bytes)
+        return entry
+
+
+def sheet_cache_from_env(directory: str | Path) -> Optional[SheetCache]:
+    """The cache sized by ``PYTHON_SHEET_CACHE_MAX_WORKBOOKS``/``PYTHON_SHEET_CACHE_MAX_MB``; None when disabled."""
+    max_workbooks = int(os.environ.get("PYTHON_SHEET_CACHE_MAX_WORKBOOKS", DEFAULT_MAX_WORKBOOKS))
+    max_bytes = int(float(os.environ.get("PYTHON_SHEET_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024))) * 1024 * 1024)
+    if max_workbooks <= 0 or max_bytes <= 0:
+        return None
+    return SheetCache(directory, max_workbooks, max_bytes)
+
+
+__all__ = ["CachedWorkbook", "SheetCache", "sheet_cache_from_env"]
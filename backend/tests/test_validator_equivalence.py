@@ -0,0 +1,118 @@
+"""The validation engine against the row-by-row validator it replaced.
+
+Every mode of ``generate_result_from_excel`` (in memory, streamed in small
+chunks, sharded across worker processes) must give each template row the
+same ``Valid`` flag and ``Errors`` message as ``baseline_validator``, and
+the same ``ErrorSummary`` sheet, with every installed reader and writer.
+"""
+from __future__ import annotations
+
+import datetime
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from backend.dmf_validation import validator
+from backend.tests import baseline_validator
+from backend.workbook import READER_ENGINES, WRITER_ENGINES
+
+RULES = [
+    # Field, Checked, Required, MinLength, MaxLength, AllowedValues, Pattern, CustomRule
+    ("Code", 1, 1, 3, 6, None, r"[A-Z]{2}\d+", None),
+    ("Country", 1, 1, None, None, "SHEET=Country", None, "equals:Region;Region"),
+    ("Status", 1, 0, None, None, "VALUE=OPEN;CLOSED", None, None),
+    ("Ref", 1, 1, None, None, None, None, "unique"),
+    ("Start", 1, 1, None, None, None, None, None),
+    ("Amount", 1, 0, None, 4, None, None, None),
+    ("Notes", 0, 1, None, None, None, None, None),
+]
+
+TEMPLATE = [
+    ("Code", "Country", "Status", "Ref", "Region", "Start", "Amount", "Notes"),
+    ("AB12", "FR", "OPEN", "R1", "WEST", datetime.datetime(2024, 1, 2), 12, "x"),
+    ("AB1234567", "DE", "CLOSED", "R2", "NORTH", datetime.datetime(2024, 2, 3, 8, 30), 12345, None),
+    ("ab1", "fr", "PENDING", "R3", "WEST", None, 7.5, None),
+    (None, None, None, None, None, None, None, None),
+    ("XY9", "IT", "open", "R1", "WEST", datetime.datetime(2024, 3, 4), None, None),
+    ("CD34", "DE", None, "R5", "SOUTH", datetime.datetime(2024, 4, 5), 0.25, None),
+    ("EF56", " ES ", "Closed", 6, None, datetime.datetime(2024, 5, 6), 99, None),
+    ("G", "FR", "", "R7", "NORTH", datetime.datetime(2024, 6, 7), -3, None),
+    ("HJ7", None, "OPEN", "", "WEST", datetime.datetime(2024, 7, 8), 1.5, None),
+]
+
+COUNTRIES = [("Country", "Region"), ("FR", "WEST"), ("DE", "NORTH"), ("ES", "SOUTH")]
+
+MODES = {
+    "in-memory": {},
+    "streamed": {"chunk_size": 2},
+    "sharded": {"workers": 3},
+    "streamed-sharded": {"workers": 3, "chunk_size": 2},
+}
+
+
+@pytest.fixture(scope="module")
+def workbook_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    workbook = Workbook()
+    template = workbook.active
+    template.title = validator.TEMPLATE_SHEET
+    for row in TEMPLATE:
+        template.append(row)
+    rules = workbook.create_sheet(validator.RULES_SHEET)
+    rules.append(["Field", "Checked", "Required", "MinLength", "MaxLength", "AllowedValues", "Pattern", "CustomRule"])
+    for rule in RULES:
+        rules.append(rule)
+    countries = workbook.create_sheet("Country")
+    for row in COUNTRIES:
+        countries.append(row)
+
+    path = tmp_path_factory.mktemp("equivalence") / "mixed.xlsx"
+    workbook.save(path)
+    return path
+
+
+def _trimmed(row: tuple[object, ...]) -> tuple[object, ...]:
+    end = len(row)
+    while end and row[end - 1] is None:
+        end -= 1
+    return row[:end]
+
+
+def _review(path: str) -> tuple[list[tuple[object, object]], list[tuple[object, ...]]]:
+    """(Valid, Errors) of each Result row, and the ErrorSummary rows, as written."""
+    workbook = load_workbook(path, read_only=True)
+    try:
+        rows = list(workbook["Result"].iter_rows(values_only=True))
+        # Trailing blanks depend on the sheet dimension each writer records.
+        summary = [_trimmed(row) for row in workbook["ErrorSummary"].iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+    valid, errors = rows[0].index("Valid"), rows[0].index("Errors")
+    return [(row[valid], row[errors] or "") for row in rows[1:]], summary
+
+
+@pytest.fixture(scope="module")
+def baseline_review(workbook_path: Path, tmp_path_factory: pytest.TempPathFactory):
+    output_dir = tmp_path_factory.mktemp("baseline")
+    return _review(baseline_validator.generate_result_from_excel(str(workbook_path), str(output_dir)))
+
+
+@pytest.mark.parametrize("writer", list(WRITER_ENGINES))
+@pytest.mark.parametrize("reader", list(READER_ENGINES))
+@pytest.mark.parametrize("mode", list(MODES))
+def test_matches_row_by_row_validator(workbook_path, baseline_review, tmp_path, monkeypatch, mode, reader, writer):
+    pytest.importorskip(READER_ENGINES[reader])
+    pytest.importorskip(WRITER_ENGINES[writer])
+    # Shard even this small template across the workers.
+    monkeypatch.setattr(validator, "MIN_ROWS_PER_SHARD", 2)
+
+    output = validator.generate_result_from_excel(
+        str(workbook_path), str(tmp_path), reader=reader, writer=writer, **MODES[mode]
+    )
+
+    expected_rows, expected_summary = baseline_review
+    rows, summary = _review(output)
+    assert len(rows) == len(TEMPLATE) - 1
+    for position, (row, expected) in enumerate(zip(rows, expected_rows)):
+        assert row == expected, f"template row {position}"
+    assert summary == expected_summary
@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import warnings
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from pandas.io.parsers import TextParser
+
+if TYPE_CHECKING:
+    from backend.sheet_cache import CachedWorkbook, SheetCache
+
+# Engines ``pd.ExcelFile`` can read workbooks with (and engines the reports
+# can be written with), with the Python package each one needs. ``auto``
+# picks the first installed engine of the preference order.
+READER_ENGINES = {
+    "openpyxl": "openpyxl",
+    "calamine": "python_calamine",
+}
+READER_PREFERENCE = ("calamine", "openpyxl")
+READER_ENV = "PYTHON_EXCEL_READER"
+
+WRITER_ENGINES = {
+    "openpyxl": "openpyxl",
+    "xlsxwriter": "xlsxwriter",
+}
+WRITER_PREFERENCE = ("xlsxwriter", "openpyxl")
+WRITER_ENV = "PYTHON_EXCEL_WRITER"
+
+
+def _engine_installed(engine: str) -> bool:
+    package = READER_ENGINES.get(engine) or WRITER_ENGINES[engine]
+    return importlib.util.find_spec(package) is not None
+
+
+def _resolve_engine(
+    kind: str,
+    engine: Optional[str],
+    engines: dict[str, str],
+    preference: Sequence[str],
+    env: str,
+) -> str:
+    requested = (engine or os.environ.get(env) or "auto").strip().lower()
+    if requested == "auto":
+        return next(name for name in preference if _engine_installed(name))
+    if requested not in engines:
+        raise ValueError(f"Unknown Excel {kind} '{requested}' (expected auto, {', '.join(engines)}).")
+    if not _engine_installed(requested):
+        warnings.warn(
+            f"Excel {kind} '{requested}' is not installed (pip install {engines[requested].replace('_', '-')}); "
+            "falling back to openpyxl.",
+            RuntimeWarning,
+            stacklevel=3,
+        )
+        return "openpyxl"
+    return requested
+
+
+def reader_engine(engine: Optional[str] = None) -> str:
+    """Resolve ``engine`` (``auto``, ``openpyxl`` or ``calamine``) to an installed reader.
+
+    Without ``engine``, the ``PYTHON_EXCEL_READER`` environment variable is
+    used, then ``auto``. A requested engine that is not installed falls back
+    to openpyxl with a warning.
+    """
+    return _resolve_engine("reader", engine, READER_ENGINES, READER_PREFERENCE, READER_ENV)
+
+
+def writer_engine(engine: Optional[str] = None) -> str:
+    """Resolve ``engine`` (``auto``, ``openpyxl`` or ``xlsxwriter``) to an installed writer.
+
+    Same rules as ``reader_engine``, with the ``PYTHON_EXCEL_WRITER``
+    environment variable.
+    """
+    return _resolve_engine("writer", engine, WRITER_ENGINES, WRITER_PREFERENCE, WRITER_ENV)
+
+
+def _convert_cell(cell: Any) -> object:
+    # Same conversion as the pandas openpyxl reader, so streamed chunks hold
+    # the values ``pd.read_excel`` would have produced.
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        if value == cell.value:
+            return value
+        return float(cell.value)
+    return cell.value
+
+
+def _has_values(series: pd.Series) -> bool:
+    return bool(series.notna().any())
+
+
+def _text_dtype() -> Any:
+    # The dtype pandas gives to a column of plain strings (``object`` before
+    # pandas 3, ``str`` since).
+    return TextParser([["text"]], header=None, names=["value"]).read()["value"].dtype
+
+
+class _ColumnLayout:
+    """Dtypes seen for one column across the chunks of a scan."""
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.missing = False
+        self.all_text = True
+        self.dtypes: list[Any] = []
+        self.empty_dtype: Any = None
+
+    def observe(self, series: pd.Series, raw: pd.Series) -> None:
+        self.rows += len(series)
+        if not _has_values(series):
+            self.missing = self.missing or len(series) > 0
+            if self.empty_dtype is None:
+                self.empty_dtype = series.dtype
+            return
+        self.missing = self.missing or bool(series.isna().any())
+        self.all_text = self.all_text and pd.api.types.infer_dtype(raw, skipna=True) == "string"
+        if series.dtype not in self.dtypes:
+            self.dtypes.append(series.dtype)
+
+    @property
+    def numeric(self) -> bool:
+        return all(isinstance(dtype, np.dtype) and dtype.kind in "biuf" for dtype in self.dtypes)
+
+    @property
+    def keeps_raw_values(self) -> bool:
+        """Whether a whole-sheet read leaves the cell values unconverted.
+
+        That happens when numeric conversion fails somewhere in the column,
+        which shows up as chunks inferred with different, non-numeric dtypes.
+        """
+        return len(self.dtypes) > 1 and not self.numeric
+
+    def sheet_dtype(self, total_rows: int) -> Any:
+        """The dtype pandas infers when the column is parsed in one piece."""
+        missing = self.missing or self.rows < total_rows
+        if not self.dtypes:
+            return self.empty_dtype if self.empty_dtype is not None else np.dtype(object)
+        if self.keeps_raw_values:
+            return _text_dtype() if self.all_text else np.dtype(object)
+        dtype = np.result_type(*self.dtypes) if len(self.dtypes) > 1 else self.dtypes[0]
+        if missing and isinstance(dtype, np.dtype) and dtype.kind in "biu":
+            return np.dtype(np.float64)
+        return dtype
+
+
+class SheetStream:
+    """Read one sheet in chunks of rows instead of parsing it whole.
+
+    Rows are converted and parsed like ``WorkbookSession.sheet`` does, but
+    pandas infers dtypes chunk by chunk, so the sheet is read twice: ``scan``
+    records the width and the dtypes of the whole sheet, then ``chunks``
+    yields frames cast to those dtypes. Only the current chunk is held in
+    memory.
+    """
+
+    def __init__(self, worksheet: Any, chunk_size: int, read_options: dict[str, Any]) -> None:
+        self._worksheet = worksheet
+        self.chunk_size = max(1, int(chunk_size))
+        self._read_options = read_options
+        self.columns: list[object] = []
+        self.total_rows = 0
+        self._width = 0
+        self._dtypes: dict[object, Any] = {}
+        self._raw_columns: dict[object, Any] = {}
+        self._scanned = False
+
+    def _rows(self) -> Iterator[list[object]]:
+        # Blank rows are kept between data rows but dropped at the end of
+        # the sheet, as in ``pd.read_excel``.
+        self._worksheet.reset_dimensions()
+        pending_blank = 0
+        for row in self._worksheet.rows:
+            values = [_convert_cell(cell) for cell in row]
+            while values and values[-1] == "":
+                values.pop()
+            if not values:
+                pending_blank += 1
+                continue
+            for _ in range(pending_blank):
+                yield []
+            pending_blank = 0
+            yield values
+
+    def _batches(self) -> Iterator[tuple[list[object], list[list[object]]]]:
+        rows = self._rows()
+        header = next(rows, None)
+        if header is None:
+            return
+
+        batch: list[list[object]] = []
+        emitted = False
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.chunk_size:
+                yield header, batch
+                emitted = True
+                batch = []
+        if batch or not emitted:
+            yield header, batch
+
+    def _parse(
+        self,
+        header: list[object],
+        rows: list[list[object]],
+        width: int,
+        dtype: Optional[dict[object, Any]] = None,
+    ) -> pd.DataFrame:
+        data = [row + [""] * (width - len(row)) for row in [header, *rows]]
+        parser = TextParser(data, header=0, skip_blank_lines=False, dtype=dtype, **self._read_options)
+        return parser.read()
+
+    def _cast(self, frame: pd.DataFrame) -> pd.DataFrame:
+        casts = {
+            column: self._dtypes[column]
+            for column in frame.columns
+            if column in self._dtypes and frame[column].dtype != self._dtypes[column]
+        }
+        return frame.astype(casts) if casts else frame
+
+    def scan(self, visit: Optional[Callable[[pd.DataFrame], None]] = None) -> None:
+        """First pass over the sheet; ``visit`` receives each chunk with object dtypes."""
+        layouts: dict[object, _ColumnLayout] = {}
+        columns: list[object] = []
+        total_rows = 0
+        width = 0
+
+        for header, rows in self._batches():
+            chunk_width = max([len(header), *(len(row) for row in rows)])
+            frame = self._parse(header, rows, chunk_width)
+            raw = self._parse(header, rows, chunk_width, dtype={column: object for column in frame.columns})
+            for column in frame.columns:
+                if column not in layouts:
+                    layouts[column] = _ColumnLayout()
+                    columns.append(column)
+                layouts[column].observe(frame[column], raw[column])
+            total_rows += len(frame)
+            width = max(width, chunk_width)
+            if visit is not None:
+                visit(raw)
+
+        self.columns = columns
+        self.total_rows = total_rows
+        self._width = width
+        self._dtypes = {column: layouts[column].sheet_dtype(total_rows) for column in columns}
+        # Those columns are parsed without numeric inference, then cast.
+        self._raw_columns = {column: object for column in columns if layouts[column].keeps_raw_values}
+        self._scanned = True
+
+    def chunks(self) -> Iterator[pd.DataFrame]:
+        """Second pass: yield chunks with the dtypes of a whole-sheet read."""
+        if not self._scanned:
+            self.scan()
+        for header, rows in self._batches():
+            yield self._cast(self._parse(header, rows, self._width, dtype=self._raw_columns))
+
+    def parse_values(self, column: object, values: Sequence[object]) -> pd.Series:
+        """Re-parse raw values from ``scan`` as they would appear in ``column``."""
+        if not values:
+            return pd.Series([], dtype=self._dtypes.get(column, object))
+        dtype = {"value": object} if column in self._raw_columns else None
+        parser = TextParser(
+            [[value] for value in values],
+            header=None,
+            names=["value"],
+            skip_blank_lines=False,
+            dtype=dtype,
+            **self._read_options,
+        )
+        series = parser.read()["value"]
+        sheet_dtype = self._dtypes.get(column)
+        if sheet_dtype is not None and series.dtype != sheet_dtype:
+            series = series.astype(sheet_dtype)
+        return series
+
+
+class WorkbookSession:
+    """An Excel workbook opened once, with sheets parsed lazily on first access.
+
+    The workbook is read by ``engine`` (see ``reader_engine``); with openpyxl
+    it is loaded in read-only mode, so the archive and its shared strings
+    are read a single time no matter how many sheets are requested. Parsed
+    sheets are kept for the lifetime of the session; extra keyword arguments
+    are forwarded to ``pd.ExcelFile.parse``.
+
+    With a ``sheet_cache``, parsed sheets (and the sheet names) are also
+    stored on disk under the workbook's content hash (``digest`` when the
+    caller already computed it); a later session on the same content loads
+    them from there and only opens the workbook for what is missing.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        engine: Optional[str] = None,
+        *,
+        sheet_cache: Optional[SheetCache] = None,
+        digest: Optional[str] = None,
+        **read_options: Any,
+    ) -> None:
+        self.path = Path(path)
+        self.engine = reader_engine(engine)
+        self._read_options = read_options
+        self._excel_file: Optional[pd.ExcelFile] = None
+        self._sheet_names: Optional[list[str]] = None
+        self._sheets: dict[str, pd.DataFrame] = {}
+        self._stream_book: Any = None
+        self._cached: Optional[CachedWorkbook] = sheet_cache.workbook(self.path, digest) if sheet_cache else None
+        self._cache_options = repr((self.engine, sorted(read_options.items())))
+
+    @property
+    def _excel(self) -> pd.ExcelFile:
+        if self._excel_file is None:
+            self._excel_file = pd.ExcelFile(self.path, engine=self.engine)
+        return self._excel_file
+
+    @property
+    def sheet_names(self) -> list[str]:
+        if self._sheet_names is None:
+            if self._cached is not None:
+                self._sheet_names = self._cached.load_sheet_names()
+            if self._sheet_names is None:
+                self._sheet_names = [str(name) for name in self._excel.sheet_names]
+                if self._cached is not None:
+                    self._cached.save_sheet_names(self._sheet_names)
+        return self._sheet_names
+
+    def has_sheet(self, sheet_name: str) -> bool:
+        return sheet_name in self.sheet_names
+
+    def sheet(self, sheet_name: str) -> pd.DataFrame:
+        frame = self._sheets.get(sheet_name)
+        if frame is None and self._cached is not None:
+            frame = self._cached.load(sheet_name, self._cache_options)
+        if frame is None:
+            frame = self._excel.parse(sheet_name, **self._read_options)
+            if self._cached is not None:
+                self._cached.save(sheet_name, self._cache_options, frame)
+        self._sheets[sheet_name] = frame
+        return frame
+
+    def stream(self, sheet_name: str, chunk_size: int) -> SheetStream:
+        """Read ``sheet_name`` in chunks of ``chunk_size`` rows; see ``SheetStream``.
+
+        Streaming always goes through openpyxl's row iterator, whatever the
+        session's engine.
+        """
+        if not self.has_sheet(sheet_name):
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        if self.engine == "openpyxl":
+            book = self._excel.book
+        else:
+            if self._stream_book is None:
+                # The options the pandas openpyxl reader loads workbooks with.
+                self._stream_book = load_workbook(self.path, read_only=True, data_only=True, keep_links=False)
+            book = self._stream_book
+        return SheetStream(book[sheet_name], chunk_size, self._read_options)
+
+    def close(self) -> None:
+        if self._excel_file is not None:
+            self._excel_file.close()
+        if self._stream_book is not None:
+            self._stream_book.close()
+
+    def __enter__(self) -> WorkbookSession:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+__all__ = ["READER_ENGINES", "SheetStream", "WRITER_ENGINES", "WorkbookSession", "reader_engine", "writer_engine"]
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Callable, Optional, TextIO
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Imported at module level so every worker process pays the pandas/openpyxl
+# import cost once, when it starts, instead of once per job.
+from backend.dmf_validation.error_table import error_table_path  # noqa: E402
+from backend.dmf_validation.profile import profile_path  # noqa: E402
+from backend.dmf_validation.result_cache import cache_from_env  # noqa: E402
+from backend.dmf_validation.revalidation import revalidation_from_env  # noqa: E402
+from backend.dmf_validation.validator import generate_result_from_excel  # noqa: E402
+from backend.instrumentation import PhaseTimings, ProgressCallback  # noqa: E402
+from backend.mapping.mapper import generate_mapped_workbook, sanitize_rules  # noqa: E402
+from backend.sheet_cache import sheet_cache_from_env  # noqa: E402
+
+DEFAULT_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+DEFAULT_MAX_PENDING = 16
+DEFAULT_JOB_TIMEOUT = 600.0
+
+# Validations stream the template in chunks of this many rows when set
+# (PYTHON_CHUNK_SIZE), instead of loading it at once; a request can override it.
+STREAM_CHUNK_SIZE = int(os.environ.get("PYTHON_CHUNK_SIZE", 0)) or None
+
+# Validation outputs are cached under the job's output directory, sized by
+# PYTHON_CACHE_MAX_ENTRIES and PYTHON_CACHE_MAX_MB (0 disables the cache).
+RESULT_CACHE_DIR = ".cache"
+
+# Parsed templates and per-rule results, so a workbook resubmitted with new
+# rules only re-evaluates the changed ones (PYTHON_REVALIDATION_MAX_TEMPLATES).
+REVALIDATION_DIR = ".templates"
+
+# Parsed sheets by workbook content, shared by validation and mapping jobs
+# (PYTHON_SHEET_CACHE_MAX_WORKBOOKS, PYTHON_SHEET_CACHE_MAX_MB).
+SHEET_CACHE_DIR = ".sheets"
+
+
+def _run_validation(params: dict[str, Any], progress: ProgressCallback) -> dict[str, Any]:
+    timings = PhaseTimings(progress)
+    output = generate_result_from_excel(
+        str(Path(params["input"]).resolve()),
+        str(Path(params["outputDir"]).resolve()),
+        rules_override=params.get("rules"),
+        chunk_size=params.get("chunkSize") or STREAM_CHUNK_SIZE,
+        errors_format=params.get("errorsFormat") or None,
+        cache=cache_from_env(Path(params["outputDir"]).resolve() / RESULT_CACHE_DIR),
+        revalidation=revalidation_from_env(Path(params["outputDir"]).resolve() / REVALIDATION_DIR),
+        sheet_cache=sheet_cache_from_env(Path(params["outputDir"]).resolve() / SHEET_CACHE_DIR),
+        timings=timings,
+        profile=bool(params.get("profile")),
+    )
+    result = {"output": output, "name": Path(output).name, **timings.as_dict()}
+    if params.get("errorsFormat"):
+        result["errors"] = str(error_table_path(params["input"], Path(params["outputDir"]).resolve(), params["errorsFormat"]))
+    if params.get("profile"):
+        result["profile"] = str(profile_path(params["input"], Path(params["outputDir"]).resolve()))
+    return result
+
+
+def _run_mapping(params: dict[str, Any], progress: ProgressCallback) -> dict[str, Any]:
+    rules = params.get("rules")
+    timings = PhaseTimings(progress)
+    destination = generate_mapped_workbook(
+        Path(params["input"]).resolve(),
+        Path(params["outputDir"]).resolve(),
+        params.get("outputName") or None,
+        rules_override=sanitize_rules(rules) if rules is not None else None,
+        sheet_cache=sheet_cache_from_env(Path(params["outputDir"]).resolve() / SHEET_CACHE_DIR),
+        timings=timings,
+    )
+    return {"output": str(destination), "name": destination.name, **timings.as_dict()}
+
+
+JOB_HANDLERS: dict[str, Callable[[dict[str, Any], ProgressCallback], dict[str, Any]]] = {
+    "validate": _run_validation,
+    "mapping": _run_mapping,
+}
+
+
+def _worker_main(connection: Connection) -> None:
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        method, params = job
+
+        def progress(event: dict[str, Any]) -> None:
+            # Sent before the final (ok, payload) pair and told apart by its None flag.
+            connection.send((None, event))
+
+        try:
+            connection.send((True, JOB_HANDLERS[method](params, progress)))
+        except Exception as exc:  # noqa: BLE001
+            connection.send((False, str(exc)))
+
+
+@dataclass
+class Job:
+    id: str
+    method: str
+    params: dict[str, Any]
+    reply: Callable[[dict[str, Any]], None]
+
+
+class WorkerSlot(threading.Thread):
+    """Feed jobs from the shared queue to one dedicated worker process.
+
+    The process is started eagerly and reused across jobs. It is killed and
+    replaced when a job exceeds its timeout or when the process dies.
+    """
+
+    def __init__(self, pool: WorkerPool, index: int) -> None:
+        super().__init__(name=f"dmf-worker-{index}", daemon=True)
+        self._pool = pool
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._connection: Optional[Connection] = None
+        self._start_process()
+
+    def _start_process(self) -> None:
+        parent_end, child_end = self._pool.context.Pipe()
+        self._process = self._pool.context.Process(target=_worker_main, args=(child_end,), daemon=True)
+        self._process.start()
+        child_end.close()
+        self._connection = parent_end
+
+    def _stop_process(self, graceful: bool) -> None:
+        if self._process is None or self._connection is None:
+            return
+        if graceful:
+            try:
+                self._connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self._process.join(5)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._connection.close()
+        self._process = None
+        self._connection = None
+
+    def run(self) -> None:
+        while True:
+            job = self._pool.jobs.get()
+            if job is None:
+                self._stop_process(graceful=True)
+                return
+            job.reply(self._execute(job))
+
+    def _execute(self, job: Job) -> dict[str, Any]:
+        if self._process is None or not self._process.is_alive():
+            self._stop_process(graceful=False)
+            self._start_process()
+        assert self._connection is not None
+
+        self._connection.send((job.method, job.params))
+        deadline = time.monotonic() + self._pool.job_timeout
+        while True:
+            if not self._connection.poll(max(deadline - time.monotonic(), 0)):
+                self._stop_process(graceful=False)
+                self._start_process()
+                return {
+                    "id": job.id,
+                    "ok": False,
+                    "code": "timeout",
+                    "error": f"Job exceeded the {self._pool.job_timeout:g}s timeout.",
+                }
+
+            try:
+                ok, payload = self._connection.recv()
+            except EOFError:
+                self._stop_process(graceful=False)
+                self._start_process()
+                return {"id": job.id, "ok": False, "code": "crashed", "error": "Worker process exited unexpectedly."}
+            if ok is not None:
+                break
+            job.reply({"id": job.id, "progress": payload})
+
+        if ok:
+            return {"id": job.id, "ok": True, "result": payload}
+        return {"id": job.id, "ok": False, "code": "error", "error": payload}
+
+
+class PoolBusyError(Exception):
+    """Raised when the pending-job queue is full."""
+
+
+class WorkerPool:
+    """A bounded pool of pre-warmed worker processes with a bounded job queue."""
+
+    def __init__(self, workers: int, max_pending: int, job_timeout: float) -> None:
+        self.job_timeout = job_timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.jobs: queue.Queue[Optional[Job]] = queue.Queue(maxsize=max_pending)
+        self._slots = [WorkerSlot(self, index) for index in range(workers)]
+        for slot in self._slots:
+            slot.start()
+
+    def submit(self, job: Job) -> None:
+        try:
+            self.jobs.put_nowait(job)
+        except queue.Full as exc:
+            raise PoolBusyError("Too many pending jobs.") from exc
+
+    def shutdown(self) -> None:
+        for _ in self._slots:
+            self.jobs.put(None)
+        for slot in self._slots:
+            slot.join()
+
+
+def serve(pool: WorkerPool, stdin: TextIO, stdout: TextIO) -> None:
+    """Read one JSON request per line and answer with one JSON line per job.
+
+    Requests look like ``{"id": ..., "method": "validate" | "mapping",
+    "params": {...}}``; replies carry the same ``id`` with either
+    ``{"ok": true, "result": {...}}`` or ``{"ok": false, "code": ..., "error": ...}``.
+    Results hold the job's per-phase ``timings`` and its ``metrics`` (rows,
+    rows/s, peak memory), the figures the runners print as ``TIMING:`` and
+    ``METRIC:`` lines. While a job runs, ``{"id": ..., "progress": {...}}``
+    lines relay its progress events (phase, rows, total_rows,
+    elapsed_seconds, eta_seconds), like the runners' ``PROGRESS:`` lines.
+    Replies are written as jobs finish, so they may come back out of order.
+    """
+    output_lock = threading.Lock()
+
+    def reply(message: dict[str, Any]) -> None:
+        with output_lock:
+            stdout.write(json.dumps(message) + "\n")
+            stdout.flush()
+
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+            job = Job(
+                id=str(request["id"]),
+                method=str(request["method"]),
+                params=dict(request.get("params") or {}),
+                reply=reply,
+            )
+        except (ValueError, KeyError, TypeError) as exc:
+            reply({"id": None, "ok": False, "code": "invalid", "error": f"Invalid request: {exc}"})
+            continue
+
+        if job.method not in JOB_HANDLERS:
+            reply({"id": job.id, "ok": False, "code": "invalid", "error": f"Unknown method '{job.method}'."})
+            continue
+
+        try:
+            pool.submit(job)
+        except PoolBusyError as exc:
+            reply({"id": job.id, "ok": False, "code": "busy", "error": str(exc)})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Service JSON (stdin/stdout) executant validations et mappings dans un pool de workers.",
+    )
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("PYTHON_WORKERS", DEFAULT_WORKERS)))
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=int(os.environ.get("PYTHON_MAX_PENDING", DEFAULT_MAX_PENDING)),
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=float(os.environ.get("PYTHON_JOB_TIMEOUT", DEFAULT_JOB_TIMEOUT)),
+        help="Duree maximale d'un job en secondes",
+    )
+    args = parser.parse_args()
+
+    pool = WorkerPool(max(1, args.workers), max(1, args.max_pending), args.timeout)
+    print(f"INFO:Worker pool ready ({max(1, args.workers)} workers)", file=sys.stderr, flush=True)
+    try:
+        serve(pool, sys.stdin, sys.stdout)
+    finally:
+        pool.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,18 +1,13 @@
 import { randomUUID } from "node:crypto";
-import { spawn } from "node:child_process";
 import { mkdir, rm, writeFile } from "node:fs/promises";
 import { tmpdir } from "node:os";
 import path from "node:path";
 import { NextRequest, NextResponse } from "next/server";
 
-const PROJECT_ROOT = path.resolve(process.cwd(), "..");
-const BACKEND_ROOT = path.join(PROJECT_ROOT, "backend");
-const TMP_DIR = path.join(process.env.VALIDATION_TMP_DIR ?? tmpdir(), "dmf-validator");
-const PYTHON_MAPPER = path.join(BACKEND_ROOT, "mapping_runner.py");
+import { eventStreamResponse, wantsEventStream, type ProgressListener } from "../../../lib/job-progress";
+import { getPythonWorker, PythonWorkerError, workerErrorStatus } from "../../../lib/python-worker";
 
-const PYTHON_CANDIDATES = [process.env.PYTHON_BIN, "python", "python3"].filter(
-  (candidate): candidate is string => Boolean(candidate && candidate.trim().length > 0),
-);
+const TMP_DIR = path.join(process.env.VALIDATION_TMP_DIR ?? tmpdir(), "dmf-validator");
 
 type MappingRulePayload = {
   target: string;
@@ -32,81 +27,6 @@ async function saveUploadedFile(file: File): Promise<{ inputPath: string; baseNa
   return { inputPath, baseName };
 }
 
-function spawnPythonProcess(command: string, args: string[]): Promise<{ stdout: string; stderr: string; code: number }> {
-  return new Promise((resolve, reject) => {
-    const python = spawn(command, args, {
-      cwd: PROJECT_ROOT,
-      env: {
-        ...process.env,
-        PYTHONUNBUFFERED: "1",
-      },
-    });
-
-    let stdout = "";
-    let stderr = "";
-
-    python.stdout.on("data", (data) => {
-      stdout += data.toString();
-    });
-
-    python.stderr.on("data", (data) => {
-      stderr += data.toString();
-    });
-
-    python.on("error", (error) => {
-      reject(error);
-    });
-
-    python.on("close", (code) => {
-      resolve({ stdout, stderr, code: code ?? 1 });
-    });
-  });
-}
-
-async function runPythonMapping(
-  inputPath: string,
-  outputDir: string,
-  outputName?: string,
-  rulesPath?: string,
-): Promise<{ stdout: string; stderr: string; code: number }> {
-  const args = outputName
-    ? [PYTHON_MAPPER, inputPath, outputDir, outputName]
-    : [PYTHON_MAPPER, inputPath, outputDir];
-
-  if (rulesPath) {
-    if (outputName) {
-      args.push(rulesPath);
-    } else {
-      args.push("", rulesPath);
-    }
-  }
-
-  let lastError: NodeJS.ErrnoException | null = null;
-
-  for (const command of PYTHON_CANDIDATES) {
-    try {
-      return await spawnPythonProcess(command, args);
-    } catch (error) {
-      if (
-        typeof error === "object" &&
-        error !== null &&
-        "code" in error &&
-        (error as NodeJS.ErrnoException).code === "ENOENT"
-      ) {
-        lastError = error as NodeJS.ErrnoException;
-        continue;
-      }
-      throw error;
-    }
-  }
-
-  if (lastError) {
-    throw lastError;
-  }
-
-  throw Object.assign(new Error("Unable to locate a Python interpreter."), { code: "ENOENT" });
-}
-
 function computeOutputName(originalName: string): string {
   const trimmed = originalName.trim();
   const base =
@@ -116,19 +36,6 @@ function computeOutputName(originalName: string): string {
   return `${base}_mapping.xlsx`;
 }
 
-function parseResultName(stdout: string): string | null {
-  const lines = stdout.split(/\r?\n/);
-  for (const line of lines) {
-    if (line.startsWith("RESULT:")) {
-      const candidate = line.slice("RESULT:".length).trim();
-      if (candidate.length > 0) {
-        return candidate;
-      }
-    }
-  }
-  return null;
-}
-
 function sanitizeRules(input: unknown): MappingRulePayload[] {
   if (!Array.isArray(input)) {
     return [];
@@ -166,7 +73,7 @@ function sanitizeRules(input: unknown): MappingRulePayload[] {
     .filter((value): value is MappingRulePayload => value !== null);
 }
 
-export async function POST(req: NextRequest): Promise<NextResponse> {
+export async function POST(req: NextRequest): Promise<Response> {
   try {
     const formData = await req.formData();
     const file = formData.get("file");
@@ -182,60 +89,77 @@ export async function POST(req: NextRequest): Promise<NextResponse> {
     const runtimeName = `${randomUUID()}-${requestedName}`;
 
     const rawRules = formData.get("rules");
-    let runtimeRulesPath: string | undefined;
+    let runtimeRules: MappingRulePayload[] | undefined;
 
-    try {
-      if (typeof rawRules === "string" && rawRules.trim().length > 0) {
+    // Input files are removed once the job is over, which with a progress
+    // stream is after the response has been handed back.
+    const job = async (onProgress?: ProgressListener): Promise<NextResponse> => {
+      try {
+        if (typeof rawRules === "string" && rawRules.trim().length > 0) {
+          try {
+            runtimeRules = sanitizeRules(JSON.parse(rawRules));
+          } catch (error) {
+            console.error("Invalid mapping rules payload", error);
+            return new NextResponse("Le format des règles est invalide", { status: 400 });
+          }
+        }
+
+        let result;
         try {
-          const parsed = JSON.parse(rawRules);
-          const sanitized = sanitizeRules(parsed);
-          const rulesFile = `${randomUUID()}-mapping-rules.json`;
-          const rulesPath = path.join(TMP_DIR, rulesFile);
-          await writeFile(rulesPath, JSON.stringify(sanitized), "utf-8");
-          cleanupTargets.add(rulesPath);
-          runtimeRulesPath = rulesPath;
+          result = await getPythonWorker().call(
+            "mapping",
+            {
+              input: inputPath,
+              outputDir: TMP_DIR,
+              outputName: runtimeName,
+              rules: runtimeRules,
+            },
+            onProgress,
+          );
         } catch (error) {
-          console.error("Invalid mapping rules payload", error);
-          return new NextResponse("Le format des règles est invalide", { status: 400 });
+          if (error instanceof PythonWorkerError) {
+            const message =
+              error.code === "busy"
+                ? "Le serveur de mapping est occupé, veuillez réessayer dans quelques instants."
+                : error.message || "La génération du fichier a échoué";
+            return NextResponse.json({ success: false, message }, { status: workerErrorStatus(error) });
+          }
+
+          console.error("Failed to start Python mapping", error);
+          const code =
+            typeof error === "object" && error !== null && "code" in error
+              ? (error as NodeJS.ErrnoException).code
+              : undefined;
+          const message =
+            code === "ENOENT"
+              ? "Python n'est pas disponible sur le serveur de mapping."
+              : "Échec lors du lancement du moteur Python.";
+          return NextResponse.json({ success: false, message }, { status: 500 });
         }
-      }
-
-      let result;
-      try {
-        result = await runPythonMapping(inputPath, TMP_DIR, runtimeName, runtimeRulesPath);
-      } catch (error) {
-        console.error("Failed to start Python mapping", error);
-        const code =
-          typeof error === "object" && error !== null && "code" in error
-            ? (error as NodeJS.ErrnoException).code
-            : undefined;
-        const message =
-          code === "ENOENT"
-            ? "Python n'est pas disponible sur le serveur de mapping."
-            : "Échec lors du lancement du moteur Python.";
-        return NextResponse.json({ success: false, message }, { status: 500 });
-      }
 
-      if (result.code !== 0) {
-        const message = result.stderr || result.stdout || "La génération du fichier a échoué";
-        return NextResponse.json({ success: false, message }, { status: 500 });
+        const generatedName = result.name || runtimeName;
+
+        return NextResponse.json({
+          success: true,
+          message: "Mapping terminé. Fichier disponible.",
+          downloadUrl: `/api/reports/${encodeURIComponent(generatedName)}`,
+          originalName: file.name,
+          timings: result.timings,
+          metrics: result.metrics,
+        });
+      } finally {
+        await Promise.all(
+          Array.from(cleanupTargets, (target) =>
+            rm(target, { force: true }).catch(() => undefined),
+          ),
+        );
       }
+    };
 
-      const generatedName = parseResultName(result.stdout) ?? runtimeName;
-
-      return NextResponse.json({
-        success: true,
-        message: "Mapping terminé. Fichier disponible.",
-        downloadUrl: `/api/reports/${encodeURIComponent(generatedName)}`,
-        originalName: file.name,
-      });
-    } finally {
-      await Promise.all(
-        Array.from(cleanupTargets, (target) =>
-          rm(target, { force: true }).catch(() => undefined),
-        ),
-      );
+    if (wantsEventStream(req)) {
+      return eventStreamResponse(job);
     }
+    return await job();
   } catch (error) {
     console.error(error);
     return new NextResponse("Erreur interne du serveur", { status: 500 });
@@ -1,21 +1,16 @@
 import { randomUUID } from "node:crypto";
-import { spawn } from "node:child_process";
 import { mkdir, rm, writeFile } from "node:fs/promises";
 import { tmpdir } from "node:os";
 import path from "node:path";
 import { NextRequest, NextResponse } from "next/server";
 
-const PROJECT_ROOT = path.resolve(process.cwd(), "..");
-const BACKEND_ROOT = path.join(PROJECT_ROOT, "backend");
+import { eventStreamResponse, wantsEventStream, type ProgressListener } from "../../../lib/job-progress";
+import { getPythonWorker, PythonWorkerError, workerErrorStatus } from "../../../lib/python-worker";
+
 const TMP_DIR = path.join(
   process.env.VALIDATION_TMP_DIR ?? tmpdir(),
   "dmf-validator",
 );
-const PYTHON_RUNNER = path.join(BACKEND_ROOT, "python_runner.py");
-
-const PYTHON_CANDIDATES = [process.env.PYTHON_BIN, "python", "python3"].filter(
-  (candidate): candidate is string => Boolean(candidate && candidate.trim().length > 0),
-);
 
 type AllowedType = "list" | "instruction";
 
@@ -45,61 +40,6 @@ async function saveUploadedFile(file: File): Promise<{ inputPath: string; baseNa
   return { inputPath, baseName };
 }
 
-function spawnPythonProcess(command: string, args: string[]): Promise<{ stdout: string; stderr: string; code: number }> {
-  return new Promise((resolve, reject) => {
-    const python = spawn(command, args, {
-      cwd: PROJECT_ROOT,
-      env: {
-        ...process.env,
-        PYTHONUNBUFFERED: "1",
-      },
-    });
-
-    let stdout = "";
-    let stderr = "";
-
-    python.stdout.on("data", (data) => {
-      stdout += data.toString();
-    });
-
-    python.stderr.on("data", (data) => {
-      stderr += data.toString();
-    });
-
-    python.on("error", (error) => {
-      reject(error);
-    });
-
-    python.on("close", (code) => {
-      resolve({ stdout, stderr, code: code ?? 1 });
-    });
-  });
-}
-
-async function runPythonValidation(inputPath: string, outputDir: string, rulesPath?: string): Promise<{ stdout: string; stderr: string; code: number }> {
-  const args = rulesPath ? [PYTHON_RUNNER, inputPath, outputDir, rulesPath] : [PYTHON_RUNNER, inputPath, outputDir];
-
-  let lastError: NodeJS.ErrnoException | null = null;
-
-  for (const command of PYTHON_CANDIDATES) {
-    try {
-      return await spawnPythonProcess(command, args);
-    } catch (error) {
-      if (typeof error === "object" && error !== null && "code" in error && (error as NodeJS.ErrnoException).code === "ENOENT") {
-        lastError = error as NodeJS.ErrnoException;
-        continue;
-      }
-      throw error;
-    }
-  }
-
-  if (lastError) {
-    throw lastError;
-  }
-
-  throw Object.assign(new Error("Unable to locate a Python interpreter."), { code: "ENOENT" });
-}
-
 function computeOutputName(baseName: string): string {
   return baseName.toLowerCase().endsWith(".xlsx") ? `${baseName.slice(0, -5)} review.xlsx` : baseName;
 }
@@ -172,7 +112,7 @@ function sanitizeRules(input: unknown): RulePayload[] {
     .filter((value): value is RulePayload => value !== null);
 }
 
-export async function POST(req: NextRequest): Promise<NextResponse> {
+export async function POST(req: NextRequest): Promise<Response> {
   try {
     const formData = await req.formData();
     const file = formData.get("file");
@@ -185,60 +125,76 @@ export async function POST(req: NextRequest): Promise<NextResponse> {
     const cleanupTargets = new Set<string>([inputPath]);
 
     const rawRules = formData.get("rules");
-    let runtimeRulesPath: string | undefined;
-    try {
-      if (typeof rawRules === "string") {
-        const trimmedRules = rawRules.trim();
-        if (trimmedRules.length > 0) {
-          try {
-            const parsed = JSON.parse(trimmedRules);
-            const sanitized = sanitizeRules(parsed);
-            const rulesFile = `${randomUUID()}-rules.json`;
-            const rulesPath = path.join(TMP_DIR, rulesFile);
-            await writeFile(rulesPath, JSON.stringify(sanitized), "utf-8");
-            cleanupTargets.add(rulesPath);
-            runtimeRulesPath = rulesPath;
-          } catch (error) {
-            console.error("Invalid rules payload", error);
-            return new NextResponse("Le format des regles est invalide", { status: 400 });
+    let runtimeRules: RulePayload[] | undefined;
+    // Input files are removed once the job is over, which with a progress
+    // stream is after the response has been handed back.
+    const job = async (onProgress?: ProgressListener): Promise<NextResponse> => {
+      try {
+        if (typeof rawRules === "string") {
+          const trimmedRules = rawRules.trim();
+          if (trimmedRules.length > 0) {
+            try {
+              runtimeRules = sanitizeRules(JSON.parse(trimmedRules));
+            } catch (error) {
+              console.error("Invalid rules payload", error);
+              return new NextResponse("Le format des regles est invalide", { status: 400 });
+            }
           }
         }
-      }
 
-      let result;
-      try {
-        result = await runPythonValidation(inputPath, TMP_DIR, runtimeRulesPath);
-      } catch (error) {
-        console.error("Failed to start Python validation", error);
-        const code =
-          typeof error === "object" && error !== null && "code" in error
-            ? (error as NodeJS.ErrnoException).code
-            : undefined;
-        const message =
-          code === "ENOENT"
-            ? "Python n'est pas disponible sur le serveur de validation."
-            : "Echec lors du lancement du moteur Python.";
-        return NextResponse.json({ success: false, message }, { status: 500 });
-      }
+        let result;
+        try {
+          result = await getPythonWorker().call(
+            "validate",
+            {
+              input: inputPath,
+              outputDir: TMP_DIR,
+              rules: runtimeRules,
+            },
+            onProgress,
+          );
+        } catch (error) {
+          if (error instanceof PythonWorkerError) {
+            const message =
+              error.code === "busy"
+                ? "Le serveur de validation est occupe, veuillez reessayer dans quelques instants."
+                : error.message || "La validation a echoue";
+            return NextResponse.json({ success: false, message }, { status: workerErrorStatus(error) });
+          }
+
+          console.error("Failed to start Python validation", error);
+          const code =
+            typeof error === "object" && error !== null && "code" in error
+              ? (error as NodeJS.ErrnoException).code
+              : undefined;
+          const message =
+            code === "ENOENT"
+              ? "Python n'est pas disponible sur le serveur de validation."
+              : "Echec lors du lancement du moteur Python.";
+          return NextResponse.json({ success: false, message }, { status: 500 });
+        }
 
-      if (result.code !== 0) {
-        const message = result.stderr || result.stdout || "La validation a echoue";
-        return NextResponse.json({ success: false, message }, { status: 500 });
+        const reviewName = result.name || computeOutputName(baseName);
+        return NextResponse.json({
+          success: true,
+          message: "Validation terminee. Rapport disponible.",
+          downloadUrl: `/api/reports/${encodeURIComponent(reviewName)}`,
+          timings: result.timings,
+          metrics: result.metrics,
+        });
+      } finally {
+        await Promise.all(
+          Array.from(cleanupTargets, (target) =>
+            rm(target, { force: true }).catch(() => undefined),
+          ),
+        );
       }
+    };
 
-      const reviewName = computeOutputName(baseName);
-      return NextResponse.json({
-        success: true,
-        message: "Validation terminee. Rapport disponible.",
-        downloadUrl: `/api/reports/${encodeURIComponent(reviewName)}`,
-      });
-    } finally {
-      await Promise.all(
-        Array.from(cleanupTargets, (target) =>
-          rm(target, { force: true }).catch(() => undefined),
-        ),
-      );
+    if (wantsEventStream(req)) {
+      return eventStreamResponse(job);
     }
+    return await job();
   } catch (error) {
     console.error(error);
     return new NextResponse("Erreur interne du serveur", { status: 500 });
@@ -4,7 +4,9 @@ import Link from "next/link";
 import { useMemo, useRef, useState, type ChangeEvent } from "react";
 import * as XLSX from "xlsx";
 
+import { JobProgress } from "../../components/job-progress";
 import { useLanguage } from "../../components/language-provider";
+import { fetchWithProgress, type JobProgress as JobProgressEvent } from "../../lib/job-progress";
 
 type MappingRulePayload = {
   target: string;
@@ -320,6 +322,7 @@ export default function MappingPage() {
   const [rulesEdited, setRulesEdited] = useState<boolean>(false);
   const [rulesOpen, setRulesOpen] = useState<boolean>(false);
   const [downloadUrl, setDownloadUrl] = useState<string | null>(null);
+  const [progress, setProgress] = useState<JobProgressEvent | null>(null);
   const [templateColumns, setTemplateColumns] = useState<string[]>([]);
 
   const { content } = useLanguage();
@@ -585,6 +588,7 @@ export default function MappingPage() {
     }
 
     setStatus({ type: "processing", filename: file.name });
+    setProgress(null);
 
     const formData = new FormData();
     formData.append("file", file);
@@ -595,10 +599,14 @@ export default function MappingPage() {
     }
 
     try {
-      const response = await fetch("/api/mapping", {
-        method: "POST",
-        body: formData,
-      });
+      const response = await fetchWithProgress(
+        "/api/mapping",
+        {
+          method: "POST",
+          body: formData,
+        },
+        setProgress,
+      );
 
       const payload = await response.json().catch(() => null);
 
@@ -853,6 +861,7 @@ export default function MappingPage() {
               >
                 {statusMessage}
               </p>
+              {status.type === "processing" ? <JobProgress progress={progress} /> : null}
               {hasMissingTarget ? (
                 <p className="text-xs font-medium text-red-600 dark:text-red-400">
                   {mapping.rules.launchWarning}
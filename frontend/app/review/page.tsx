@@ -4,8 +4,10 @@ import Link from "next/link";
 import { useMemo, useRef, useState } from "react";
 import * as XLSX from "xlsx";
 
+import { JobProgress } from "../../components/job-progress";
 import { useLanguage } from "../../components/language-provider";
 import type { Translation } from "../../components/language-provider";
+import { fetchWithProgress, type JobProgress as JobProgressEvent } from "../../lib/job-progress";
 
 const truthyValues = new Set(["true", "1", "yes", "oui", "y", "x"]);
 
@@ -287,6 +289,7 @@ export default function HomePage() {
   const [status, setStatus] = useState<StatusState>({ type: "default" });
   const [reportUrl, setReportUrl] = useState<string | null>(null);
   const [isSubmitting, setIsSubmitting] = useState<boolean>(false);
+  const [progress, setProgress] = useState<JobProgressEvent | null>(null);
   const [rulesEdited, setRulesEdited] = useState<boolean>(false);
   const [rulesOpen, setRulesOpen] = useState<boolean>(false);
   const fileInputRef = useRef<HTMLInputElement | null>(null);
@@ -416,6 +419,7 @@ export default function HomePage() {
     setIsSubmitting(true);
     setStatus({ type: "validating" });
     setReportUrl(null);
+    setProgress(null);
 
     try {
       const formData = new FormData();
@@ -426,10 +430,14 @@ export default function HomePage() {
         formData.set("rules", JSON.stringify(payload));
       }
 
-      const response = await fetch("/api/validate", {
-        method: "POST",
-        body: formData,
-      });
+      const response = await fetchWithProgress(
+        "/api/validate",
+        {
+          method: "POST",
+          body: formData,
+        },
+        setProgress,
+      );
 
       if (!response.ok) {
         const message = await readErrorMessage(response);
@@ -469,6 +477,7 @@ export default function HomePage() {
       setStatus({ type: "networkError" });
     } finally {
       setIsSubmitting(false);
+      setProgress(null);
     }
   }
 
@@ -801,6 +810,7 @@ export default function HomePage() {
               >
                 {statusMessage}
               </p>
+              {isSubmitting ? <JobProgress progress={progress} /> : null}
               {hasMissingField ? (
                 <p className="text-xs font-medium text-red-600 dark:text-red-400">{rulesText.launchWarning}</p>
               ) : null}
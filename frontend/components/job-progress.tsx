@@ -0,0 +1,38 @@
+"use client";
+
+import type { JobProgress as JobProgressEvent } from "../lib/job-progress";
+import { useLanguage } from "./language-provider";
+
+export function JobProgress({ progress }: { progress: JobProgressEvent | null }) {
+  const { content } = useLanguage();
+  const { jobProgress } = content;
+
+  if (!progress) {
+    return null;
+  }
+
+  const format = (value: number) => value.toLocaleString(jobProgress.locale);
+  const phase = (progress.phase && jobProgress.phases[progress.phase]) || jobProgress.working;
+  const details = [
+    progress.rows > 0 ? jobProgress.rows(format(progress.rows), progress.total_rows ? format(progress.total_rows) : null) : null,
+    progress.eta_seconds !== null && progress.eta_seconds > 0 ? jobProgress.eta(Math.ceil(progress.eta_seconds)) : null,
+  ].filter((value): value is string => value !== null);
+  const ratio =
+    progress.total_rows && progress.rows > 0 ? Math.min(progress.rows / progress.total_rows, 1) : null;
+
+  return (
+    <div className="flex flex-col gap-1" aria-live="polite">
+      <p className="text-xs font-medium text-slate-600 dark:text-slate-300">
+        {[phase, ...details].join(" · ")}
+      </p>
+      {ratio !== null ? (
+        <div className="h-1.5 w-full overflow-hidden rounded-full bg-slate-200 dark:bg-slate-800">
+          <div
+            className="h-full rounded-full bg-emerald-500 transition-[width] duration-300 dark:bg-emerald-400"
+            style={{ width: `${Math.round(ratio * 100)}%` }}
+          />
+        </div>
+      ) : null}
+    </div>
+  );
+}
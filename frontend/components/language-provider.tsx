@@ -32,6 +32,24 @@ const translations = {
     common: {
       backToHome: "Revenir à l'accueil",
     },
+    jobProgress: {
+      phases: {
+        hash: "Empreinte du classeur",
+        cache: "Recherche dans le cache",
+        read: "Lecture du classeur",
+        rules: "Chargement des règles",
+        unique: "Contrôle d'unicité",
+        evaluate: "Évaluation des règles",
+        summarise: "Synthèse des erreurs",
+        execute: "Application du mapping",
+        write: "Écriture du fichier",
+      } as Record<string, string>,
+      working: "Traitement en cours",
+      rows: (rows: string, total: string | null) =>
+        total ? `${rows} / ${total} lignes` : `${rows} lignes`,
+      eta: (seconds: number) => `environ ${seconds} s restantes`,
+      locale: "fr-FR",
+    },
     home: {
       badge: "Portail DMF",
       title: "Choisissez votre parcours",
@@ -320,6 +338,24 @@ const translations = {
     common: {
       backToHome: "Back to home",
     },
+    jobProgress: {
+      phases: {
+        hash: "Fingerprinting workbook",
+        cache: "Checking the cache",
+        read: "Reading workbook",
+        rules: "Loading rules",
+        unique: "Checking uniqueness",
+        evaluate: "Evaluating rules",
+        summarise: "Summarising errors",
+        execute: "Applying the mapping",
+        write: "Writing the file",
+      } as Record<string, string>,
+      working: "Processing",
+      rows: (rows: string, total: string | null) =>
+        total ? `${rows} / ${total} rows` : `${rows} rows`,
+      eta: (seconds: number) => `about ${seconds} s left`,
+      locale: "en-GB",
+    },
     home: {
       badge: "DMF workspace",
       title: "Choose your workflow",
@@ -0,0 +1,132 @@
+// Progress of a validation or mapping job, as the Python engines report it
+// (PROGRESS: lines of the runners, "progress" replies of the worker service).
+export type JobProgress = {
+  phase: string | null;
+  rows: number;
+  total_rows: number | null;
+  elapsed_seconds: number;
+  eta_seconds: number | null;
+};
+
+export type ProgressListener = (progress: JobProgress) => void;
+
+type ResultEvent = {
+  status: number;
+  contentType: string | null;
+  body: string;
+};
+
+const EVENT_STREAM = "text/event-stream";
+
+export function wantsEventStream(req: Request): boolean {
+  return (req.headers.get("accept") ?? "").includes(EVENT_STREAM);
+}
+
+/**
+ * Run a job and stream it as server-sent events: one `progress` event per
+ * engine report, then a single `result` event carrying the status and body
+ * of the response the route would have sent without streaming.
+ */
+export function eventStreamResponse(job: (onProgress: ProgressListener) => Promise<Response>): Response {
+  const encoder = new TextEncoder();
+
+  const stream = new ReadableStream<Uint8Array>({
+    async start(controller) {
+      let open = true;
+      const send = (event: string, data: unknown) => {
+        if (!open) return;
+        try {
+          controller.enqueue(encoder.encode(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`));
+        } catch {
+          // The browser went away; the job still runs to completion so its files get cleaned up.
+          open = false;
+        }
+      };
+
+      let result: ResultEvent;
+      try {
+        const response = await job((progress) => send("progress", progress));
+        result = {
+          status: response.status,
+          contentType: response.headers.get("content-type"),
+          body: await response.text(),
+        };
+      } catch (error) {
+        console.error(error);
+        result = { status: 500, contentType: "text/plain", body: "Erreur interne du serveur" };
+      }
+
+      send("result", result);
+      if (open) {
+        controller.close();
+      }
+    },
+  });
+
+  return new Response(stream, {
+    headers: {
+      "Content-Type": `${EVENT_STREAM}; charset=utf-8`,
+      "Cache-Control": "no-cache, no-transform",
+      "X-Accel-Buffering": "no",
+    },
+  });
+}
+
+/**
+ * `fetch` asking for a progress stream. Progress events go to `onProgress`
+ * and the promise resolves with the final response, rebuilt from the
+ * `result` event, so callers handle it exactly like a plain JSON reply.
+ * Responses that are not streamed (e.g. early validation errors) are
+ * returned as they are.
+ */
+export async function fetchWithProgress(
+  input: string,
+  init: RequestInit,
+  onProgress: ProgressListener,
+): Promise<Response> {
+  const headers = new Headers(init.headers);
+  headers.set("Accept", `${EVENT_STREAM}, application/json`);
+  const response = await fetch(input, { ...init, headers });
+
+  const contentType = response.headers.get("content-type") ?? "";
+  if (!contentType.includes(EVENT_STREAM) || !response.body) {
+    return response;
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary >= 0) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      let event = "message";
+      const data: string[] = [];
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data.push(line.slice(5).trimStart());
+      }
+      if (data.length === 0) continue;
+
+      const payload = JSON.parse(data.join("\n"));
+      if (event === "progress") {
+        onProgress(payload as JobProgress);
+      } else if (event === "result") {
+        const result = payload as ResultEvent;
+        await reader.cancel().catch(() => undefined);
+        return new Response(result.body, {
+          status: result.status,
+          headers: result.contentType ? { "Content-Type": result.contentType } : undefined,
+        });
+      }
+    }
+  }
+
+  throw new Error("Progress stream ended without a result.");
+}
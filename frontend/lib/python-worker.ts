@@ -0,0 +1,215 @@
+import { randomUUID } from "node:crypto";
+import { spawn, type ChildProcessWithoutNullStreams } from "node:child_process";
+import path from "node:path";
+
+import type { JobProgress, ProgressListener } from "./job-progress";
+
+const PROJECT_ROOT = path.resolve(process.cwd(), "..");
+const WORKER_SERVICE = path.join(PROJECT_ROOT, "backend", "worker_service.py");
+
+const PYTHON_CANDIDATES = [process.env.PYTHON_BIN, "python", "python3"].filter(
+  (candidate): candidate is string => Boolean(candidate && candidate.trim().length > 0),
+);
+
+// The Python service enforces the per-job timeout itself; this one only guards
+// against a service that stopped answering altogether.
+const JOB_TIMEOUT_SECONDS = Number(process.env.PYTHON_JOB_TIMEOUT ?? 600);
+const CLIENT_TIMEOUT_MS = (JOB_TIMEOUT_SECONDS + 30) * 1000;
+
+export type WorkerMethod = "validate" | "mapping";
+
+// Seconds per phase (plus "total") and rows, rows_per_second, peak_rss_mb,
+// as the runners print them in TIMING:/METRIC: lines.
+export type WorkerTimings = Record<string, number>;
+export type WorkerMetrics = Record<string, number>;
+
+export type WorkerResult = {
+  output: string;
+  name: string;
+  timings?: WorkerTimings;
+  metrics?: WorkerMetrics;
+  [key: string]: unknown;
+};
+
+// Progress replies ({"id", "progress"}) come before the final one and have no "ok".
+type WorkerReply = {
+  id: string | null;
+  ok?: boolean;
+  progress?: JobProgress;
+  result?: WorkerResult;
+  code?: string;
+  error?: string;
+};
+
+type PendingJob = {
+  resolve: (result: WorkerResult) => void;
+  reject: (error: Error) => void;
+  onProgress?: ProgressListener;
+  timer: NodeJS.Timeout;
+};
+
+export class PythonWorkerError extends Error {
+  constructor(
+    message: string,
+    readonly code: string,
+  ) {
+    super(message);
+    this.name = "PythonWorkerError";
+  }
+}
+
+function startService(command: string): Promise<ChildProcessWithoutNullStreams> {
+  return new Promise((resolve, reject) => {
+    const child = spawn(command, [WORKER_SERVICE], {
+      cwd: PROJECT_ROOT,
+      env: {
+        ...process.env,
+        PYTHONUNBUFFERED: "1",
+      },
+    });
+    child.once("spawn", () => resolve(child));
+    child.once("error", reject);
+  });
+}
+
+class PythonWorkerClient {
+  private child: ChildProcessWithoutNullStreams | null = null;
+  private starting: Promise<ChildProcessWithoutNullStreams> | null = null;
+  private readonly pending = new Map<string, PendingJob>();
+  private buffer = "";
+
+  async call(
+    method: WorkerMethod,
+    params: Record<string, unknown>,
+    onProgress?: ProgressListener,
+  ): Promise<WorkerResult> {
+    const child = await this.ensureStarted();
+    const id = randomUUID();
+
+    return new Promise<WorkerResult>((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new PythonWorkerError("Le moteur Python ne repond plus.", "timeout"));
+      }, CLIENT_TIMEOUT_MS);
+      this.pending.set(id, { resolve, reject, onProgress, timer });
+      child.stdin.write(`${JSON.stringify({ id, method, params })}\n`);
+    });
+  }
+
+  private async ensureStarted(): Promise<ChildProcessWithoutNullStreams> {
+    if (this.child) {
+      return this.child;
+    }
+    if (!this.starting) {
+      this.starting = this.spawnService().finally(() => {
+        this.starting = null;
+      });
+    }
+    return this.starting;
+  }
+
+  private async spawnService(): Promise<ChildProcessWithoutNullStreams> {
+    let lastError: NodeJS.ErrnoException | null = null;
+
+    for (const command of PYTHON_CANDIDATES) {
+      try {
+        const child = await startService(command);
+        this.attach(child);
+        return child;
+      } catch (error) {
+        if (typeof error === "object" && error !== null && "code" in error && (error as NodeJS.ErrnoException).code === "ENOENT") {
+          lastError = error as NodeJS.ErrnoException;
+          continue;
+        }
+        throw error;
+      }
+    }
+
+    if (lastError) {
+      throw lastError;
+    }
+
+    throw Object.assign(new Error("Unable to locate a Python interpreter."), { code: "ENOENT" });
+  }
+
+  private attach(child: ChildProcessWithoutNullStreams): void {
+    this.child = child;
+    this.buffer = "";
+
+    child.stdout.on("data", (data) => {
+      this.buffer += data.toString();
+      let newline = this.buffer.indexOf("\n");
+      while (newline >= 0) {
+        const line = this.buffer.slice(0, newline).trim();
+        this.buffer = this.buffer.slice(newline + 1);
+        if (line.length > 0) {
+          this.handleReply(line);
+        }
+        newline = this.buffer.indexOf("\n");
+      }
+    });
+
+    child.stderr.on("data", (data) => {
+      console.error(`[python-worker] ${data.toString().trimEnd()}`);
+    });
+
+    child.on("close", (code) => {
+      if (this.child === child) {
+        this.child = null;
+      }
+      const error = new PythonWorkerError(`Le moteur Python s'est arrete (code ${code ?? "inconnu"}).`, "crashed");
+      for (const [id, job] of this.pending) {
+        clearTimeout(job.timer);
+        job.reject(error);
+        this.pending.delete(id);
+      }
+    });
+  }
+
+  private handleReply(line: string): void {
+    let reply: WorkerReply;
+    try {
+      reply = JSON.parse(line) as WorkerReply;
+    } catch {
+      console.error(`[python-worker] Unexpected output: ${line}`);
+      return;
+    }
+
+    const job = reply.id ? this.pending.get(reply.id) : undefined;
+    if (!job || !reply.id) {
+      return;
+    }
+
+    if (reply.ok === undefined && reply.progress) {
+      job.onProgress?.(reply.progress);
+      return;
+    }
+
+    this.pending.delete(reply.id);
+    clearTimeout(job.timer);
+    if (reply.ok && reply.result) {
+      job.resolve(reply.result);
+    } else {
+      job.reject(new PythonWorkerError(reply.error ?? "Erreur inconnue", reply.code ?? "error"));
+    }
+  }
+}
+
+// Route modules can be instantiated several times (e.g. by the dev server), but
+// they must all share one service so the pool bound holds for the whole app.
+const globalForWorker = globalThis as typeof globalThis & { dmfPythonWorker?: PythonWorkerClient };
+
+export function getPythonWorker(): PythonWorkerClient {
+  if (!globalForWorker.dmfPythonWorker) {
+    globalForWorker.dmfPythonWorker = new PythonWorkerClient();
+  }
+  return globalForWorker.dmfPythonWorker;
+}
+
+export function workerErrorStatus(error: unknown): number {
+  if (error instanceof PythonWorkerError) {
+    if (error.code === "busy") return 503;
+    if (error.code === "timeout") return 504;
+  }
+  return 500;
+}